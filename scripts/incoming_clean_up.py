@@ -3,7 +3,6 @@ import os
 import shutil
 import re
 import argparse
-import zipfile
 from collections import defaultdict
 import time
 import math
@@ -11,42 +10,43 @@ import signal
 import sys
 import binascii
 import zlib
+import concurrent.futures
+import functools
+import itertools
+import json
+import queue
+import threading
+import mmap
+import unicodedata
+import struct
+import stat
+import heapq
+import bisect
+import io
+import contextlib
+import select
+import errno
 from typing import Optional, Tuple, Dict, List
 
-# Import tqdm for progress indication
-try:
-    from tqdm import tqdm
-    TQDM_AVAILABLE = True
-except ImportError:
-    TQDM_AVAILABLE = False
-    print("Warning: tqdm not available. Install with 'pip install tqdm' for progress bars.")
+# Importing this module has no side effects; the heavier modules (zipfile, sqlite3,
+# multiprocessing, cProfile, ctypes) are imported by the code that needs them.
 
-# Import PIL for image processing
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    print("Warning: PIL (Pillow) not available. Install with 'pip install Pillow' for image processing.")
+# tqdm is imported lazily by _load_tqdm(), only when a progress bar is shown
+tqdm = None
+TQDM_AVAILABLE = None
 
-print("DEBUG: Script loaded successfully")
+# PIL (Pillow) is imported lazily by _load_pil(), only for images the header probe can't read
+Image = None
+PIL_AVAILABLE = None
 
 # List of keywords to search for in directory names (case-insensitive)
 KEYWORDS = ["Live", "VA", "Greatest", "Hits", "Show", "Radio", "Single", "Billboard", "Top", "Charts", "Compilation", "Collection", "Best Of", "DJ Mix", "Live Mix"]
 
-# Pre-compiled regex patterns for better performance
-DATE_PATTERN_1 = re.compile(r'\b\d{2}-\d{2}-\d{4}\b|\b\d{4}-\d{2}-\d{2}\b|\b\d{2}-\d{2}-\d{2}\b', re.IGNORECASE)
-WEEKDAYS = r'(MON|TUE|WED|THU|FRI|SAT|SUN)'
-DATE_PATTERN_2 = re.compile(rf'\b\d{{2}}-\d{{2}}-{WEEKDAYS}\b', re.IGNORECASE)
-DATE_PATTERN_3 = re.compile(rf'\b{WEEKDAYS}-\d{{2}}-\d{{2}}\b', re.IGNORECASE)
-COMBINED_DATE_PATTERN = re.compile(rf'({DATE_PATTERN_1.pattern})|({DATE_PATTERN_2.pattern})|({DATE_PATTERN_3.pattern})', re.IGNORECASE)
-START_DATE_PATTERN = re.compile(rf'^({DATE_PATTERN_1.pattern}|{DATE_PATTERN_2.pattern}|{DATE_PATTERN_3.pattern})\/', re.IGNORECASE)
-
-# Pre-compiled keyword patterns
-KEYWORD_PATTERNS = {
-    keyword: re.compile(rf'(?<![a-zA-Z0-9]){re.escape(keyword)}(?![a-zA-Z0-9])', re.IGNORECASE) 
-    for keyword in KEYWORDS
-}
+# Date forms recognised in directory names, combined into the name classifier pattern
+DATE_PATTERN_1 = r'\b\d{2}-\d{2}-\d{4}\b|\b\d{4}-\d{2}-\d{2}\b|\b\d{2}-\d{2}-\d{2}\b'
+WEEKDAYS = r'(?:MON|TUE|WED|THU|FRI|SAT|SUN)'
+DATE_PATTERN_2 = rf'\b\d{{2}}-\d{{2}}-{WEEKDAYS}\b'
+DATE_PATTERN_3 = rf'\b{WEEKDAYS}-\d{{2}}-\d{{2}}\b'
 
 # Image file extensions to check
 IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
@@ -63,6 +63,85 @@ SFV_EXTENSIONS = {'.sfv'}
 # Global flag for graceful shutdown
 shutdown_requested = False
 
+# Worker pool used to hash SFV-listed files concurrently (see configure_sfv_workers)
+sfv_executor = None
+sfv_workers = 1
+
+# Stop verifying an SFV file at its first failure (see configure_sfv_verification)
+sfv_fail_fast = True
+
+# Per-device hashing queues (see configure_io_scheduler), None to hash through sfv_executor
+io_scheduler = None
+
+# Read bandwidth and metadata rate limits (see configure_throttle), None for no limits
+io_throttle = None
+
+# Background ZIP extraction stage (see configure_archive_stage), None to extract inline
+archive_stage = None
+
+# Thread pool used to probe image dimensions (see configure_image_workers)
+image_executor = None
+
+# Persistent CRC32 result cache (see CrcCache), None when disabled
+crc_cache = None
+
+# Default name of the verification cache database created under the root directory
+DEFAULT_CRC_CACHE_NAME = '.incoming_clean_up.sqlite3'
+
+# Incremental-mode directory index (see open_dir_index), None to walk the whole tree
+dir_index = None
+
+# Checkpoint journal of the current run (see open_checkpoint), None when not checkpointing
+checkpoint = None
+
+# Default name of the checkpoint journal created under the root directory
+DEFAULT_CHECKPOINT_NAME = '.incoming_clean_up.checkpoint.sqlite3'
+
+# Default name of the incremental index database created under the root directory
+DEFAULT_DIR_INDEX_NAME = '.incoming_clean_up.index.sqlite3'
+
+# Quarantine for condemned directories (see configure_quarantine), None to delete in place
+quarantine = None
+
+# Default name of the quarantine directory created under the root directory
+DEFAULT_QUARANTINE_NAME = '.incoming_clean_up.trash'
+
+# Parallel directory tree deletion (see configure_tree_deleter), None to use shutil.rmtree
+tree_deleter = None
+
+# Deletion plan written by pretend runs (see open_plan), None when no plan is requested
+plan_writer = None
+
+# Version of the plan file format written by PlanWriter and read by apply_plan
+# (2: paths relative to the root in the header)
+PLAN_VERSION = 2
+
+# Files the script itself keeps, by absolute parent directory -> names (see ignore_files);
+# the walk ignores them
+ignored_paths = {}
+
+# Output mode (see configure_output): 'text', 'ndjson' or 'quiet'
+OUTPUT_MODES = ('text', 'ndjson', 'quiet')
+output_mode = 'text'
+
+# Whether per-item messages are printed; false in the ndjson and quiet modes
+text_output = True
+
+# Writer of NDJSON action records (see configure_output), None unless --output ndjson
+record_writer = None
+
+# Hashing backend settings (see configure_hashing)
+HASH_METHODS = ('readinto', 'mmap', 'read')
+hash_block_size = 1024 * 1024
+hash_method = 'readinto'
+hash_drop_cache = True
+
+# Drop already-hashed pages from the page cache every this many bytes
+DROP_CACHE_WINDOW = 16 * 1024 * 1024
+
+# Per-thread reusable read buffers for the readinto backend
+_hash_buffers = threading.local()
+
 # ANSI color codes for modern output
 class Colors:
     RED = '\033[91m'
@@ -82,29 +161,407 @@ class Colors:
     BG_BLUE = '\033[104m'
     BG_YELLOW = '\033[103m'
 
-# Statistics tracking
+# Statistics tracking; start_time is set when a run starts (see reset_statistics)
 stats = defaultdict(int)
-start_time = time.time()
+start_time = 0.0
+
+# Counter updates and multi-line output blocks can come from pipeline worker threads
+stats_lock = threading.Lock()
+output_lock = threading.RLock()
+
+def count(key, amount=1):
+    """Thread-safe increment of a statistics counter."""
+    with stats_lock:
+        stats[key] += amount
+
+class StageTimings:
+    """
+    Per-stage timers for the statistics report: calls, total and maximum latency and bytes
+    for each stage, latency histograms for hashing and deletion, and the directories that
+    took longest to verify.
+    """
+    HISTOGRAM_STAGES = ('hash', 'delete')
+    # Upper bounds of the histogram buckets in seconds; the last bucket is open
+    HISTOGRAM_BOUNDS = (0.001, 0.01, 0.1, 1.0, 10.0)
+
+    def __init__(self, slowest=10):
+        self.lock = threading.Lock()
+        self.slowest_limit = slowest
+        self.stages = {}      # stage -> [calls, total seconds, max seconds, bytes]
+        self.histograms = {}  # stage -> bucket counts
+        self.slowest = []     # min-heap of (seconds, path)
+
+    def add(self, stage, seconds, nbytes=0):
+        with self.lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = [0, 0.0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+            entry[3] += nbytes
+            if stage in self.HISTOGRAM_STAGES:
+                buckets = self.histograms.setdefault(stage, [0] * (len(self.HISTOGRAM_BOUNDS) + 1))
+                buckets[bisect.bisect_left(self.HISTOGRAM_BOUNDS, seconds)] += 1
+
+    def directory(self, path, seconds):
+        """Offer a directory's verification time to the slowest-N list."""
+        if self.slowest_limit <= 0:
+            return
+        with self.lock:
+            if len(self.slowest) < self.slowest_limit:
+                heapq.heappush(self.slowest, (seconds, path))
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, (seconds, path))
+
+    def snapshot(self):
+        """JSON-ready copy of everything recorded."""
+        with self.lock:
+            return {
+                'stages': {stage: {'calls': calls, 'seconds': total, 'max_seconds': longest, 'bytes': nbytes}
+                           for stage, (calls, total, longest, nbytes) in self.stages.items()},
+                'histograms': {stage: {'bounds': list(self.HISTOGRAM_BOUNDS), 'counts': list(buckets)}
+                               for stage, buckets in self.histograms.items()},
+                'slowest_directories': [{'path': path, 'seconds': seconds}
+                                        for seconds, path in sorted(self.slowest, reverse=True)],
+            }
+
+    def merge(self, snapshot):
+        """Add the snapshot of another process (a shard) to these timings."""
+        with self.lock:
+            for stage, data in snapshot['stages'].items():
+                entry = self.stages.setdefault(stage, [0, 0.0, 0.0, 0])
+                entry[0] += data['calls']
+                entry[1] += data['seconds']
+                entry[2] = max(entry[2], data['max_seconds'])
+                entry[3] += data['bytes']
+            for stage, data in snapshot['histograms'].items():
+                buckets = self.histograms.setdefault(stage, [0] * (len(self.HISTOGRAM_BOUNDS) + 1))
+                for i, value in enumerate(data['counts']):
+                    buckets[i] += value
+        for item in snapshot['slowest_directories']:
+            self.directory(item['path'], item['seconds'])
+
+    def clear(self):
+        with self.lock:
+            self.stages.clear()
+            self.histograms.clear()
+            self.slowest.clear()
+
+timings = StageTimings()
+
+def reset_statistics():
+    """Start a new run: clear the statistics counters and stage timings and restart the run timer."""
+    global start_time
+    with stats_lock:
+        stats.clear()
+    timings.clear()
+    start_time = time.time()
+
+def timed_stage(stage):
+    """Decorator adding each call's duration to the given stage of the timings."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings.add(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+# Refuse archives that expand to more than this many times their compressed size
+DEFAULT_ZIP_MAX_RATIO = 100
+
+# Chunk size used when streaming archive members to disk
+ZIP_COPY_CHUNK = 1024 * 1024
+
+class ArchiveLimitError(Exception):
+    """Raised when an archive exceeds the configured extraction budget."""
+
+def _zip_member_target(dest_dir, member_name):
+    """
+    Map an archive member name to a path inside dest_dir, dropping absolute
+    prefixes and '..' components the same way ZipFile.extractall does.
+    """
+    parts = [part for part in member_name.replace('\\', '/').split('/')
+             if part not in ('', '.', '..')]
+    if not parts:
+        return None
+    return os.path.join(dest_dir, *parts)
+
+def _make_dirs(dir_path, created):
+    """os.makedirs that appends the directories it creates to created, parents first."""
+    missing = []
+    while not os.path.isdir(dir_path):
+        missing.append(dir_path)
+        parent = os.path.dirname(dir_path)
+        if parent == dir_path:
+            break
+        dir_path = parent
+    for directory in reversed(missing):
+        os.mkdir(directory)
+        created.append(directory)
+
+def extract_zip_archive(zip_path, dest_dir, max_ratio=DEFAULT_ZIP_MAX_RATIO, max_size=None, progress=None):
+    """
+    Extract a ZIP archive member by member, streaming each one to disk.
+    
+    The declared sizes are checked against the budget before anything is written, and the
+    bytes actually written are checked again while streaming, so a lying header can't get
+    past the limits. Each member's CRC32 is checked by zipfile as it is streamed, so a
+    corrupt member fails without a second pass. On any failure the files written and the
+    directories created so far are removed and the archive is left in place.
+    
+    Args:
+        zip_path: Path to the archive
+        dest_dir: Directory to extract into
+        max_ratio: Maximum allowed uncompressed/compressed size ratio (None for no limit)
+        max_size: Maximum allowed total uncompressed size in bytes (None for no limit)
+        progress: Optional callback receiving the number of bytes written after each chunk
+    
+    Returns:
+        Dictionary with 'members' (files written), 'bytes' (bytes written),
+        'archive_size' and 'error' (None on success)
+    """
+    import zipfile
+    result = {'members': 0, 'bytes': 0, 'archive_size': 0, 'error': None}
+    written = []
+    created = []
+    start = time.perf_counter()
+    try:
+        archive_size = os.path.getsize(zip_path)
+        result['archive_size'] = archive_size
+        budget = None
+        if max_size:
+            budget = max_size
+        if max_ratio:
+            ratio_budget = max(archive_size, 1) * max_ratio
+            budget = ratio_budget if budget is None else min(budget, ratio_budget)
+        
+        with zipfile.ZipFile(zip_path, 'r') as zf:
+            members = zf.infolist()
+            declared = sum(info.file_size for info in members)
+            if budget is not None and declared > budget:
+                raise ArchiveLimitError(
+                    f"declares {format_size(declared)} uncompressed, over the {format_size(budget)} budget")
+            
+            for info in members:
+                if shutdown_requested:
+                    raise ArchiveLimitError("interrupted")
+                target = _zip_member_target(dest_dir, info.filename)
+                if target is None:
+                    continue
+                if info.is_dir():
+                    _make_dirs(target, created)
+                    continue
+                parent = os.path.dirname(target)
+                if parent:
+                    _make_dirs(parent, created)
+                
+                with zf.open(info) as source, open(target, 'wb') as dest:
+                    written.append(target)
+                    while True:
+                        if shutdown_requested:
+                            raise ArchiveLimitError("interrupted")
+                        chunk = source.read(ZIP_COPY_CHUNK)
+                        if not chunk:
+                            break
+                        throttle_read(len(chunk))
+                        result['bytes'] += len(chunk)
+                        if budget is not None and result['bytes'] > budget:
+                            raise ArchiveLimitError(
+                                f"expanded past the {format_size(budget)} budget")
+                        dest.write(chunk)
+                        if progress:
+                            progress(len(chunk))
+                result['members'] += 1
+    except (OSError, zipfile.BadZipFile, zipfile.LargeZipFile, ArchiveLimitError,
+            NotImplementedError, RuntimeError, EOFError) as e:
+        result['error'] = str(e) or e.__class__.__name__
+        for path in reversed(written):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        # Deepest first; a directory something else has written into since is left alone
+        for directory in reversed(created):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+    timings.add('unzip', time.perf_counter() - start, result['bytes'])
+    return result
 
-def unzip_files_in_directory(dir_path, pretend=True):
-    """Unzip any ZIP files found in the directory."""
-    zip_files = []
-    for item in os.listdir(dir_path):
-        if item.lower().endswith('.zip'):
-            zip_files.append(os.path.join(dir_path, item))
+class ArchiveStage:
+    """
+    Background pipeline stage that extracts ZIP archives off the walk's thread.
     
-    for zip_file in zip_files:
+    Archives are submitted per directory as the walk finds them. Results are either
+    collected with wait() when the caller is about to judge that directory, or handed
+    to a completion callback. Submitting only blocks when more archives are queued than
+    the stage allows.
+    """
+
+    def __init__(self, workers=1, max_ratio=DEFAULT_ZIP_MAX_RATIO, max_size=None):
+        self.max_ratio = max_ratio
+        self.max_size = max_size
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='zip')
+        self.slots = threading.BoundedSemaphore(max(1, workers) * 2)
+        self.pending = {}
+        self.running = {}
+
+    def _run(self, zip_file, dir_path):
         try:
-            if pretend:
-                print(f"  {Colors.YELLOW}📦 Would unzip:{Colors.RESET} {zip_file}")
-            else:
-                print(f"  {Colors.GREEN}📦 Unzipping:{Colors.RESET} {zip_file}")
-                with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-                    zip_ref.extractall(dir_path)
+            pbar = None
+            if output_mode != 'quiet' and os.path.getsize(zip_file) >= 64 * 1024 * 1024 and _load_tqdm():
+                pbar = tqdm(desc=os.path.basename(zip_file), unit='B', unit_scale=True, leave=False)
+            try:
+                return extract_zip_archive(zip_file, dir_path, self.max_ratio, self.max_size,
+                                           progress=pbar.update if pbar else None)
+            finally:
+                if pbar:
+                    pbar.close()
+        except OSError as e:
+            return {'members': 0, 'bytes': 0, 'archive_size': 0, 'error': str(e)}
+        finally:
+            self.slots.release()
+
+    def submit(self, dir_path, zip_files, on_done=None):
+        """
+        Queue the archives of one directory for extraction.
+        
+        Args:
+            dir_path: Directory containing the archives (and extraction target)
+            zip_files: Archive filenames in that directory
+            on_done: Optional callback receiving the list of results once every archive of
+                     this directory is finished and reported; without it, call wait()
+        """
+        entries = []
+        for name in zip_files:
+            zip_file = os.path.join(dir_path, name)
+            if text_output:
+                with output_lock:
+                    print(f"  {Colors.GREEN}📦 Unzipping:{Colors.RESET} {zip_file}")
+            self.slots.acquire()
+            entries.append((zip_file, self.executor.submit(self._run, zip_file, dir_path)))
+        if on_done is None:
+            self.pending.setdefault(dir_path, []).extend(entries)
+            return
+        if not entries:
+            on_done([])
+            return
+        self.running[dir_path] = entries
+        
+        remaining = [len(entries)]
+        lock = threading.Lock()
+        
+        def finished(_future):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            results = [self._report(zip_file, future.result()) for zip_file, future in entries]
+            self.running.pop(dir_path, None)
+            on_done(results)
+        
+        for _, future in entries:
+            future.add_done_callback(finished)
+
+    def _report(self, zip_file, result):
+        """Remove a successfully extracted archive and report the outcome."""
+        if result['error'] is None:
+            try:
                 os.remove(zip_file)
-            stats['zip_files_processed'] += 1
-        except Exception as e:
-            print(f"  {Colors.RED}❌ Error processing {zip_file}: {e}{Colors.RESET}")
+            except OSError as e:
+                result['error'] = str(e)
+        with output_lock:
+            if result['error'] is None:
+                if text_output:
+                    print(f"  {Colors.GREEN}✅ Extracted:{Colors.RESET} {os.path.basename(zip_file)} "
+                          f"{Colors.CYAN}({result['members']} files, {format_size(result['bytes'])}){Colors.RESET}")
+            else:
+                print(f"  {Colors.RED}❌ Error processing {zip_file}: {result['error']}{Colors.RESET}")
+        if result['error'] is None:
+            report_action('unzip', zip_file, size=result['bytes'], members=result['members'])
+        else:
+            report_action('error', zip_file, 'unzip', error=result['error'])
+        if result['error'] is None:
+            count('zip_files_processed')
+            count('zip_bytes_extracted', result['bytes'])
+        else:
+            count('zip_files_failed')
+        return result
+
+    def has_pending(self, dir_path):
+        return dir_path in self.pending
+
+    def wait(self, dir_path):
+        """
+        Wait for the archives queued for a directory without a callback and report them.
+        
+        Returns:
+            List of result dictionaries from extract_zip_archive
+        """
+        return [self._report(zip_file, future.result()) for zip_file, future in self.pending.pop(dir_path, [])]
+
+    def wait_idle(self, dir_path):
+        """Block until no extraction is running in a directory (results are reported by their callback)."""
+        for _, future in list(self.running.get(dir_path, [])):
+            future.result()
+
+    def wait_all(self):
+        for dir_path in list(self.pending):
+            self.wait(dir_path)
+
+    def shutdown(self):
+        self.wait_all()
+        self.executor.shutdown(wait=True)
+
+def configure_archive_stage(workers=1, max_ratio=DEFAULT_ZIP_MAX_RATIO, max_size=None):
+    """Configure the background ZIP extraction stage used by delete_matching_dirs."""
+    global archive_stage
+    shutdown_archive_stage()
+    archive_stage = ArchiveStage(workers, max_ratio, max_size)
+
+def shutdown_archive_stage():
+    """Finish outstanding extractions and stop the ZIP extraction stage."""
+    global archive_stage
+    if archive_stage is not None:
+        archive_stage.shutdown()
+        archive_stage = None
+
+def unzip_files_in_directory(dir_path, pretend=True, zip_files=None):
+    """
+    Unzip any ZIP files found in the directory, synchronously.
+    
+    Args:
+        dir_path: Directory containing the archives
+        pretend: Whether to only show what would be unzipped
+        zip_files: Optional list of archive filenames already known from the walk;
+                   the directory is listed when not given
+    """
+    if zip_files is None:
+        zip_files = [item for item in os.listdir(dir_path) if item.lower().endswith('.zip')]
+    
+    if pretend:
+        for item in zip_files:
+            if text_output:
+                with output_lock:
+                    print(f"  {Colors.YELLOW}📦 Would unzip:{Colors.RESET} {os.path.join(dir_path, item)}")
+            report_action('unzip', os.path.join(dir_path, item), pretend=True)
+            count('zip_files_processed')
+            if plan_writer is not None:
+                plan_writer.add('unzip', os.path.join(dir_path, item))
+        return
+    
+    stage = archive_stage or ArchiveStage()
+    stage.submit(dir_path, zip_files)
+    stage.wait(dir_path)
+    if stage is not archive_stage:
+        stage.shutdown()
 
 def is_directory_empty(dir_path):
     """Check if directory is empty (no files or subdirectories)."""
@@ -123,6 +580,7 @@ def format_size(size_bytes):
     s = round(size_bytes / p, 2)
     return f"{s} {size_names[i]}"
 
+@timed_stage('directory_size')
 def get_directory_size(dir_path, chunk_size=1000):
     """
     Calculate total size of directory with memory-efficient chunked processing.
@@ -165,275 +623,3029 @@ def get_directory_size(dir_path, chunk_size=1000):
         pass
     return total_size
 
-def should_delete(dirname, delete_dash_one=True):
-    """Check if any of the keywords are in the directory name, if it contains a date, or ends with '-1'."""
-    keyword_match = any(pattern.search(dirname) for pattern in KEYWORD_PATTERNS.values())
-    dash_one_match = delete_dash_one and dirname.strip().endswith('-1')
-    return keyword_match or contains_embedded_date(dirname) or dash_one_match
+class DirRecord:
+    """
+    A directory visited by walk_tree, holding the entries read by a single os.scandir pass.
 
-def highlight_deletion_reason(dirname, delete_dash_one=True):
+    Attributes:
+        path: Full path of the directory
+        files: Mapping of filename -> os.stat_result (None if the entry could not be stat'ed)
+        dirnames: Names of subdirectories (including symlinks to directories, like os.walk)
+        children: Mapping of dirname -> DirRecord for subdirectories already yielded by the walk
+        total_size: Bytes in the whole subtree, filled in once the walk has moved past the directory
+        total_files: Number of files in the whole subtree, filled in alongside total_size
+        unchanged: Number of directories in the subtree when an incremental run skipped it as
+                   unchanged (its entries were not read), None for directories that were scanned
     """
-    Highlight the reason why a directory would be deleted.
-    Returns the directory name with highlighted keywords/dates and reason.
+    __slots__ = ('path', 'files', 'dirnames', 'children', 'walk_dirnames', 'total_size', 'total_files', 'unchanged')
+
+    def __init__(self, path):
+        self.path = path
+        self.files = {}
+        self.dirnames = []
+        self.children = {}
+        self.walk_dirnames = []
+        self.total_size = None
+        self.total_files = None
+        self.unchanged = None
+
+    @property
+    def filenames(self):
+        return list(self.files)
+
+    def file_size(self, filename):
+        """Return the cached size of a file in this directory, or None if it is unknown."""
+        st = self.files.get(filename)
+        return st.st_size if st is not None else None
+
+    def is_empty(self):
+        """Check if the directory is empty based on the cached entries."""
+        return not self.files and not self.dirnames
+
+    def subtree_totals(self):
+        """
+        Return (size in bytes, file count) for the whole subtree without touching the disk.
+
+        Uses the cached totals once finalized, otherwise sums this directory's cached
+        entries with the totals of the subdirectory records attached to it.
+        """
+        if self.total_size is not None:
+            return self.total_size, self.total_files
+        size = 0
+        count = 0
+        for st in self.files.values():
+            count += 1
+            if st is not None:
+                size += st.st_size
+        for child in self.children.values():
+            child_size, child_count = child.subtree_totals()
+            size += child_size
+            count += child_count
+        return size, count
+
+    def finalize(self):
+        """Freeze the subtree totals and drop the subdirectory records they were built from."""
+        self.total_size, self.total_files = self.subtree_totals()
+        self.children = {}
+
+    def apply_extraction(self, results):
+        """
+        Refresh the cached entries after archives were extracted into this directory.
+        
+        Args:
+            results: Result dictionaries from extract_zip_archive
+        """
+        scan_directory(self.path, self)
+        if self.total_size is not None:
+            for result in results:
+                if result['error'] is None:
+                    self.total_size += result['bytes'] - result['archive_size']
+                    self.total_files += result['members'] - 1
+
+    def remove_file(self, filename):
+        """Forget a file that has been deleted from disk."""
+        self.files.pop(filename, None)
+
+    def remove_dir(self, dirname):
+        """Forget a subdirectory that has been deleted from disk."""
+        if dirname in self.dirnames:
+            self.dirnames.remove(dirname)
+        self.children.pop(dirname, None)
+
+def ignore_files(*paths):
+    """Keep the walk away from files and directories the script itself writes, wherever they are."""
+    for path in paths:
+        path = os.path.abspath(path)
+        ignored_paths.setdefault(os.path.dirname(path), set()).add(os.path.basename(path))
+
+def ignored_in(dir_path):
+    """Names of the entries of dir_path registered with ignore_files."""
+    return ignored_paths.get(os.path.abspath(dir_path), frozenset())
+
+@timed_stage('scan')
+def scan_directory(dir_path, record=None, names=None):
     """
-    highlighted_name = dirname
-    reasons = []
-    # Check for keywords and highlight them using pre-compiled patterns
-    for keyword, pattern in KEYWORD_PATTERNS.items():
-        if pattern.search(dirname):
-            highlighted_name = pattern.sub(f"{Colors.BG_RED}{Colors.WHITE}{keyword.upper()}{Colors.RESET}", highlighted_name)
-            reasons.append(f"keyword '{Colors.BOLD}{keyword}{Colors.RESET}'")
-    # Check for embedded dates and highlight them
-    if contains_embedded_date(dirname):
-        matches = list(COMBINED_DATE_PATTERN.finditer(dirname))
-        if matches:
-            for match in reversed(matches):
-                date_text = match.group()
-                highlighted_date = f"{Colors.BG_YELLOW}{Colors.BOLD}{date_text}{Colors.RESET}"
-                highlighted_name = highlighted_name[:match.start()] + highlighted_date + highlighted_name[match.end():]
-            reasons.append(f"embedded date pattern")
-    # Check for '-1' suffix
-    if delete_dash_one and dirname.strip().endswith('-1'):
-        highlighted_name = re.sub(r'(-1)$', f"{Colors.BG_RED}{Colors.WHITE}-1{Colors.RESET}", highlighted_name)
-        reasons.append(f"ends with '-1' (likely duplicate)")
-    if reasons:
-        reason_str = f" {Colors.CYAN}[Reason: {', '.join(reasons)}]{Colors.RESET}"
-    else:
-        reason_str = ""
-    return highlighted_name + reason_str
+    Read a directory with a single os.scandir call.
 
-def contains_embedded_date(s: str) -> bool:
+    Args:
+        dir_path: Path to directory
+        record: Optional existing DirRecord to refresh in place
+        names: Optional names to read instead of listing the directory; each is stat'ed
+               individually and names that don't exist are left out
+
+    Returns:
+        DirRecord, or None if the directory could not be read
     """
-    Returns True if the string contains a date in any of the following formats,
-    but only if the string contains other text besides the date itself.
-    Returns False if the string starts with a date followed by a '/' (e.g., '2025-07-10/...').
-    Returns True if the string starts with a date + '/' but the rest ALSO contains a date.
+    if record is None:
+        record = DirRecord(dir_path)
+    else:
+        record.files = {}
+        record.dirnames = []
+        record.walk_dirnames = []
+    ignored = ignored_in(dir_path)
+    if names is not None:
+        if not os.path.isdir(dir_path):
+            return None
+        for name in names:
+            if name in ignored:
+                continue
+            entry_path = os.path.join(dir_path, name)
+            try:
+                st = os.stat(entry_path)
+            except OSError:
+                # Dangling symlinks are listed as files, like os.scandir does
+                if os.path.lexists(entry_path):
+                    record.files[name] = None
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                record.dirnames.append(name)
+                if not os.path.islink(entry_path):
+                    record.walk_dirnames.append(name)
+            else:
+                record.files[name] = st
+        throttle_metadata(1 + len(names))
+        return record
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                if entry.name in ignored:
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    record.dirnames.append(entry.name)
+                    # Like os.walk(followlinks=False): list symlinked directories but don't descend
+                    try:
+                        if not entry.is_symlink():
+                            record.walk_dirnames.append(entry.name)
+                    except OSError:
+                        pass
+                else:
+                    try:
+                        record.files[entry.name] = entry.stat()
+                    except OSError:
+                        record.files[entry.name] = None
+    except OSError:
+        return None
+    throttle_metadata(1 + len(record.files) + len(record.dirnames))
+    return record
+
+def walk_tree(root_dir, on_discover=None, finalize=True, indexes=(), only=None):
     """
-    # Check for date at the very start followed by '/' using pre-compiled pattern
-    if START_DATE_PATTERN.match(s):
-        # If there is another date after the '/', return True; else False
-        rest = s.split('/', 1)[1]
-        if COMBINED_DATE_PATTERN.search(rest):
-            # Check that it's embedded, not just another date alone
-            matches = list(COMBINED_DATE_PATTERN.finditer(rest))
-            for match in matches:
-                before = rest[:match.start()]
-                after = rest[match.end():]
-                if before.strip() or after.strip():
-                    return True
-            return False
-        return False
+    Walk a directory tree bottom-up in a single pass, yielding a DirRecord per directory.
 
-    # Main logic for other cases using pre-compiled pattern
-    matches = list(COMBINED_DATE_PATTERN.finditer(s))
-    if not matches:
-        return False
-    for match in matches:
-        before = s[:match.start()]
-        after = s[match.end():]
-        if before.strip() or after.strip():
-            return True
-    return False
+    Each directory is read once with os.scandir; subdirectory records are attached to their
+    parent's `children` before the parent is yielded, so callers can evaluate subdirectories
+    without touching the disk again.
+
+    Args:
+        root_dir: Root directory to walk
+        on_discover: Optional callback receiving the number of newly discovered subdirectories,
+                     used to grow an estimated progress total while the walk proceeds
+        finalize: Freeze each record's totals when the caller resumes the walk; callers that
+                  process records asynchronously pass False and call DirRecord.finalize themselves
+        indexes: Optional DirIndex objects; subdirectories one of them reports as unchanged are
+                 attached to their parent as DirRecord.unchanged placeholders instead of being
+                 read and yielded
+        only: Optional set of names in root_dir to process; the root record then lists just
+              those files and subdirectories, and everything else in root_dir is left alone
 
-def delete_matching_dirs(root_dir, pretend=True, check_sfv=True, delete_dash_one=True):
-    """Recursively process directories under root_dir with optimized single-pass processing."""
+    Yields:
+        DirRecord for each directory, children before parents (like os.walk(topdown=False))
+    """
     global shutdown_requested
-    deleted = 0
-    
-    print(f"\n{Colors.CYAN}🔍 Scanning directories...{Colors.RESET}")
-    
-    # First, count total directories for progress indication
-    total_dirs = 0
-    total_files = 0
-    if TQDM_AVAILABLE:
-        print(f"{Colors.BLUE}📊 Counting items for progress tracking...{Colors.RESET}")
-        for dirpath, dirnames, filenames in os.walk(root_dir):
-            if shutdown_requested:
-                return deleted
-            total_dirs += len(dirnames)
-            total_files += len(filenames)
+    root = scan_directory(root_dir, names=sorted(only) if only is not None else None)
+    if root is None:
+        return
+    if on_discover:
+        on_discover(len(root.dirnames))
+    stack = [(root, iter(root.walk_dirnames))]
+    while stack:
+        if shutdown_requested:
+            return
+        record, pending = stack[-1]
+        dirname = next(pending, None)
+        if dirname is not None:
+            child_path = os.path.join(record.path, dirname)
+            unchanged = None
+            for index in indexes:
+                unchanged = index.unchanged_subtree(child_path)
+                if unchanged is not None:
+                    break
+            if unchanged is not None:
+                record.children[dirname] = unchanged
+                continue
+            child = scan_directory(child_path)
+            if child is not None:
+                record.children[dirname] = child
+                if on_discover:
+                    on_discover(len(child.dirnames))
+                stack.append((child, iter(child.walk_dirnames)))
+            continue
+        stack.pop()
+        yield record
+        # The parent only needs this record's totals, not its subdirectory records. Totals are
+        # taken after the caller has processed the record, so deletions are already reflected.
+        if finalize:
+            record.finalize()
+
+class DirIndex:
+    """
+    On-disk index of processed directories, used by incremental mode (across runs) and by
+    the checkpoint journal (within one interrupted and resumed run).
     
-    # Single-pass processing with progress indication
-    processed_dirs = 0
-    directories_to_process = []
+    For every directory it records the device, inode and mtime after processing, the names
+    of its subdirectories, its subtree totals and the decision its parent made about it
+    ('kept' or 'sfv_passed'). A directory's mtime changes whenever an entry is added, removed
+    or renamed in it, so a subtree whose directories all still match their recorded stamps,
+    and were all kept, would be judged the same way again and can be skipped. Files rewritten
+    in place do not change the mtime and are not noticed; remove the index to force a full pass.
     
-    # Collect all directories and files in a single walk
-    print(f"\n{Colors.MAGENTA}🔄 Processing directories and files...{Colors.RESET}")
+    The index is only valid for the settings it was built with; opening it with different
+    keywords or checks starts it over. Pretend runs use the index without updating it.
+    """
+    COMMIT_EVERY = 500
+    COMMIT_INTERVAL = 10
+    KEPT = ('kept', 'sfv_passed')
+
+    def __init__(self, db_path, root_dir, settings, read_only=False):
+        self.db_path = db_path
+        self.prefix = os.path.join(root_dir, '')
+        self.root_dir = root_dir
+        self.read_only = read_only
+        self.lock = threading.Lock()
+        self.uncommitted = 0
+        self.last_commit = time.monotonic()
+        import sqlite3
+        self.conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self.conn.execute('CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS dirs ('
+            ' path TEXT PRIMARY KEY, dev INTEGER NOT NULL, ino INTEGER NOT NULL, mtime_ns INTEGER NOT NULL,'
+            ' subdirs TEXT NOT NULL, total_size INTEGER NOT NULL, total_files INTEGER NOT NULL, decision TEXT)')
+        row = self.conn.execute("SELECT value FROM settings WHERE key = 'settings'").fetchone()
+        self.reset = row is not None and row[0] != settings
+        if self.reset:
+            if read_only:
+                # Entries from other settings are of no use, but a pretend run must not drop them
+                self.conn.close()
+                self.conn = sqlite3.connect(':memory:', check_same_thread=False)
+                self.conn.execute(
+                    'CREATE TABLE dirs (path TEXT PRIMARY KEY, dev INTEGER, ino INTEGER, mtime_ns INTEGER,'
+                    ' subdirs TEXT, total_size INTEGER, total_files INTEGER, decision TEXT)')
+            else:
+                self.conn.execute('DELETE FROM dirs')
+        if not read_only:
+            self.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('settings', ?)", (settings,))
+        self.conn.commit()
+
+    def _key(self, path):
+        """Index key of a walked path: relative to the root directory, '' for the root itself."""
+        if path == self.root_dir:
+            return ''
+        return path[len(self.prefix):] if path.startswith(self.prefix) else path
+
+    def _commit_later(self):
+        """Commit in batches of COMMIT_EVERY changes, or COMMIT_INTERVAL seconds when progress is slow."""
+        self.uncommitted += 1
+        now = time.monotonic()
+        if self.uncommitted >= self.COMMIT_EVERY or now - self.last_commit >= self.COMMIT_INTERVAL:
+            self.conn.commit()
+            self.uncommitted = 0
+            self.last_commit = now
+
+    def _forget_key(self, key):
+        # Subtree of 'a/b' is 'a/b' plus every key in ['a/b/', 'a/b0'), '0' sorting right after '/'
+        self.conn.execute('DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)',
+                          (key, key + '/', key + '0'))
+
+    def unchanged_subtree(self, dir_path):
+        """
+        Check whether a directory and everything below it are as the index recorded them.
+        
+        Costs one stat per directory in the subtree; no directory is listed.
+        
+        Returns:
+            A placeholder DirRecord carrying the recorded subtree totals, or None if the
+            subtree has to be scanned
+        """
+        # An 'extr' directory's SFV check also reads its parent, which has changed
+        if os.path.basename(dir_path).lower() == 'extr':
+            return None
+        top = self._key(dir_path)
+        pending = [top]
+        directories = 0
+        totals = None
+        while pending:
+            key = pending.pop()
+            with self.lock:
+                row = self.conn.execute(
+                    'SELECT dev, ino, mtime_ns, subdirs, total_size, total_files, decision FROM dirs WHERE path = ?',
+                    (key,)).fetchone()
+            if row is None or row[6] not in self.KEPT:
+                return None
+            throttle_metadata()
+            try:
+                st = os.stat(os.path.join(self.root_dir, key))
+            except OSError:
+                return None
+            if (st.st_dev, st.st_ino, st.st_mtime_ns) != row[:3]:
+                return None
+            if key == top:
+                totals = row[4:6]
+            directories += 1
+            if row[3]:
+                pending.extend(f"{key}/{name}" for name in row[3].split('/'))
+        record = DirRecord(dir_path)
+        record.total_size, record.total_files = totals
+        record.unchanged = directories
+        return record
+
+    def store(self, record):
+        """Record a scanned directory once it has been processed; its decision is made later by its parent."""
+        if self.read_only:
+            return
+        try:
+            st = os.stat(record.path)
+        except OSError:
+            return
+        key = self._key(record.path)
+        # Unreadable subdirectories are listed too: with no entry of their own they keep
+        # this directory from being skipped until they have been scanned
+        dirnames = set(record.dirnames)
+        subdirs = [name for name in record.walk_dirnames if name in dirnames]
+        total_size, total_files = record.subtree_totals()
+        with self.lock:
+            row = self.conn.execute('SELECT subdirs FROM dirs WHERE path = ?', (key,)).fetchone()
+            if row is not None and row[0]:
+                # Subdirectories that have gone away take their entries with them
+                prefix = f"{key}/" if key else ''
+                for name in set(row[0].split('/')).difference(subdirs):
+                    self._forget_key(prefix + name)
+            self.conn.execute(
+                'INSERT OR REPLACE INTO dirs (path, dev, ino, mtime_ns, subdirs, total_size, total_files, decision)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, NULL)',
+                (key, st.st_dev, st.st_ino, st.st_mtime_ns, '/'.join(subdirs), total_size, total_files))
+            self._commit_later()
+
+    def keep(self, dir_path, decision):
+        """Record that a directory was judged and kept, refreshing its stamp (SFV checks may rename files)."""
+        if self.read_only:
+            return
+        try:
+            st = os.stat(dir_path)
+        except OSError:
+            st = None
+        with self.lock:
+            if st is None:
+                self._forget_key(self._key(dir_path))
+            else:
+                self.conn.execute('UPDATE dirs SET decision = ?, dev = ?, ino = ?, mtime_ns = ? WHERE path = ?',
+                                  (decision, st.st_dev, st.st_ino, st.st_mtime_ns, self._key(dir_path)))
+            self._commit_later()
+
+    def flush(self):
+        """Commit pending changes."""
+        with self.lock:
+            self.conn.commit()
+            self.uncommitted = 0
+            self.last_commit = time.monotonic()
+
+    def forget(self, dir_path):
+        """Drop a deleted directory and everything below it."""
+        if self.read_only:
+            return
+        with self.lock:
+            self._forget_key(self._key(dir_path))
+            self._commit_later()
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+def open_dir_index(db_path, root_dir, settings, read_only=False):
+    """
+    Open the incremental-mode directory index used by the cleanup pipeline.
     
-    # Use progress bar if available
-    pbar = None
-    if TQDM_AVAILABLE and total_dirs > 0:
-        pbar = tqdm(total=total_dirs, desc="Processing directories", 
-                   bar_format='{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]')
+    Args:
+        db_path: Path to the SQLite database (created if missing)
+        root_dir: Root directory the walk starts from; entries are stored relative to it
+        settings: Description of the settings that affect decisions; a mismatch discards the index
+        read_only: Use the index without recording anything (pretend mode)
     
+    Returns:
+        True if the index is available
+    """
+    import sqlite3
+    global dir_index
+    close_dir_index()
     try:
-        for dirpath, dirnames, filenames in os.walk(root_dir, topdown=False):
-            if shutdown_requested:
-                print(f"\n{Colors.YELLOW}🛑 Operation interrupted by user{Colors.RESET}")
-                break
-            
-            # Update statistics for files in this directory
-            stats['total_files'] += len(filenames)
-            
-            # Count file types and calculate total file size
-            for filename in filenames:
-                if shutdown_requested:
-                    break
-                    
-                ext = os.path.splitext(filename)[1].lower()
-                if ext:
-                    stats[f'files_{ext[1:]}'] += 1
-                else:
-                    stats['files_no_extension'] += 1
-                    
-                # Calculate total file size
-                try:
-                    file_path = os.path.join(dirpath, filename)
-                    file_size = os.path.getsize(file_path)
-                    stats['total_size_bytes'] += file_size
-                    
-                    # Check if this is an image file that should be deleted
-                    if ext in IMAGE_EXTENSIONS:
-                        should_delete_img, reason = should_delete_image(file_path, filename)
-                        if should_delete_img:
-                            if pretend:
-                                print(f"  {Colors.YELLOW}🖼️  Would delete image:{Colors.RESET} {filename} {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
-                                print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {file_path} {Colors.CYAN}({format_size(file_size)}){Colors.RESET}")
-                                stats['images_deleted'] += 1
-                                stats['total_size_deleted_bytes'] += file_size
-                            else:
-                                print(f"  {Colors.RED}🖼️  Deleting image:{Colors.RESET} {filename} {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
-                                print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {file_path} {Colors.CYAN}({format_size(file_size)}){Colors.RESET}")
-                                try:
-                                    os.remove(file_path)
-                                    stats['images_deleted'] += 1
-                                    stats['total_size_deleted_bytes'] += file_size
-                                except OSError as e:
-                                    print(f"    {Colors.RED}❌ Error deleting image: {e}{Colors.RESET}")
-                        
-                except (OSError, FileNotFoundError):
-                    pass
-            
-            # Process ZIP files in this directory
-            if filenames and not shutdown_requested:
-                zip_files = [f for f in filenames if f.lower().endswith('.zip')]
-                if zip_files:
-                    print(f"\n{Colors.BLUE}📂 Processing ZIP files in: {dirpath}{Colors.RESET}")
-                    unzip_files_in_directory(dirpath, pretend)
-            
-            # Process directories for potential deletion
-            for dirname in dirnames:
-                if shutdown_requested:
-                    break
-                    
-                full_path = os.path.join(dirpath, dirname)
-                processed_dirs += 1
-                stats['total_directories'] += 1
-                
-                # Update progress bar
-                if pbar:
-                    pbar.update(1)
-                
-                # Check if directory should be deleted based on keywords/dates or '-1' suffix first
-                if should_delete(dirname, delete_dash_one=delete_dash_one):
-                    dir_size = get_directory_size(full_path)
-                    highlighted_info = highlight_deletion_reason(dirname, delete_dash_one=delete_dash_one)
-                    if pretend:
-                        print(f"  {Colors.YELLOW}🗑️  Would delete:{Colors.RESET} {highlighted_info}")
-                        print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {full_path} {Colors.CYAN}({format_size(dir_size)}){Colors.RESET}")
-                        stats['keyword_directories_deleted'] += 1
-                        deleted += 1
-                        stats['total_size_deleted_bytes'] += dir_size
-                    else:
-                        print(f"  {Colors.RED}🗑️  Deleting:{Colors.RESET} {highlighted_info}")
-                        print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {full_path} {Colors.CYAN}({format_size(dir_size)}){Colors.RESET}")
-                        try:
-                            shutil.rmtree(full_path)
-                            stats['keyword_directories_deleted'] += 1
-                            deleted += 1
-                            stats['total_size_deleted_bytes'] += dir_size
-                        except OSError as e:
-                            print(f"    {Colors.RED}❌ Error deleting: {e}{Colors.RESET}")
-                    continue
-                
-                # Check SFV integrity (only if not already marked for deletion and SFV checking is enabled)
-                if check_sfv:
-                    should_delete_sfv, sfv_reason, sfv_details, sfv_target_path = check_sfv_integrity(full_path)
-                    if should_delete_sfv:
-                        # Use the target path (might be parent directory if SFV is in 'extr')
-                        dir_size = get_directory_size(sfv_target_path)
-                        
-                        # Get the display name for the target directory
-                        target_dirname = os.path.basename(sfv_target_path)
-                        
-                        if pretend:
-                            print(f"  {Colors.YELLOW}🗑️  Would delete (SFV failed):{Colors.RESET} {target_dirname}")
-                            print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {sfv_target_path} {Colors.CYAN}({format_size(dir_size)}){Colors.RESET}")
-                            print(f"    {Colors.CYAN}[Reason: {sfv_reason}]{Colors.RESET}")
-                            if sfv_details:
-                                print_sfv_details(sfv_details, dirname)
-                            stats['sfv_failed_directories_deleted'] += 1
-                            deleted += 1
-                            stats['total_size_deleted_bytes'] += dir_size
-                        else:
-                            print(f"  {Colors.RED}🗑️  Deleting (SFV failed):{Colors.RESET} {target_dirname}")
-                            print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {sfv_target_path} {Colors.CYAN}({format_size(dir_size)}){Colors.RESET}")
-                            print(f"    {Colors.CYAN}[Reason: {sfv_reason}]{Colors.RESET}")
-                            if sfv_details:
-                                print_sfv_details(sfv_details, dirname)
-                            try:
-                                shutil.rmtree(sfv_target_path)
-                                stats['sfv_failed_directories_deleted'] += 1
-                                deleted += 1
-                                stats['total_size_deleted_bytes'] += dir_size
-                            except OSError as e:
-                                print(f"    {Colors.RED}❌ Error deleting: {e}{Colors.RESET}")
-                        continue
-                
-                # Check if directory is empty and delete it (only if not already matched above)
-                elif is_directory_empty(full_path):
-                    if pretend:
-                        print(f"  {Colors.YELLOW}🗂️  Would delete empty directory:{Colors.RESET} {dirname}")
-                        print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {full_path}")
-                        stats['empty_directories_deleted'] += 1
-                        deleted += 1
-                    else:
-                        print(f"  {Colors.GREEN}🗂️  Deleting empty directory:{Colors.RESET} {dirname}")
-                        print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {full_path}")
-                        try:
-                            os.rmdir(full_path)
-                            stats['empty_directories_deleted'] += 1
-                            deleted += 1
-                        except OSError as e:
-                            print(f"    {Colors.RED}❌ Error deleting: {e}{Colors.RESET}")
-                            continue
-                
-                # Small delay to allow for interruption on large operations
-                if processed_dirs % 100 == 0:
-                    time.sleep(0.001)
-    
-    finally:
-        if pbar:
-            pbar.close()
-        
-        if shutdown_requested:
-            print(f"\n{Colors.YELLOW}⚠️  Operation was interrupted. Partial results displayed.{Colors.RESET}")
-    
-    return deleted
+        dir_index = DirIndex(db_path, root_dir, settings, read_only=read_only)
+    except sqlite3.Error as e:
+        print(f"{Colors.RED}❌ Could not open directory index {db_path}: {e}{Colors.RESET}")
+        return False
+    ignore_files(*(db_path + suffix for suffix in ('', '-journal', '-wal', '-shm')))
+    return True
 
-def print_statistics():
-    """Print comprehensive statistics about the operation."""
-    end_time = time.time()
-    duration = end_time - start_time
+def close_dir_index():
+    """Flush and close the incremental-mode directory index."""
+    global dir_index
+    if dir_index is not None:
+        dir_index.close()
+        dir_index = None
+
+def open_checkpoint(db_path, root_dir, settings, resume=False):
+    """
+    Start the checkpoint journal of this run.
     
-    print(f"\n{Colors.BOLD}{Colors.BG_BLUE}                    OPERATION STATISTICS                    {Colors.RESET}")
-    print(f"{Colors.BOLD}{'='*60}{Colors.RESET}")
+    The journal is a DirIndex recording every directory as it is completed, so an
+    interrupted run can be resumed without walking, classifying or verifying completed
+    subtrees again.
     
-    # Time and performance stats
-    print(f"{Colors.CYAN}⏱️  Execution Time:{Colors.RESET} {duration:.2f} seconds")
+    Args:
+        db_path: Path to the journal database
+        root_dir: Root directory of the run
+        settings: Description of the settings that affect decisions; a journal written with
+                  other settings is not resumed
+        resume: Continue from an existing journal instead of starting a new one
     
-    # Directory and file statistics
-    print(f"\n{Colors.BOLD}{Colors.UNDERLINE}📁 Directory & File Overview:{Colors.RESET}")
+    Returns:
+        True if the journal is available
+    """
+    import sqlite3
+    global checkpoint
+    close_checkpoint()
+    if not resume:
+        remove_checkpoint_files(db_path)
+    elif not os.path.exists(db_path):
+        print(f"{Colors.YELLOW}⚠️  No checkpoint found at {db_path}; starting from the beginning{Colors.RESET}")
+    try:
+        checkpoint = DirIndex(db_path, root_dir, settings)
+    except sqlite3.Error as e:
+        print(f"{Colors.RED}❌ Could not open checkpoint journal {db_path}: {e}{Colors.RESET}")
+        return False
+    if resume and checkpoint.reset:
+        print(f"{Colors.YELLOW}⚠️  The checkpoint was written with other settings; starting from the beginning{Colors.RESET}")
+    ignore_files(*(db_path + suffix for suffix in ('', '-journal', '-wal', '-shm')))
+    return True
+
+def close_checkpoint(completed=False):
+    """
+    Flush and close the checkpoint journal.
+    
+    Args:
+        completed: The run finished, so the journal is removed instead of kept for --resume
+    """
+    global checkpoint
+    if checkpoint is not None:
+        checkpoint.close()
+        if completed:
+            remove_checkpoint_files(checkpoint.db_path)
+        checkpoint = None
+
+def remove_checkpoint_files(db_path):
+    for suffix in ('', '-journal', '-wal', '-shm'):
+        try:
+            os.remove(db_path + suffix)
+        except FileNotFoundError:
+            pass
+
+def load_keywords(keywords_path):
+    """
+    Read deletion keywords from a text file, one per line.
+    
+    Blank lines and lines starting with '#' are ignored.
+    
+    Args:
+        keywords_path: Path to the keywords file
+    
+    Returns:
+        List of keywords, or None if the file could not be read
+    """
+    try:
+        with open(keywords_path, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"{Colors.RED}❌ Could not read keywords file {keywords_path}: {e}{Colors.RESET}")
+        return None
+    return [line for line in lines if line and not line.startswith('#')]
+
+class NameMatch:
+    """Result of classifying one directory name, shared by the delete decision and its highlighting."""
+    __slots__ = ('name', 'keywords', 'dates', 'dash_one', 'spans')
+
+    def __init__(self, name):
+        self.name = name
+        self.keywords = []      # matched keywords, in keyword list order
+        self.dates = False      # name contains an embedded date
+        self.dash_one = False   # name ends with '-1'
+        self.spans = []         # (start, end, kind, keyword) of every highlighted match
+
+    def __bool__(self):
+        return bool(self.keywords or self.dates or self.dash_one)
+
+    def reasons(self):
+        """Human readable reasons, matching the order they are checked in."""
+        reasons = [f"keyword '{Colors.BOLD}{keyword}{Colors.RESET}'" for keyword in self.keywords]
+        if self.dates:
+            reasons.append("embedded date pattern")
+        if self.dash_one:
+            reasons.append("ends with '-1' (likely duplicate)")
+        return reasons
+
+    def highlight(self):
+        """Return the name with matched keywords/dates highlighted, followed by the reasons."""
+        parts = []
+        pos = 0
+        for start, end, kind, keyword in self.spans:
+            if kind == 'date' and not self.dates:
+                continue
+            parts.append(self.name[pos:start])
+            if kind == 'date':
+                parts.append(f"{Colors.BG_YELLOW}{Colors.BOLD}{self.name[start:end]}{Colors.RESET}")
+            else:
+                parts.append(f"{Colors.BG_RED}{Colors.WHITE}{keyword.upper()}{Colors.RESET}")
+            pos = end
+        parts.append(self.name[pos:])
+        reasons = self.reasons()
+        reason_str = f" {Colors.CYAN}[Reason: {', '.join(reasons)}]{Colors.RESET}" if reasons else ""
+        return ''.join(parts) + reason_str
+
+class NameClassifier:
+    """
+    Matches directory names against the deletion keywords, embedded dates and the '-1' suffix
+    with a single compiled pattern, so each name is scanned once.
+    """
+
+    def __init__(self, keywords=None):
+        self.keywords = list(dict.fromkeys(KEYWORDS if keywords is None else keywords))
+        # Canonical keyword and its position in the list, by lowercase spelling
+        self._keyword_index = {}
+        for index, keyword in enumerate(self.keywords):
+            self._keyword_index.setdefault(keyword.lower(), (index, keyword))
+        alternatives = [rf'(?P<date>{DATE_PATTERN_1}|{DATE_PATTERN_2}|{DATE_PATTERN_3})']
+        if self.keywords:
+            # Longest first, so 'Live Mix' wins over 'Live' at the same position
+            ordered = sorted(self.keywords, key=len, reverse=True)
+            keyword_alternation = '|'.join(re.escape(keyword) for keyword in ordered)
+            alternatives.append(rf'(?<![a-zA-Z0-9])(?P<keyword>{keyword_alternation})(?![a-zA-Z0-9])')
+        alternatives.append(r'(?P<dash_one>-1)(?=\s*$)')
+        self.pattern = re.compile('|'.join(alternatives), re.IGNORECASE)
+
+    def classify(self, name, delete_dash_one=True):
+        """
+        Scan a directory name once and collect every deletion reason.
+        
+        Args:
+            name: Directory name
+            delete_dash_one: Whether a trailing '-1' counts as a reason
+        
+        Returns:
+            NameMatch, true when the name should be deleted
+        """
+        result = NameMatch(name)
+        found = {}
+        date_spans = []
+        for match in self.pattern.finditer(name):
+            kind = match.lastgroup
+            start, end = match.span()
+            if kind == 'keyword':
+                text = match.group()
+                index, keyword = self._keyword_index.get(text.lower(), (len(self.keywords), text))
+                found.setdefault(keyword, index)
+                result.spans.append((start, end, kind, keyword))
+            elif kind == 'date':
+                date_spans.append((start, end))
+                result.spans.append((start, end, kind, None))
+            elif delete_dash_one:
+                result.dash_one = True
+                result.spans.append((start, end, kind, '-1'))
+        result.keywords = sorted(found, key=found.get)
+        result.dates = self._has_embedded_date(name, date_spans)
+        return result
+
+    @staticmethod
+    def _has_embedded_date(name, date_spans):
+        """
+        A date counts only when the name has other text besides it. A name starting with
+        a date followed by '/' (e.g. '2025-07-10/...') only counts if the rest embeds a date.
+        """
+        if not date_spans:
+            return False
+        text = name
+        start, end = date_spans[0]
+        if start == 0 and name[end:end + 1] == '/':
+            offset = end + 1
+            text = name[offset:]
+            date_spans = [(s - offset, e - offset) for s, e in date_spans[1:]]
+        return any(text[:s].strip() or text[e:].strip() for s, e in date_spans)
+
+# Classifier used by should_delete and the cleanup pipeline (see configure_keywords)
+name_classifier = NameClassifier()
+
+def configure_keywords(keywords):
+    """Replace the deletion keywords used to classify directory names."""
+    global name_classifier
+    name_classifier = NameClassifier(keywords)
+
+def should_delete(dirname, delete_dash_one=True):
+    """Check if any of the keywords are in the directory name, if it contains a date, or ends with '-1'."""
+    return bool(name_classifier.classify(dirname, delete_dash_one=delete_dash_one))
+
+def highlight_deletion_reason(dirname, delete_dash_one=True):
+    """
+    Highlight the reason why a directory would be deleted.
+    Returns the directory name with highlighted keywords/dates and reason.
+    """
+    return name_classifier.classify(dirname, delete_dash_one=delete_dash_one).highlight()
+
+def contains_embedded_date(s: str) -> bool:
+    """
+    Returns True if the string contains a date in any of the following formats,
+    but only if the string contains other text besides the date itself.
+    Returns False if the string starts with a date followed by a '/' (e.g., '2025-07-10/...').
+    Returns True if the string starts with a date + '/' but the rest ALSO contains a date.
+    """
+    return name_classifier.classify(s, delete_dash_one=False).dates
+
+class Quarantine:
+    """
+    Deletion by rename: condemned directories are moved into a trash directory on the same
+    filesystem, which is a constant-time operation regardless of their size, and a background
+    purge worker removes them once they are older than the retention period.
+    
+    Each entry is <trash>/<timestamp>-<pid>-<n>/<original name>, next to an ORIGIN_NAME file
+    holding the original path, so a false positive can be moved back with restore() (--restore)
+    until it is purged. Entries left behind by interrupted runs are purged by later runs.
+    """
+    ORIGIN_NAME = '.origin'
+
+    def __init__(self, trash_dir, retention_seconds=0, purge_rate=0, start_purge=True):
+        self.trash_dir = trash_dir
+        self.retention = retention_seconds
+        self.purge_rate = purge_rate
+        self.counter = itertools.count()
+        self.failed = set()
+        self.stopping = False
+        self.wakeup = threading.Condition()
+        self.last_unlink = 0.0
+        os.makedirs(trash_dir, exist_ok=True)
+        self.thread = None
+        if start_purge:
+            self.thread = threading.Thread(target=self._purge_loop, name='purge', daemon=True)
+            self.thread.start()
+
+    def add(self, dir_path):
+        """
+        Move a directory into the quarantine.
+        
+        Raises:
+            OSError: The directory could not be moved (EXDEV if it is on another filesystem)
+        """
+        entry_dir = os.path.join(self.trash_dir, f"{time.time():.0f}-{os.getpid()}-{next(self.counter)}")
+        os.mkdir(entry_dir)
+        try:
+            with open(os.path.join(entry_dir, self.ORIGIN_NAME), 'w', encoding='utf-8', errors='surrogateescape') as f:
+                f.write(os.path.abspath(dir_path) + '\n')
+            os.rename(dir_path, os.path.join(entry_dir, os.path.basename(dir_path)))
+        except OSError:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            raise
+        count('quarantined_dirs')
+        with self.wakeup:
+            self.wakeup.notify()
+
+    def entries(self):
+        """Return (created, name) for every entry in the trash directory, oldest first."""
+        found = []
+        try:
+            with os.scandir(self.trash_dir) as it:
+                for entry in it:
+                    try:
+                        created = int(entry.name.split('-', 1)[0])
+                    except ValueError:
+                        continue
+                    found.append((created, entry.name))
+        except OSError:
+            pass
+        return sorted(found)
+
+    def _next_expired(self):
+        """Return the name of the oldest entry past the retention period, or None."""
+        now = time.time()
+        for created, name in self.entries():
+            if name in self.failed:
+                continue
+            if created + self.retention <= now:
+                return name
+            break
+        return None
+
+    def _purge_loop(self):
+        while not shutdown_requested:
+            name = self._next_expired()
+            if name is not None:
+                self._purge_entry(name)
+                continue
+            with self.wakeup:
+                if self.stopping:
+                    return
+                # Woken early by add(); otherwise look again for entries that have since expired
+                self.wakeup.wait(1.0)
+
+    def _throttle(self):
+        """Pace unlinks to purge_rate files per second."""
+        if self.purge_rate <= 0:
+            return
+        delay = self.last_unlink + 1.0 / self.purge_rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.last_unlink = time.monotonic()
+
+    def _purge_entry(self, name):
+        """Remove one entry bottom-up; an interrupted purge leaves the rest for later."""
+        entry_dir = os.path.join(self.trash_dir, name)
+        files = 0
+        size = 0
+        try:
+            for dirpath, dirnames, filenames in os.walk(entry_dir, topdown=False):
+                for filename in filenames:
+                    if shutdown_requested:
+                        return
+                    file_path = os.path.join(dirpath, filename)
+                    self._throttle()
+                    throttle_metadata()
+                    size += os.lstat(file_path).st_size
+                    os.unlink(file_path)
+                    files += 1
+                for dirname in dirnames:
+                    sub_path = os.path.join(dirpath, dirname)
+                    if os.path.islink(sub_path):
+                        os.unlink(sub_path)
+                    else:
+                        os.rmdir(sub_path)
+            os.rmdir(entry_dir)
+        except OSError as e:
+            self.failed.add(name)
+            count('purge_errors')
+            with output_lock:
+                print(f"    {Colors.RED}❌ Error purging {entry_dir}: {e}{Colors.RESET}")
+            return
+        finally:
+            count('purged_files', files)
+            count('purged_bytes', size)
+        count('purged_entries')
+
+    def shutdown(self):
+        """Purge whatever has expired, then stop the purge worker (at once after an interrupt)."""
+        if self.thread is None:
+            return
+        with self.wakeup:
+            self.stopping = True
+            self.wakeup.notify()
+        self.thread.join()
+        pending = len(self.entries())
+        with stats_lock:
+            stats['quarantine_pending'] = pending
+
+    def restore(self, original_path):
+        """
+        Move quarantined directories back to where they were, newest first.
+        
+        Args:
+            original_path: Original path of a quarantined directory, or a directory above several
+        
+        Returns:
+            Tuple of (restored paths, list of (path, error) for entries that could not be restored)
+        """
+        target = os.path.abspath(original_path)
+        restored = []
+        errors = []
+        for _, name in reversed(self.entries()):
+            entry_dir = os.path.join(self.trash_dir, name)
+            origin_file = os.path.join(entry_dir, self.ORIGIN_NAME)
+            try:
+                with open(origin_file, 'r', encoding='utf-8', errors='surrogateescape') as f:
+                    origin = f.read().rstrip('\n')
+            except OSError:
+                continue
+            if not _is_within(origin, target):
+                continue
+            if os.path.lexists(origin):
+                errors.append((origin, 'the path exists again'))
+                continue
+            try:
+                os.makedirs(os.path.dirname(origin), exist_ok=True)
+                os.rename(os.path.join(entry_dir, os.path.basename(origin)), origin)
+                os.remove(origin_file)
+                os.rmdir(entry_dir)
+            except OSError as e:
+                errors.append((origin, e))
+                continue
+            restored.append(origin)
+        return restored, errors
+
+def configure_quarantine(trash_dir, retention_seconds=0, purge_rate=0, start_purge=True):
+    """
+    Move condemned directories into trash_dir instead of deleting them in place.
+    
+    Args:
+        trash_dir: Quarantine directory
+        retention_seconds: Age at which entries are purged
+        purge_rate: Maximum number of files purged per second, 0 for no limit
+        start_purge: Run the purge worker in this process (shard processes leave it to the parent)
+    
+    Returns:
+        True if the quarantine is available
+    """
+    global quarantine
+    shutdown_quarantine()
+    try:
+        quarantine = Quarantine(trash_dir, retention_seconds, purge_rate, start_purge)
+    except OSError as e:
+        print(f"{Colors.RED}❌ Could not create quarantine {trash_dir}: {e}{Colors.RESET}")
+        return False
+    ignore_files(trash_dir)
+    return True
+
+def restore_quarantined(trash_dir, paths):
+    """
+    Move quarantined directories back to their original paths (see Quarantine.restore).
+    
+    Returns:
+        True if something was restored and nothing failed
+    """
+    if not os.path.isdir(trash_dir):
+        print(f"{Colors.RED}❌ No quarantine at {trash_dir}{Colors.RESET}")
+        return False
+    trash = Quarantine(trash_dir, start_purge=False)
+    ok = True
+    for path in paths:
+        restored, errors = trash.restore(path)
+        for origin in restored:
+            print(f"{Colors.GREEN}♻️  Restored:{Colors.RESET} {origin}")
+        for origin, error in errors:
+            print(f"{Colors.RED}❌ Could not restore {origin}: {error}{Colors.RESET}")
+        if not restored and not errors:
+            print(f"{Colors.YELLOW}⚠️  Nothing quarantined from {os.path.abspath(path)}{Colors.RESET}")
+        ok = ok and bool(restored) and not errors
+    return ok
+
+def shutdown_quarantine():
+    """Stop the quarantine's purge worker."""
+    global quarantine
+    if quarantine is not None:
+        quarantine.shutdown()
+        quarantine = None
+
+class TreeDeleteError(OSError):
+    """Raised when some entries of a tree could not be removed; errors lists (path, OSError) pairs."""
+
+    def __init__(self, errors):
+        path, first = errors[0]
+        super().__init__(first.errno, first.strerror, path)
+        self.errors = errors
+
+class TreeDeleter:
+    """
+    Removes directory trees with dir_fd-relative unlink/rmdir calls, deleting sibling
+    subdirectories concurrently on a bounded thread pool.
+    
+    Unlike shutil.rmtree, a failing entry doesn't stop the deletion: the rest of the tree
+    is removed and every failure is reported. Subtrees are only handed to the pool while a
+    worker is free, otherwise they are deleted by the thread that found them, so nested
+    deletions never wait on a full pool.
+    """
+    OPEN_FLAGS = os.O_RDONLY | os.O_DIRECTORY | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_CLOEXEC', 0)
+
+    def __init__(self, workers=1):
+        self.workers = max(1, workers)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='rmtree')
+        self.slots = threading.Semaphore(self.workers)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.busy_since = 0.0
+
+    @staticmethod
+    def supported():
+        return os.unlink in os.supports_dir_fd and os.rmdir in os.supports_dir_fd and os.scandir in os.supports_fd
+
+    def delete(self, dir_path):
+        """
+        Remove dir_path and everything below it.
+        
+        Raises:
+            TreeDeleteError: Some entries could not be removed (the others are gone)
+        """
+        errors = []
+        self._busy(1)
+        try:
+            parent = os.path.dirname(dir_path) or '.'
+            parent_fd = os.open(parent, self.OPEN_FLAGS & ~getattr(os, 'O_NOFOLLOW', 0))
+            try:
+                self._delete_dir(parent_fd, os.path.basename(dir_path), dir_path, errors)
+            finally:
+                os.close(parent_fd)
+        except OSError as e:
+            errors.append((dir_path, e))
+        finally:
+            self._busy(-1)
+        if errors:
+            raise TreeDeleteError(errors)
+
+    def _busy(self, delta):
+        """Track the wall time during which any tree was being deleted, for throughput."""
+        with self.lock:
+            if delta > 0 and not self.active:
+                self.busy_since = time.monotonic()
+            self.active += delta
+            if delta < 0 and not self.active:
+                count('rmtree_seconds', time.monotonic() - self.busy_since)
+
+    def _delete_dir(self, parent_fd, name, dir_path, errors):
+        try:
+            fd = os.open(name, self.OPEN_FLAGS, dir_fd=parent_fd)
+        except OSError as e:
+            errors.append((dir_path, e))
+            return
+        try:
+            subdirs = []
+            files = 0
+            size = 0
+            with os.scandir(fd) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                            continue
+                        entry_size = entry.stat(follow_symlinks=False).st_size
+                        throttle_metadata()
+                        os.unlink(entry.name, dir_fd=fd)
+                        files += 1
+                        size += entry_size
+                    except OSError as e:
+                        errors.append((os.path.join(dir_path, entry.name), e))
+            count('rmtree_files', files)
+            count('rmtree_bytes', size)
+            futures = []
+            for i, subdir in enumerate(subdirs):
+                sub_path = os.path.join(dir_path, subdir)
+                # The last subdirectory is always deleted here, keeping this thread busy meanwhile
+                if i < len(subdirs) - 1 and self.slots.acquire(blocking=False):
+                    futures.append(self.executor.submit(self._delete_in_slot, fd, subdir, sub_path, errors))
+                else:
+                    self._delete_dir(fd, subdir, sub_path, errors)
+            for future in futures:
+                future.result()
+        except OSError as e:
+            errors.append((dir_path, e))
+        finally:
+            os.close(fd)
+        throttle_metadata()
+        try:
+            os.rmdir(name, dir_fd=parent_fd)
+            count('rmtree_dirs')
+        except OSError as e:
+            errors.append((dir_path, e))
+
+    def _delete_in_slot(self, parent_fd, name, dir_path, errors):
+        try:
+            self._delete_dir(parent_fd, name, dir_path, errors)
+        finally:
+            self.slots.release()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+def configure_tree_deleter(workers=1):
+    """Delete directory trees with TreeDeleter where the platform supports dir_fd operations."""
+    global tree_deleter
+    shutdown_tree_deleter()
+    if TreeDeleter.supported():
+        tree_deleter = TreeDeleter(workers)
+
+def shutdown_tree_deleter():
+    """Stop the tree deletion workers."""
+    global tree_deleter
+    if tree_deleter is not None:
+        tree_deleter.shutdown()
+        tree_deleter = None
+
+def print_delete_error(error):
+    """Print a failed deletion, one line per path for a TreeDeleteError."""
+    with output_lock:
+        for path, e in getattr(error, 'errors', None) or [(None, error)]:
+            # dir_fd-relative calls only name the entry itself, so show the full path instead
+            message = e if path is None else f"[Errno {e.errno}] {e.strerror}: {path!r}"
+            print(f"    {Colors.RED}❌ Error deleting: {message}{Colors.RESET}")
+
+@timed_stage('delete')
+def remove_tree(dir_path):
+    """Delete a directory tree: moved into the quarantine when one is configured, removed in place otherwise."""
+    if quarantine is not None:
+        try:
+            quarantine.add(dir_path)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            count('quarantine_cross_device')
+    if tree_deleter is not None:
+        tree_deleter.delete(dir_path)
+    else:
+        shutil.rmtree(dir_path)
+
+# Maximum number of directories between the scanner and the deleter at any time
+DEFAULT_PIPELINE_QUEUE_SIZE = 256
+
+class CleanupPipeline:
+    """
+    Staged processing of a directory tree:
+    
+        scanner (thread) -> bounded queue -> classifier (calling thread)
+            -> verifier pool (images, SFV/CRC, empty checks) -> deleter pool
+    
+    The scanner walks the tree bottom-up. The classifier does the cheap per-directory work
+    (file statistics, queuing archives) and hands each subdirectory to the verifier, which
+    applies the name rules and the expensive checks. Every resulting action goes to the
+    deleter, which owns all changes to the tree and their output.
+    
+    A subdirectory is only judged once it has settled, i.e. its own images, archives and
+    subdirectories have all been decided, which keeps the results of the sequential
+    bottom-up walk. The number of unsettled directories is bounded by queue_size.
+    """
+
+    def __init__(self, pretend=True, check_sfv=True, delete_dash_one=True,
+                 verify_workers=1, delete_workers=1, queue_size=DEFAULT_PIPELINE_QUEUE_SIZE, pbar=None,
+                 dedupe=False):
+        self.pretend = pretend
+        self.check_sfv = check_sfv
+        self.delete_dash_one = delete_dash_one
+        self.pbar = pbar
+        self.records = queue.Queue(maxsize=queue_size)
+        self.window = threading.BoundedSemaphore(queue_size)
+        self.scan_finished = threading.Event()
+        self.verifier = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, verify_workers), thread_name_prefix='verify')
+        self.deleter = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, delete_workers), thread_name_prefix='delete')
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.outstanding = 0
+        self.pending = {}
+        self.on_settled = {}
+        self.settled = set()
+        self.removed = set()
+        self.deleted = 0
+        self.partial_root = None
+        self.indexes = [index for index in (dir_index, checkpoint) if index is not None]
+        # Kept releases for duplicate detection, the content of kept directories not yet merged
+        # into their parent's, and every directory deleted (or that would be)
+        self.releases = [] if dedupe else None
+        self.contents = {}
+        self.condemned = set()
+        self.root_dir = None
+
+    # -- bookkeeping -------------------------------------------------------------------
+
+    def _hold(self, record):
+        """Register one more piece of unfinished work that can change a directory."""
+        with self.lock:
+            self.pending[record.path] = self.pending.get(record.path, 0) + 1
+
+    def _release(self, record):
+        """Finish one piece of work for a directory, settling it when nothing is left."""
+        with self.lock:
+            self.pending[record.path] -= 1
+            if self.pending[record.path]:
+                return
+            del self.pending[record.path]
+            self.settled.add(record.path)
+            callback = self.on_settled.pop(record.path, None)
+            removed = record.path in self.removed or record.path == self.partial_root
+        record.finalize()
+        if not removed and not shutdown_requested:
+            for index in self.indexes:
+                index.store(record)
+        self.window.release()
+        if callback:
+            callback()
+
+    def _when_settled(self, record, callback):
+        with self.lock:
+            if record.path not in self.settled:
+                self.on_settled[record.path] = callback
+                return
+            self.settled.discard(record.path)
+        callback()
+
+    def _submit(self, executor, record, fn, *args):
+        """Run fn on a stage's pool; a returned callable is passed on to the deleter."""
+        with self.lock:
+            self.outstanding += 1
+        executor.submit(self._run, record, fn, args)
+
+    def _run(self, record, fn, args):
+        follow_up = None
+        try:
+            if not shutdown_requested:
+                follow_up = fn(*args)
+        except Exception as e:
+            with output_lock:
+                print(f"    {Colors.RED}❌ Error processing {record.path}: {e}{Colors.RESET}")
+        finally:
+            if follow_up is not None:
+                self._submit(self.deleter, record, follow_up)
+            else:
+                self._release(record)
+            self._job_finished()
+
+    def _job_finished(self):
+        with self.idle:
+            self.outstanding -= 1
+            if not self.outstanding:
+                self.idle.notify_all()
+
+    def _add_deleted(self, path):
+        with self.lock:
+            self.deleted += 1
+            self.condemned.add(path)
+
+    def _keep(self, child, full_path, decision):
+        """Remember in the directory indexes that a walked subdirectory was judged and kept."""
+        if child is not None and not shutdown_requested:
+            for index in self.indexes:
+                index.keep(full_path, decision)
+
+    def _forget(self, path):
+        for index in self.indexes:
+            index.forget(path)
+
+    def _remember(self, record, child, full_path, sfv_details=None):
+        """
+        Collect the content of a kept directory for duplicate detection (see Release).
+        
+        Releases are the top-level entries of the root: the content of a nested directory is
+        merged into its parent's under its relative path, so a multi-disc release is compared
+        as a whole and a disc is never deduplicated on its own.
+        """
+        if self.releases is None or child is None:
+            return
+        files, crcs = Release.content(child, sfv_details)
+        complete = True
+        with self.lock:
+            for dirname in child.dirnames:
+                sub_path = os.path.join(full_path, dirname)
+                nested = self.contents.pop(sub_path, None)
+                if nested is None:
+                    # Deleted, or not judged and kept in this run (unchanged, symlinked, failed to
+                    # delete): a release missing part of its content can't be compared
+                    complete = complete and sub_path in self.condemned
+                    continue
+                nested_files, nested_crcs = nested
+                files.update((os.path.join(dirname, name), st) for name, st in nested_files.items())
+                crcs.update((os.path.join(dirname, name), crc) for name, crc in nested_crcs.items())
+            if not complete:
+                files = None
+            elif record.path != self.root_dir:
+                self.contents[full_path] = (files, crcs)
+                return
+        if files is not None:
+            release = Release.from_content(full_path, files, crcs)
+            if release is not None:
+                with self.lock:
+                    self.releases.append(release)
+
+    def kept_releases(self):
+        """The remembered releases that are not inside a directory deleted after they were judged."""
+        return [release for release in self.releases if not _within_any(release.path, self.condemned)]
+
+    def _plan(self, action, record, path, reason='', size=0):
+        """Add a pretend-mode action to the plan file, reusing the entries the walk read."""
+        if plan_writer is None:
+            return
+        files = None
+        if path == record.path:
+            files = record.files
+        else:
+            child = record.children.get(os.path.basename(path))
+            if child is not None and child.path == path:
+                files = child.files
+        plan_writer.add(action, path, reason, size, files)
+
+    def _subtree_size(self, record, path):
+        """Size of a directory about to be deleted, from the records the walk already built."""
+        if path == record.path:
+            return record.subtree_totals()[0]
+        child = record.children.get(os.path.basename(path))
+        if child is not None and child.path == path:
+            return child.subtree_totals()[0]
+        # Not walked (e.g. a symlinked directory): fall back to measuring it
+        return get_directory_size(path)
+
+    # -- scanner -----------------------------------------------------------------------
+
+    def _scan(self, root_dir, on_discover, only):
+        try:
+            for record in walk_tree(root_dir, on_discover=on_discover, finalize=False, indexes=self.indexes, only=only):
+                while not shutdown_requested:
+                    try:
+                        self.records.put(record, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if shutdown_requested:
+                    break
+        except Exception as e:
+            with output_lock:
+                print(f"{Colors.RED}❌ Error scanning {root_dir}: {e}{Colors.RESET}")
+        finally:
+            self.scan_finished.set()
+
+    # -- classifier --------------------------------------------------------------------
+
+    def _classify(self, record):
+        """Cheap per-directory work; everything expensive is queued on the verifier."""
+        dirpath = record.path
+        filenames = record.filenames
+        self._hold(record)
+        
+        # Update statistics for files in this directory
+        count('total_files', len(filenames))
+        
+        # Count file types and calculate total file size
+        image_names = []
+        for filename in filenames:
+            ext = os.path.splitext(filename)[1].lower()
+            if ext:
+                count(f'files_{ext[1:]}')
+            else:
+                count('files_no_extension')
+            
+            # Calculate total file size from the cached directory entry
+            file_size = record.file_size(filename)
+            if file_size is None:
+                continue
+            count('total_size_bytes', file_size)
+            if ext in IMAGE_EXTENSIONS:
+                image_names.append(filename)
+        
+        # Decide on all images of the directory at once so they can be probed concurrently
+        if image_names:
+            self._hold(record)
+            self._submit(self.verifier, record, self._check_images, record, image_names)
+        
+        # Process ZIP files in this directory
+        zip_files = [f for f in filenames if f.lower().endswith('.zip')]
+        if zip_files and not shutdown_requested:
+            if text_output:
+                with output_lock:
+                    print(f"\n{Colors.BLUE}📂 Processing ZIP files in: {dirpath}{Colors.RESET}")
+            if self.pretend or archive_stage is None:
+                unzip_files_in_directory(dirpath, self.pretend, zip_files=zip_files)
+                if not self.pretend:
+                    # Extraction changed the directory contents; refresh the cached entries
+                    scan_directory(dirpath, record)
+            else:
+                # Extract in the background; this directory settles once the archives are done
+                self._hold(record)
+                with self.lock:
+                    self.outstanding += 1
+                archive_stage.submit(dirpath, zip_files,
+                                     on_done=lambda results: self._archives_done(record, results))
+        
+        # Process directories for potential deletion, each one once it has settled
+        for dirname in list(record.dirnames):
+            count('total_directories')
+            if self.pbar:
+                self.pbar.update(1)
+            child = record.children.get(dirname)
+            if child is not None and child.unchanged is not None:
+                # Unchanged since it was last kept (incremental or resumed run), the decision still stands
+                count('unchanged_dirs_skipped', child.unchanged)
+                count('unchanged_bytes_skipped', child.total_size)
+                continue
+            self._hold(record)
+            if child is None:
+                self._submit(self.verifier, record, self._judge, record, dirname, None)
+            else:
+                self._when_settled(child, functools.partial(
+                    self._submit, self.verifier, record, self._judge, record, dirname, child))
+        
+        self._release(record)
+
+    def _archives_done(self, record, results):
+        try:
+            if any(result['error'] is None for result in results):
+                record.apply_extraction(results)
+        finally:
+            self._release(record)
+            self._job_finished()
+
+    # -- verifier ----------------------------------------------------------------------
+
+    def _check_images(self, record, image_names):
+        decisions = classify_images(record.path, image_names)
+        to_delete = [(filename, reason) for filename, (should_delete_img, reason) in decisions.items() if should_delete_img]
+        if to_delete:
+            return functools.partial(self._delete_images, record, to_delete)
+        return None
+
+    def _judge(self, record, dirname, child):
+        """Decide what happens to one subdirectory; returns the deleter task, if any."""
+        if record.path in self.removed:
+            return None
+        full_path = os.path.join(record.path, dirname)
+        start = time.perf_counter()
+        try:
+            return self._decide(record, dirname, child, full_path)
+        finally:
+            timings.directory(full_path, time.perf_counter() - start)
+
+    def _decide(self, record, dirname, child, full_path):
+        
+        # Check if directory should be deleted based on keywords/dates or '-1' suffix first
+        name_match = name_classifier.classify(dirname, delete_dash_one=self.delete_dash_one)
+        if name_match:
+            dir_size = self._subtree_size(record, full_path)
+            highlighted_info = name_match.highlight()
+            return functools.partial(self._delete_by_name, record, dirname, full_path, highlighted_info, dir_size,
+                                     ', '.join(name_match.reasons()))
+        
+        # Check SFV integrity (only if not already marked for deletion and SFV checking is enabled)
+        if self.check_sfv:
+            should_delete_sfv, sfv_reason, sfv_details, sfv_target_path = check_sfv_integrity(
+                full_path, files=child.filenames if child is not None else None,
+                parent_files=record.filenames)
+            if should_delete_sfv:
+                # Use the target path (might be parent directory if SFV is in 'extr')
+                dir_size = self._subtree_size(record, sfv_target_path)
+                return functools.partial(self._delete_sfv_failed, record, dirname, full_path,
+                                         sfv_target_path, sfv_reason, sfv_details, dir_size)
+            self._keep(child, full_path, 'sfv_passed' if sfv_details else 'kept')
+            self._remember(record, child, full_path, sfv_details)
+            return None
+        
+        # Check if directory is empty and delete it (only if not already matched above)
+        if child.is_empty() if child is not None else is_directory_empty(full_path):
+            return functools.partial(self._delete_empty, record, dirname, full_path)
+        self._keep(child, full_path, 'kept')
+        self._remember(record, child, full_path)
+        return None
+
+    # -- deleter -----------------------------------------------------------------------
+
+    def _delete_images(self, record, to_delete):
+        for filename, reason in to_delete:
+            file_path = os.path.join(record.path, filename)
+            file_size = record.file_size(filename) or 0
+            if text_output:
+                with output_lock:
+                    if self.pretend:
+                        print(f"  {Colors.YELLOW}🖼️  Would delete image:{Colors.RESET} {filename} {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
+                        print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {file_path} {Colors.CYAN}({format_size(file_size)}){Colors.RESET}")
+                    else:
+                        print(f"  {Colors.RED}🖼️  Deleting image:{Colors.RESET} {filename} {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
+                        print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {file_path} {Colors.CYAN}({format_size(file_size)}){Colors.RESET}")
+            if self.pretend:
+                self._plan('delete_image', record, file_path, reason, file_size)
+            else:
+                try:
+                    throttle_metadata()
+                    os.remove(file_path)
+                    record.remove_file(filename)
+                except OSError as e:
+                    with output_lock:
+                        print(f"    {Colors.RED}❌ Error deleting image: {e}{Colors.RESET}")
+                    report_action('error', file_path, reason, error=str(e))
+                    continue
+            report_action('delete_image', file_path, reason, file_size, self.pretend)
+            count('images_deleted')
+            count('total_size_deleted_bytes', file_size)
+
+    def _delete_by_name(self, record, dirname, full_path, highlighted_info, dir_size, reason):
+        if text_output:
+            with output_lock:
+                if self.pretend:
+                    print(f"  {Colors.YELLOW}🗑️  Would delete:{Colors.RESET} {highlighted_info}")
+                else:
+                    print(f"  {Colors.RED}🗑️  Deleting:{Colors.RESET} {highlighted_info}")
+                print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {full_path} {Colors.CYAN}({format_size(dir_size)}){Colors.RESET}")
+        if self.pretend:
+            self._plan('delete_keyword', record, full_path, reason, dir_size)
+        else:
+            try:
+                remove_tree(full_path)
+                record.remove_dir(dirname)
+                self._forget(full_path)
+            except OSError as e:
+                print_delete_error(e)
+                report_action('error', full_path, reason, error=str(e))
+                return
+        report_action('delete_keyword', full_path, reason, dir_size, self.pretend)
+        count('keyword_directories_deleted')
+        count('total_size_deleted_bytes', dir_size)
+        self._add_deleted(full_path)
+
+    def _delete_sfv_failed(self, record, dirname, full_path, target_path, reason, details, dir_size):
+        # Get the display name for the target directory
+        target_dirname = os.path.basename(target_path)
+        if text_output:
+            with output_lock:
+                if self.pretend:
+                    print(f"  {Colors.YELLOW}🗑️  Would delete (SFV failed):{Colors.RESET} {target_dirname}")
+                else:
+                    print(f"  {Colors.RED}🗑️  Deleting (SFV failed):{Colors.RESET} {target_dirname}")
+                print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {target_path} {Colors.CYAN}({format_size(dir_size)}){Colors.RESET}")
+                print(f"    {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
+                if details:
+                    print_sfv_details(details, dirname)
+        if self.pretend:
+            self._plan('delete_sfv_failed', record, target_path, reason, dir_size)
+        else:
+            if archive_stage is not None:
+                archive_stage.wait_idle(target_path)
+            try:
+                remove_tree(target_path)
+                self._forget(target_path)
+                if target_path == full_path:
+                    record.remove_dir(dirname)
+                else:
+                    # The 'extr' case removed the directory being processed itself
+                    with self.lock:
+                        self.removed.add(target_path)
+            except OSError as e:
+                print_delete_error(e)
+                report_action('error', target_path, reason, error=str(e))
+                return
+        report_action('delete_sfv_failed', target_path, reason, dir_size, self.pretend, sfv=sfv_summary(details))
+        count('sfv_failed_directories_deleted')
+        count('total_size_deleted_bytes', dir_size)
+        self._add_deleted(target_path)
+
+    def _delete_empty(self, record, dirname, full_path):
+        if text_output:
+            with output_lock:
+                if self.pretend:
+                    print(f"  {Colors.YELLOW}🗂️  Would delete empty directory:{Colors.RESET} {dirname}")
+                else:
+                    print(f"  {Colors.GREEN}🗂️  Deleting empty directory:{Colors.RESET} {dirname}")
+                print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {full_path}")
+        if self.pretend:
+            self._plan('delete_empty', record, full_path, 'empty directory')
+        else:
+            try:
+                throttle_metadata()
+                os.rmdir(full_path)
+                record.remove_dir(dirname)
+                self._forget(full_path)
+            except OSError as e:
+                with output_lock:
+                    print(f"    {Colors.RED}❌ Error deleting: {e}{Colors.RESET}")
+                report_action('error', full_path, 'empty directory', error=str(e))
+                return
+        report_action('delete_empty', full_path, 'empty directory', pretend=self.pretend)
+        count('empty_directories_deleted')
+        self._add_deleted(full_path)
+
+    # -- driver ------------------------------------------------------------------------
+
+    def run(self, root_dir, on_discover=None, only=None):
+        """
+        Process the tree under root_dir.
+        
+        Args:
+            root_dir: Root directory
+            on_discover: Optional callback growing the progress total (see walk_tree)
+            only: Optional set of names in root_dir to restrict the run to (see walk_tree)
+        
+        Returns:
+            Number of directories deleted (or that would be deleted in pretend mode)
+        """
+        self.root_dir = root_dir
+        if only is not None:
+            # The root record is incomplete, so it must not replace the indexed one
+            self.partial_root = root_dir
+        scanner = threading.Thread(target=self._scan, args=(root_dir, on_discover, only), name='scan', daemon=True)
+        scanner.start()
+        try:
+            while True:
+                if shutdown_requested:
+                    with output_lock:
+                        print(f"\n{Colors.YELLOW}🛑 Operation interrupted by user{Colors.RESET}")
+                    break
+                try:
+                    record = self.records.get(timeout=0.1)
+                except queue.Empty:
+                    if self.scan_finished.is_set() and self.records.empty():
+                        break
+                    continue
+                # Bound the number of directories in flight between the classifier and the deleter
+                while not self.window.acquire(timeout=0.1):
+                    if shutdown_requested:
+                        break
+                if shutdown_requested:
+                    continue
+                self._classify(record)
+            
+            # Let the verifier and deleter drain; after a shutdown request their jobs return at once
+            with self.idle:
+                while self.outstanding:
+                    self.idle.wait(0.1)
+        finally:
+            scanner.join()
+            self.verifier.shutdown(wait=True, cancel_futures=True)
+            self.deleter.shutdown(wait=True, cancel_futures=True)
+        return self.deleted
+
+# Files left out when comparing releases: checksums, playlists, notes and artwork often
+# differ between uploads of the same release
+DEDUPE_IGNORED_EXTENSIONS = SFV_EXTENSIONS | IMAGE_EXTENSIONS | {'.nfo', '.m3u', '.m3u8', '.txt', '.log', '.cue', '.diz', '.url'}
+
+# Files that make a directory a release worth comparing, together with SFV-verified files
+AUDIO_EXTENSIONS = {'.flac', '.mp3', '.m4a', '.aac', '.ogg', '.oga', '.opus', '.wav', '.aif', '.aiff',
+                    '.ape', '.wv', '.wma', '.mpc', '.alac', '.dsf', '.dff'}
+
+# Content below which a directory is too small to be compared as a release
+DEDUPE_MIN_RELEASE_BYTES = 1024 * 1024
+
+# Bytes hashed at each end of a file by partial_crc32
+PARTIAL_HASH_BYTES = 64 * 1024
+
+# Bytes read at a time when a duplicate is compared with its keeper before deletion
+CONFIRM_CHUNK = 1024 * 1024
+
+# Names of the copy that is deleted in preference when duplicates are found
+DUPLICATE_NAME_PATTERN = re.compile(r'-1\s*$')
+
+class Release:
+    """
+    A kept top-level directory of the root taking part in duplicate detection, with the
+    content of all its subdirectories.
+    
+    Attributes:
+        path: Full path of the directory
+        files: Mapping of path relative to the directory -> os.stat_result of its content files
+               (see DEDUPE_IGNORED_EXTENSIONS)
+        crcs: Mapping of relative path -> CRC32 confirmed by a passed SFV file
+    """
+    __slots__ = ('path', 'files', 'crcs')
+
+    def __init__(self, path, files, crcs=None):
+        self.path = path
+        self.files = files
+        self.crcs = crcs or {}
+
+    @staticmethod
+    def content(record, sfv_details=None):
+        """
+        Content files and SFV-confirmed checksums of one directory, from the walk's entries.
+        
+        Args:
+            record: DirRecord of the directory
+            sfv_details: Optional results of check_sfv_integrity, whose checksums are reused
+        
+        Returns:
+            Tuple of (filename -> os.stat_result, filename -> CRC32)
+        """
+        files = {name: st for name, st in record.files.items()
+                 if st is not None and stat.S_ISREG(st.st_mode)
+                 and os.path.splitext(name)[1].lower() not in DEDUPE_IGNORED_EXTENSIONS}
+        crcs = {}
+        for sfv in (sfv_details or {}).values():
+            if not sfv['passed']:
+                continue
+            for result in sfv['results'].values():
+                if result is not None and result['status'] == 'PASS' and result['actual_filename'] in files:
+                    crcs[result['actual_filename']] = result['actual']
+        return files, crcs
+
+    @classmethod
+    def from_content(cls, path, files, crcs):
+        """
+        Build a release from the content collected under a directory, or return None if it
+        isn't one: a release holds audio files or SFV-verified files, of DEDUPE_MIN_RELEASE_BYTES
+        or more.
+        """
+        if sum(st.st_size for st in files.values()) < DEDUPE_MIN_RELEASE_BYTES:
+            return None
+        if not crcs and not any(os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS for name in files):
+            return None
+        return cls(path, files, crcs)
+
+    def size_signature(self):
+        """The multiset of the content file sizes, as a sorted tuple."""
+        return tuple(sorted(st.st_size for st in self.files.values()))
+
+    def total_size(self):
+        return sum(st.st_size for st in self.files.values())
+
+def _within_any(path, paths):
+    """Check whether path or one of its parent directories is in the set paths."""
+    while True:
+        if path in paths:
+            return True
+        parent = os.path.dirname(path)
+        if parent == path:
+            return False
+        path = parent
+
+def _is_within(path, directory):
+    return path == directory or path.startswith(os.path.join(directory, ''))
+
+def partial_crc32(file_path, size):
+    """
+    CRC32 of the first and last PARTIAL_HASH_BYTES of a file; smaller files are hashed whole.
+    
+    Args:
+        file_path: Path to the file
+        size: Size of the file from the walk
+    
+    Returns:
+        Tuple of (checksum as an 8-character uppercase hex string or None if error,
+        whether the whole file was read)
+    """
+    whole = size <= 2 * PARTIAL_HASH_BYTES
+    throttle_read(size if whole else 2 * PARTIAL_HASH_BYTES)
+    try:
+        start = time.perf_counter()
+        with open(file_path, 'rb') as f:
+            data = f.read(size if whole else PARTIAL_HASH_BYTES)
+            if not whole:
+                f.seek(-PARTIAL_HASH_BYTES, os.SEEK_END)
+                data += f.read(PARTIAL_HASH_BYTES)
+        timings.add('partial_hash', time.perf_counter() - start, len(data))
+    except OSError:
+        return None, whole
+    count('dedupe_partial_files')
+    count('dedupe_partial_bytes', len(data))
+    return f"{zlib.crc32(data) & 0xffffffff:08X}", whole
+
+def _group_by(releases, key):
+    """Group releases by key(release), leaving out None keys and groups of one."""
+    groups = defaultdict(list)
+    for release in releases:
+        if shutdown_requested:
+            return []
+        value = key(release)
+        if value is not None:
+            groups[value].append(release)
+    return [group for group in groups.values() if len(group) > 1]
+
+def find_duplicate_releases(releases):
+    """
+    Find releases with identical content, reading as few bytes as possible:
+    
+        1. releases are bucketed by the multiset of their file sizes, without reading anything
+        2. releases sharing a bucket are compared by the partial_crc32 of every file
+        3. releases still matching are compared by the full CRC32 of every file, taken from
+           passed SFV files and the CRC cache where available and hashed otherwise
+    
+    A bucket whose files all have known checksums skips the partial hashes.
+    
+    Args:
+        releases: Release objects to compare
+    
+    Returns:
+        List of groups (lists) of two or more releases with the same content
+    """
+    count('dedupe_releases', len(releases))
+    buckets = defaultdict(list)
+    for release in releases:
+        buckets[release.size_signature()].append(release)
+    
+    # Full checksums known without reading the file, by path
+    known = {}
+    
+    def known_crcs(release):
+        for name, file_stat in release.files.items():
+            file_path = os.path.join(release.path, name)
+            if file_path in known:
+                continue
+            crc = release.crcs.get(name)
+            if crc is None and crc_cache is not None:
+                crc = crc_cache.lookup(file_stat)
+            if crc is not None:
+                known[file_path] = crc
+                count('dedupe_crcs_reused')
+    
+    def partial_key(release):
+        key = []
+        for name, file_stat in release.files.items():
+            file_path = os.path.join(release.path, name)
+            crc, whole = partial_crc32(file_path, file_stat.st_size)
+            if crc is None:
+                return None
+            if whole:
+                known[file_path] = crc
+            key.append((file_stat.st_size, crc))
+        return tuple(sorted(key))
+    
+    def full_key(release):
+        paths = {os.path.join(release.path, name): file_stat.st_size for name, file_stat in release.files.items()}
+        missing = [file_path for file_path in paths if file_path not in known]
+        if missing:
+            checksums = calculate_crc32_many(missing)
+            count('dedupe_full_files', len(checksums))
+            known.update(checksums)
+        key = []
+        for file_path, size in paths.items():
+            if known.get(file_path) is None:
+                return None
+            key.append((size, known[file_path]))
+        return tuple(sorted(key))
+    
+    duplicates = []
+    for bucket in buckets.values():
+        if len(bucket) < 2 or shutdown_requested:
+            continue
+        count('dedupe_size_matches', len(bucket))
+        for release in bucket:
+            known_crcs(release)
+        if all(os.path.join(release.path, name) in known for release in bucket for name in release.files):
+            candidates = [bucket]
+        else:
+            candidates = _group_by(bucket, partial_key)
+        for candidate in candidates:
+            duplicates.extend(_group_by(candidate, full_key))
+    return duplicates
+
+def _same_bytes(path_a, path_b):
+    """Compare two files of the same size byte for byte; unreadable files don't match."""
+    start = time.perf_counter()
+    compared = 0
+    try:
+        with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+            while True:
+                chunk_a = a.read(CONFIRM_CHUNK)
+                chunk_b = b.read(CONFIRM_CHUNK)
+                throttle_read(len(chunk_a) + len(chunk_b))
+                compared += len(chunk_a)
+                if chunk_a != chunk_b:
+                    return False
+                if not chunk_a:
+                    return True
+    except OSError:
+        return False
+    finally:
+        timings.add('dedupe_confirm', time.perf_counter() - start, compared)
+        count('dedupe_confirmed_bytes', compared)
+
+def confirm_duplicate(release, keeper):
+    """
+    Check byte for byte that every content file of release has an identical file in keeper.
+    
+    Checksums only make a match very likely; this is done before a duplicate is deleted.
+    """
+    candidates = defaultdict(list)
+    for name, file_stat in keeper.files.items():
+        candidates[file_stat.st_size].append(os.path.join(keeper.path, name))
+    for name, file_stat in release.files.items():
+        same_size = candidates[file_stat.st_size]
+        file_path = os.path.join(release.path, name)
+        match = next((other for other in same_size if _same_bytes(file_path, other)), None)
+        if match is None:
+            return False
+        same_size.remove(match)
+    return True
+
+def _keeper_rank(release):
+    # Keep an SFV-verified copy, then one not named like a copy, then the shortest path
+    name = os.path.basename(release.path)
+    return (not release.crcs, bool(DUPLICATE_NAME_PATTERN.search(name)), len(release.path), release.path)
+
+def remove_duplicate_releases(releases, pretend=True):
+    """
+    Delete every copy but one of each set of releases with identical content (see find_duplicate_releases).
+    
+    Each copy is compared byte for byte with the kept one first (see confirm_duplicate), in
+    pretend mode too so that plans only hold confirmed duplicates.
+    
+    Args:
+        releases: Kept Release objects of the run
+        pretend: Whether to only show what would be deleted
+    
+    Returns:
+        Number of directories deleted (or that would be deleted in pretend mode)
+    """
+    if len(releases) < 2 or shutdown_requested:
+        return 0
+    print(f"\n{Colors.MAGENTA}🧬 Comparing {len(releases):,} releases for duplicates...{Colors.RESET}")
+    deleted = 0
+    removed = []
+    for group in find_duplicate_releases(releases):
+        keeper = min(group, key=_keeper_rank)
+        for release in sorted(group, key=_keeper_rank)[1:]:
+            if shutdown_requested:
+                break
+            path = release.path
+            if _is_within(keeper.path, path) or any(_is_within(path, other) for other in removed):
+                continue
+            if not confirm_duplicate(release, keeper):
+                if text_output:
+                    with output_lock:
+                        print(f"  {Colors.YELLOW}⏭️  Keeping {path}:{Colors.RESET} checksums match {keeper.path} but the bytes differ")
+                count('dedupe_confirm_mismatches')
+                continue
+            size = release.total_size()
+            reason = f"duplicate of {keeper.path}"
+            if text_output:
+                with output_lock:
+                    if pretend:
+                        print(f"  {Colors.YELLOW}🗑️  Would delete (duplicate):{Colors.RESET} {os.path.basename(path)}")
+                    else:
+                        print(f"  {Colors.RED}🗑️  Deleting (duplicate):{Colors.RESET} {os.path.basename(path)}")
+                    print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {path} {Colors.CYAN}({format_size(size)}){Colors.RESET}")
+                    print(f"    {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
+            if pretend:
+                if plan_writer is not None:
+                    plan_writer.add('delete_duplicate', path, reason, size)
+            else:
+                try:
+                    remove_tree(path)
+                except OSError as e:
+                    print_delete_error(e)
+                    report_action('error', path, reason, error=str(e))
+                    continue
+                for index in (dir_index, checkpoint):
+                    if index is not None:
+                        index.forget(path)
+            removed.append(path)
+            report_action('delete_duplicate', path, reason, size, pretend, duplicate_of=keeper.path)
+            count('duplicate_directories_deleted')
+            count('total_size_deleted_bytes', size)
+            deleted += 1
+    return deleted
+
+def delete_matching_dirs(root_dir, pretend=True, check_sfv=True, delete_dash_one=True,
+                         verify_workers=1, delete_workers=1, queue_size=DEFAULT_PIPELINE_QUEUE_SIZE, only=None,
+                         show_progress=True, dedupe=False, releases=None):
+    """
+    Recursively process directories under root_dir.
+    
+    Runs the staged CleanupPipeline: scanning, classification, verification and deletion
+    overlap, each with its own concurrency.
+    
+    Args:
+        root_dir: Root directory to search from
+        pretend: Whether to only show what would be deleted
+        check_sfv: Whether to verify SFV files
+        delete_dash_one: Whether to delete directories ending with '-1'
+        verify_workers: Number of directories verified concurrently
+        delete_workers: Number of deletions carried out concurrently
+        queue_size: Maximum number of directories in flight between the stages
+        only: Optional set of names in root_dir to restrict the run to (used by watch mode and shards)
+        show_progress: Show a progress bar when tqdm is available, and the interruption notice
+                       (shards leave both to the parent process)
+        dedupe: Whether to delete releases whose content duplicates another kept release
+        releases: Optional list the kept releases are added to instead of being compared here
+                  (shards leave the comparison to the parent process)
+    
+    Returns:
+        Number of directories deleted (or that would be deleted in pretend mode)
+    """
+    if only is None:
+        print(f"\n{Colors.CYAN}🔍 Scanning directories...{Colors.RESET}")
+        
+        print(f"\n{Colors.MAGENTA}🔄 Processing directories and files...{Colors.RESET}")
+    
+    # Use progress bar if available. There is no counting pre-pass: the total is an
+    # estimate that grows as the walk discovers subdirectories.
+    pbar = None
+    if show_progress and output_mode != 'quiet' and _load_tqdm():
+        pbar = tqdm(total=0, desc="Processing directories", 
+                   bar_format='{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]')
+    
+    def on_discover(count):
+        if pbar and count:
+            pbar.total += count
+            pbar.refresh()
+    
+    pipeline = CleanupPipeline(pretend, check_sfv, delete_dash_one, verify_workers, delete_workers, queue_size, pbar,
+                               dedupe=dedupe or releases is not None)
+    try:
+        deleted = pipeline.run(root_dir, on_discover=on_discover, only=only)
+    finally:
+        if archive_stage is not None:
+            archive_stage.wait_all()
+        
+        if pbar:
+            pbar.close()
+        
+        if shutdown_requested and show_progress:
+            print(f"\n{Colors.YELLOW}⚠️  Operation was interrupted. Partial results displayed.{Colors.RESET}")
+        flush_output()
+    
+    # Duplicates can only be told apart once every directory has been judged
+    if pipeline.releases is not None and not shutdown_requested:
+        if releases is not None:
+            releases.extend(pipeline.kept_releases())
+        else:
+            deleted += remove_duplicate_releases(pipeline.kept_releases(), pretend)
+            flush_output()
+    
+    return deleted
+
+# Settings of a shard worker process, set by _init_shard_worker
+shard_config = None
+
+def _watch_stop_event(stop_event):
+    """Turn the parent's stop event into a shutdown request in a shard process."""
+    global shutdown_requested
+    stop_event.wait()
+    shutdown_requested = True
+
+def _init_shard_worker(config, stop_event):
+    """
+    Process pool initializer for run_sharded: recreate the parent's configuration.
+    
+    Interrupts are left to the parent, which signals a shutdown through stop_event. The
+    databases are shared with the other shards and committed after every change, so no
+    shard keeps the others waiting on its write lock.
+    """
+    global shard_config, crc_cache, dir_index, checkpoint, quarantine, plan_writer
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    threading.Thread(target=_watch_stop_event, args=(stop_event,), name='stop', daemon=True).start()
+    shard_config = config
+    root_dir = config['root_dir']
+    ignored_paths.update(config['ignored_paths'])
+    configure_keywords(config['keywords'])
+    configure_hashing(*config['hashing'])
+    # Shards are processes already; their SFV workers are threads
+    configure_sfv_workers(config['sfv_workers'])
+    configure_io_scheduler(*config['io_scheduler'])
+    configure_sfv_verification(config['full_report'])
+    configure_throttle(*config['throttle'], announce=False)
+    if config['crc_cache'] is not None:
+        crc_cache = CrcCache(config['crc_cache'])
+        crc_cache.COMMIT_EVERY = 1
+    if config['dir_index'] is not None:
+        index_path, settings, read_only = config['dir_index']
+        dir_index = DirIndex(index_path, root_dir, settings, read_only=read_only)
+        dir_index.COMMIT_EVERY = 1
+    if config['checkpoint'] is not None:
+        checkpoint_path, settings = config['checkpoint']
+        checkpoint = DirIndex(checkpoint_path, root_dir, settings)
+        checkpoint.COMMIT_EVERY = 1
+    if config['quarantine'] is not None:
+        # The parent runs the purge worker
+        quarantine = Quarantine(*config['quarantine'], start_purge=False)
+    configure_tree_deleter(config['rmtree_workers'])
+    configure_image_workers(config['image_workers'])
+    configure_archive_stage(*config['archives'])
+    if config['plan']:
+        plan_writer = PlanWriter(None, root_dir)
+    configure_output(config['output'], collect=True)
+
+def _run_shard(names):
+    """
+    Process some top-level entries of the root directory in a shard worker process.
+    
+    Returns:
+        Tuple of (output, stats, timings, deleted, plan_lines, record_lines, releases): everything
+        the shard printed, its statistics counters and stage timings, the number of deleted
+        directories, its plan file lines, its NDJSON records and its kept releases (when
+        duplicates are detected, which the parent does across all shards)
+    """
+    config = shard_config
+    stats.clear()
+    timings.clear()
+    timings.slowest_limit = config['slowest']
+    output = io.StringIO()
+    releases = [] if config['dedupe'] else None
+    with contextlib.redirect_stdout(output):
+        deleted = delete_matching_dirs(config['root_dir'], config['pretend'], config['check_sfv'],
+                                       delete_dash_one=config['delete_dash_one'],
+                                       verify_workers=config['verify_workers'], delete_workers=config['delete_workers'],
+                                       queue_size=config['queue_size'], only=set(names), show_progress=False,
+                                       releases=releases)
+    for cache in (crc_cache, dir_index, checkpoint):
+        if cache is not None:
+            cache.flush()
+    plan_lines = plan_writer.take_lines() if plan_writer is not None else []
+    record_lines = record_writer.take_lines() if record_writer is not None else []
+    return output.getvalue(), dict(stats), timings.snapshot(), deleted, plan_lines, record_lines, releases
+
+def shard_tasks(root_dir, processes):
+    """
+    Split the top-level entries of root_dir into tasks for the shard processes.
+    
+    Files directly in root_dir form one task, together with any 'extr' directory, whose SFV
+    check reads them. Directories are handed out in chunks several times smaller than an
+    even split, so shards that finish early pick up more work.
+    
+    Returns:
+        List of lists of names
+    """
+    try:
+        entries = sorted(os.listdir(root_dir))
+    except OSError as e:
+        print(f"{Colors.RED}❌ Cannot list {root_dir}: {e}{Colors.RESET}")
+        return []
+    root_files = []
+    dirnames = []
+    ignored = ignored_in(root_dir)
+    for name in entries:
+        if name in ignored:
+            continue
+        path = os.path.join(root_dir, name)
+        if os.path.isdir(path) and name.lower() != 'extr':
+            dirnames.append(name)
+        else:
+            root_files.append(name)
+    chunk_size = max(1, len(dirnames) // (processes * 4))
+    tasks = [dirnames[i:i + chunk_size] for i in range(0, len(dirnames), chunk_size)]
+    if root_files:
+        tasks.insert(0, root_files)
+    return tasks
+
+def run_sharded(root_dir, processes, config):
+    """
+    Process the tree with a pool of shard processes, each running the regular pipeline on
+    some of the top-level entries of root_dir (see shard_tasks).
+    
+    Each shard's output is printed in one piece when it finishes, so shards never interleave,
+    and its statistics and plan lines are merged into this process.
+    
+    Args:
+        root_dir: Root directory
+        processes: Number of shard processes
+        config: Settings passed to _init_shard_worker
+    
+    Returns:
+        Number of directories deleted (or that would be deleted in pretend mode)
+    """
+    print(f"\n{Colors.CYAN}🔍 Scanning directories...{Colors.RESET}")
+    tasks = shard_tasks(root_dir, processes)
+    if not tasks:
+        return 0
+    print(f"\n{Colors.MAGENTA}🔄 Processing directories and files in {processes} processes ({len(tasks)} tasks)...{Colors.RESET}")
+    
+    pbar = None
+    if output_mode != 'quiet' and _load_tqdm():
+        pbar = tqdm(total=len(tasks), desc="Processing top-level entries", unit="task")
+    
+    # Spawned rather than forked: this process already runs threads (purge worker, pools)
+    import multiprocessing
+    context = multiprocessing.get_context('spawn')
+    stop_event = context.Event()
+    deleted = 0
+    releases = []
+    executor = concurrent.futures.ProcessPoolExecutor(max_workers=processes, mp_context=context,
+                                                      initializer=_init_shard_worker, initargs=(config, stop_event))
+    try:
+        pending = {executor.submit(_run_shard, names): names for names in tasks}
+        while pending:
+            if shutdown_requested and not stop_event.is_set():
+                stop_event.set()
+                for future in pending:
+                    future.cancel()
+            done, _ = concurrent.futures.wait(pending, timeout=0.2, return_when=concurrent.futures.FIRST_COMPLETED)
+            if io_throttle is not None:
+                # The shards follow the control file themselves; this keeps the reported limits current
+                io_throttle.refresh()
+            for future in done:
+                names = pending.pop(future)
+                if future.cancelled():
+                    continue
+                try:
+                    output, shard_stats, shard_timings, shard_deleted, plan_lines, record_lines, shard_releases = future.result()
+                except Exception as e:
+                    with output_lock:
+                        print(f"{Colors.RED}❌ Error processing {', '.join(names)}: {e}{Colors.RESET}")
+                    continue
+                with output_lock:
+                    sys.stdout.write(output)
+                    sys.stdout.flush()
+                for key, value in shard_stats.items():
+                    count(key, value)
+                timings.merge(shard_timings)
+                deleted += shard_deleted
+                if plan_writer is not None and plan_lines:
+                    plan_writer.write_lines(plan_lines)
+                if record_writer is not None and record_lines:
+                    record_writer.write_lines(record_lines)
+                if shard_releases:
+                    releases.extend(shard_releases)
+                if pbar:
+                    pbar.update(1)
+    finally:
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        if pbar:
+            pbar.close()
+        if shutdown_requested:
+            print(f"\n{Colors.YELLOW}⚠️  Operation was interrupted. Partial results displayed.{Colors.RESET}")
+    if config['dedupe'] and not shutdown_requested:
+        # Copies of a release can sit in different shards
+        deleted += remove_duplicate_releases(releases, config['pretend'])
+    return deleted
+
+# Quiet period after the last change before watch mode processes an entry (seconds)
+DEFAULT_SETTLE_SECONDS = 30
+
+class InotifyWatcher:
+    """
+    Recursive inotify watch on a directory tree (Linux only), using libc through ctypes.
+    
+    Every directory under the root gets a watch; directories created in or moved into the
+    tree are watched as soon as their event is read. read() reports the paths that changed.
+    """
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = os.O_CLOEXEC
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+    EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+    def __init__(self, root_dir):
+        import ctypes
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            self.inotify_init1 = libc.inotify_init1
+            self.inotify_add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError):
+            raise OSError(errno.ENOSYS, "inotify is not available on this system")
+        self.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.paths = {}  # watch descriptor -> directory path
+        self.limit_reported = False
+        self.add_tree(root_dir)
+
+    def add_tree(self, dir_path):
+        """Watch a directory and every directory below it."""
+        pending = [dir_path]
+        while pending:
+            path = pending.pop()
+            if not self._add_watch(path):
+                continue
+            try:
+                with os.scandir(path) as it:
+                    pending.extend(entry.path for entry in it if entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+
+    def _add_watch(self, path):
+        wd = self.inotify_add_watch(self.fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            import ctypes
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC and not self.limit_reported:
+                self.limit_reported = True
+                print(f"{Colors.YELLOW}⚠️  inotify watch limit reached (fs.inotify.max_user_watches); "
+                      f"changes below {path} and other unwatched directories will be missed{Colors.RESET}")
+            return False
+        # Watching a directory again (e.g. after a move) returns its existing descriptor
+        self.paths[wd] = path
+        return True
+
+    def read(self, timeout):
+        """
+        Wait up to timeout seconds for events and read everything queued.
+        
+        Returns:
+            List of changed paths, or None if the kernel queue overflowed and events were lost
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        changed = []
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+                offset += self.EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & self.IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                if mask & self.IN_IGNORED:
+                    self.paths.pop(wd, None)
+                    continue
+                dir_path = self.paths.get(wd)
+                if dir_path is None or not name:
+                    continue
+                path = os.path.join(dir_path, name)
+                if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self.add_tree(path)
+                changed.append(path)
+        return None if overflow else changed
+
+    def close(self):
+        os.close(self.fd)
+
+def watch_tree(root_dir, settle_seconds=DEFAULT_SETTLE_SECONDS, pretend=True, check_sfv=True, delete_dash_one=True,
+               verify_workers=1, delete_workers=1, queue_size=DEFAULT_PIPELINE_QUEUE_SIZE, dedupe=False):
+    """
+    Stay resident and clean up root_dir as it changes.
+    
+    The whole tree is processed once. After that, every top-level entry of root_dir (a
+    release directory, or a file directly in root_dir) that changes is processed again
+    through the same pipeline once it has seen no events for settle_seconds, so uploads
+    still in progress are left alone. Worker pools and caches stay warm between batches.
+    An entry that changes while it is being processed is queued again, since the events may
+    come from an upload as well as from the cleanup itself (the extra pass then finds nothing
+    left to do); entries the cleanup removed are dropped. Runs until a shutdown is requested
+    through signal_handler.
+    
+    Args:
+        root_dir: Root directory to watch
+        settle_seconds: Quiet period before a changed entry is processed
+        pretend, check_sfv, delete_dash_one, verify_workers, delete_workers, queue_size, dedupe:
+            As for delete_matching_dirs (duplicates are looked for within each batch)
+    
+    Returns:
+        Number of directories deleted (or that would be deleted in pretend mode)
+    """
+    try:
+        watcher = InotifyWatcher(root_dir)
+    except OSError as e:
+        print(f"{Colors.RED}❌ Cannot watch {root_dir}: {e}{Colors.RESET}")
+        return 0
+    
+    def run(only=None):
+        return delete_matching_dirs(root_dir, pretend, check_sfv, delete_dash_one, verify_workers=verify_workers,
+                                    delete_workers=delete_workers, queue_size=queue_size, only=only, dedupe=dedupe)
+    
+    prefix = os.path.join(root_dir, '')
+    
+    def entry_names(paths):
+        """Top-level entries of root_dir that the changed paths belong to."""
+        names = set()
+        ignored = ignored_in(root_dir)
+        for path in paths:
+            if path.startswith(prefix):
+                name = path[len(prefix):].split(os.sep, 1)[0]
+                if name and name not in ignored:
+                    names.add(name)
+        return names
+    
+    pending = {}  # top-level name -> time of its last event
+    deleted = 0
+    full_pass = True
+    try:
+        while not shutdown_requested:
+            if full_pass:
+                full_pass = False
+                pending.clear()
+                deleted += run()
+                changed = watcher.read(0)
+                if changed is None:
+                    full_pass = True
+                    continue
+                now = time.monotonic()
+                for name in entry_names(changed):
+                    pending[name] = now
+                if not shutdown_requested:
+                    print(f"\n{Colors.CYAN}👀 Watching {root_dir} for changes "
+                          f"(entries are processed {settle_seconds:g}s after their last change)...{Colors.RESET}")
+                continue
+            
+            # Wake when the first pending entry settles; idle waits are capped at a second so a
+            # shutdown request is noticed (select resumes waiting after the signal handler)
+            timeout = 1.0
+            if pending:
+                timeout = min(timeout, max(0.0, min(pending.values()) + settle_seconds - time.monotonic()))
+            changed = watcher.read(timeout)
+            now = time.monotonic()
+            if changed is None:
+                print(f"\n{Colors.YELLOW}⚠️  Filesystem events were lost; processing the whole tree again{Colors.RESET}")
+                full_pass = True
+                continue
+            for name in entry_names(changed):
+                pending[name] = now
+            
+            settled = {name for name, last in pending.items() if now - last >= settle_seconds}
+            if not settled:
+                continue
+            for name in settled:
+                del pending[name]
+            settled = {name for name in settled if os.path.lexists(os.path.join(root_dir, name))}
+            if not settled:
+                continue
+            
+            print(f"\n{Colors.MAGENTA}🔄 Processing settled changes in:{Colors.RESET} {', '.join(sorted(settled))}")
+            deleted += run(only=settled)
+            
+            # Changes made meanwhile, by the cleanup or by an upload that resumed
+            changed = watcher.read(0)
+            if changed is None:
+                full_pass = True
+                continue
+            now = time.monotonic()
+            for name in entry_names(changed):
+                pending[name] = now
+    finally:
+        watcher.close()
+    return deleted
+
+# ANSI escape sequences, stripped from reasons written to the plan file
+ANSI_ESCAPE_PATTERN = re.compile(r'\x1b\[[0-9;]*m')
+
+def directory_stamp(dir_path, files=None):
+    """
+    Identity and content stamp of a directory: [device, inode, mtime_ns, signature], where the
+    signature covers the name, size and mtime of every file directly inside it.
+    
+    Args:
+        dir_path: Directory path
+        files: Optional mapping of filename -> os.stat_result already read by the walk
+    
+    Raises:
+        OSError: The directory can't be read
+    """
+    st = os.stat(dir_path)
+    if files is None:
+        record = scan_directory(dir_path)
+        if record is None:
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), dir_path)
+        files = record.files
+    signature = 0
+    for name in sorted(files):
+        file_stat = files[name]
+        size, mtime_ns = (file_stat.st_size, file_stat.st_mtime_ns) if file_stat is not None else (-1, -1)
+        signature = zlib.crc32(f"{name}\0{size}\0{mtime_ns}\n".encode('utf-8', 'surrogateescape'), signature)
+    return [st.st_dev, st.st_ino, st.st_mtime_ns, signature]
+
+def plan_stamp(action, path, files=None):
+    """Stamp recorded for a plan action's target: directory_stamp for directories, file_stamp for files."""
+    if action in ('delete_image', 'unzip'):
+        return list(file_stamp(os.stat(path)))
+    return directory_stamp(path, files)
+
+class PlanWriter:
+    """
+    Writes the actions of a pretend run to a plan file that --apply-plan can carry out.
+    
+    The plan is JSON lines: a header object with the absolute root, then one object per
+    action with the target path relative to that root, the action, the reason, the size and
+    the target's stamp at planning time.
+    """
+
+    def __init__(self, plan_path, root_dir):
+        self.plan_path = plan_path
+        self.root = os.path.abspath(root_dir)
+        self.lock = threading.Lock()
+        self.actions = 0
+        # Without a path (shard processes) lines are collected for the parent to write
+        self.file = None
+        self.lines = []
+        if plan_path is not None:
+            self.file = open(plan_path, 'w', encoding='utf-8')
+            self.file.write(json.dumps({'plan': PLAN_VERSION, 'root': self.root, 'created': time.time()}) + '\n')
+
+    def add(self, action, path, reason='', size=0, files=None):
+        """
+        Record one action.
+        
+        Args:
+            action: 'delete_keyword', 'delete_sfv_failed', 'delete_duplicate', 'delete_empty', 'delete_image' or 'unzip'
+            path: Target directory or file
+            reason: Why the action is taken (ANSI colors are stripped)
+            size: Bytes the action frees
+            files: Optional mapping of filename -> os.stat_result for a directory target
+        """
+        try:
+            stamp = plan_stamp(action, path, files)
+        except OSError as e:
+            with output_lock:
+                print(f"    {Colors.RED}❌ Not added to plan, cannot stamp {path}: {e}{Colors.RESET}")
+            return
+        line = json.dumps({'action': action, 'path': os.path.relpath(os.path.abspath(path), self.root),
+                           'reason': ANSI_ESCAPE_PATTERN.sub('', reason),
+                           'size': size, 'stamp': stamp})
+        self.write_lines([line])
+        count('plan_actions_written')
+
+    def write_lines(self, lines):
+        """Write already formatted action lines (collected by a shard process)."""
+        with self.lock:
+            if self.file is None:
+                self.lines.extend(lines)
+            else:
+                self.file.writelines(line + '\n' for line in lines)
+            self.actions += len(lines)
+
+    def take_lines(self):
+        """Return and forget the collected lines."""
+        with self.lock:
+            lines, self.lines = self.lines, []
+        return lines
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+
+def open_plan(plan_path, root_dir):
+    """
+    Start writing the deletion plan of this (pretend) run to plan_path.
+    
+    Returns:
+        True if the plan file could be created
+    """
+    global plan_writer
+    close_plan()
+    try:
+        plan_writer = PlanWriter(plan_path, root_dir)
+    except OSError as e:
+        print(f"{Colors.RED}❌ Could not create plan file {plan_path}: {e}{Colors.RESET}")
+        return False
+    ignore_files(plan_path)
+    return True
+
+def close_plan():
+    """Finish the deletion plan file."""
+    global plan_writer
+    if plan_writer is not None:
+        plan_writer.close()
+        plan_writer = None
+
+def apply_plan(plan_path, root_dir, pretend=True):
+    """
+    Carry out the actions of a plan written by a pretend run, without scanning or hashing.
+    
+    The plan's paths are resolved against root_dir, which may differ from the root the plan
+    was written for (e.g. the same tree mounted elsewhere). Each target is checked against the stamp recorded in the plan first; targets that are
+    gone or have changed since are skipped, everything else is acted on as planned. An SFV
+    failure in a directory the plan also unzips into is skipped too: a live run verifies
+    again after extracting, which the plan can't do.
+    
+    Args:
+        plan_path: Plan file written with --plan-file
+        root_dir: Root directory the plan is applied to
+        pretend: Whether to only show what would be done
+    
+    Returns:
+        Number of directories deleted (or that would be deleted in pretend mode)
+    """
+    try:
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        header = json.loads(lines[0]) if lines else {}
+        entries = [json.loads(line) for line in lines[1:] if line.strip()]
+    except (OSError, ValueError) as e:
+        print(f"{Colors.RED}❌ Could not read plan file {plan_path}: {e}{Colors.RESET}")
+        return 0
+    if header.get('plan') != PLAN_VERSION:
+        print(f"{Colors.RED}❌ {plan_path} is not a plan file this version can apply{Colors.RESET}")
+        return 0
+    
+    # Paths are stored relative to the root, so the plan can be applied from any directory
+    root = os.path.abspath(root_dir)
+    for entry in entries:
+        entry['path'] = os.path.normpath(os.path.join(root, entry['path']))
+    
+    print(f"\n{Colors.MAGENTA}📝 Applying plan:{Colors.RESET} {len(entries)} actions to {root}")
+    if header.get('root') != root:
+        print(f"{Colors.YELLOW}⚠️  The plan was written for {header.get('root')}; its paths are resolved against "
+              f"{root}, and targets that don't match their stamp are skipped{Colors.RESET}")
+    
+    def skip(entry, state):
+        if text_output:
+            print(f"  {Colors.YELLOW}⏭️  Skipping ({state}):{Colors.RESET} {entry['path']}")
+        report_action('skip', entry['path'], state, planned=entry['action'])
+        count('plan_actions_skipped')
+    
+    unzipped = [os.path.dirname(entry['path']) for entry in entries if entry['action'] == 'unzip']
+    
+    # Check every stamp before acting: applying an action changes the stamp of its parent,
+    # which may be a later target of the same plan
+    valid = []
+    for entry in entries:
+        if entry['action'] == 'delete_sfv_failed' and any(_is_within(path, entry['path']) for path in unzipped):
+            skip(entry, 'needs verifying again after unzipping')
+            continue
+        try:
+            current = plan_stamp(entry['action'], entry['path'])
+        except OSError:
+            current = None
+        if current != entry['stamp']:
+            skip(entry, 'gone' if current is None else 'changed since the plan was made')
+            continue
+        valid.append(entry)
+    
+    # Pretend runs only show what applying the plan would do
+    applied_key = 'plan_actions_would_apply' if pretend else 'plan_actions_applied'
+    deleted = 0
+    for entry in valid:
+        if shutdown_requested:
+            print(f"\n{Colors.YELLOW}🛑 Operation interrupted by user{Colors.RESET}")
+            break
+        action = entry['action']
+        path = entry['path']
+        reason = entry.get('reason', '')
+        size = entry.get('size', 0)
+        if not os.path.lexists(path):
+            # Removed together with an earlier target of the plan
+            count('plan_actions_skipped')
+            continue
+        
+        name = os.path.basename(path)
+        if action == 'unzip':
+            if pretend:
+                if text_output:
+                    print(f"  {Colors.YELLOW}📦 Would unzip:{Colors.RESET} {path}")
+                report_action('unzip', path, pretend=True)
+                count('zip_files_processed')
+            else:
+                unzip_files_in_directory(os.path.dirname(path), False, zip_files=[name])
+            count(applied_key)
+            continue
+        
+        if text_output:
+            if action == 'delete_image':
+                if pretend:
+                    print(f"  {Colors.YELLOW}🖼️  Would delete image:{Colors.RESET} {name} {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
+                else:
+                    print(f"  {Colors.RED}🖼️  Deleting image:{Colors.RESET} {name} {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
+            elif action == 'delete_empty':
+                if pretend:
+                    print(f"  {Colors.YELLOW}🗂️  Would delete empty directory:{Colors.RESET} {name}")
+                else:
+                    print(f"  {Colors.GREEN}🗂️  Deleting empty directory:{Colors.RESET} {name}")
+            else:
+                sfv_note = {'delete_sfv_failed': ' (SFV failed)', 'delete_duplicate': ' (duplicate)'}.get(action, '')
+                if pretend:
+                    print(f"  {Colors.YELLOW}🗑️  Would delete{sfv_note}:{Colors.RESET} {name} {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
+                else:
+                    print(f"  {Colors.RED}🗑️  Deleting{sfv_note}:{Colors.RESET} {name} {Colors.CYAN}[Reason: {reason}]{Colors.RESET}")
+            print(f"    {Colors.CYAN}📍 Path:{Colors.RESET} {path} {Colors.CYAN}({format_size(size)}){Colors.RESET}")
+        
+        if not pretend:
+            try:
+                if action == 'delete_image':
+                    os.remove(path)
+                elif action == 'delete_empty':
+                    os.rmdir(path)
+                else:
+                    remove_tree(path)
+            except OSError as e:
+                print_delete_error(e)
+                report_action('error', path, reason, error=str(e))
+                continue
+        report_action(action, path, reason, size, pretend)
+        count(applied_key)
+        if action == 'delete_image':
+            count('images_deleted')
+        elif action == 'delete_empty':
+            count('empty_directories_deleted')
+        elif action == 'delete_sfv_failed':
+            count('sfv_failed_directories_deleted')
+        elif action == 'delete_duplicate':
+            count('duplicate_directories_deleted')
+        else:
+            count('keyword_directories_deleted')
+        count('total_size_deleted_bytes', size)
+        if action != 'delete_image':
+            deleted += 1
+    flush_output()
+    return deleted
+
+class RecordWriter:
+    """
+    Writes one compact JSON object per line through a large buffer, for --output ndjson.
+    
+    Records are collected in memory instead when no stream is given (shard processes
+    hand them to the parent).
+    """
+    BUFFER_SIZE = 1024 * 1024
+
+    def __init__(self, stream=None):
+        self.lock = threading.Lock()
+        self.file = None
+        self.lines = []
+        self.owned = False
+        if stream is not None:
+            try:
+                self.file = open(stream.fileno(), 'w', encoding='utf-8', buffering=self.BUFFER_SIZE, closefd=False)
+                self.owned = True
+            except (AttributeError, OSError, io.UnsupportedOperation):
+                # Not backed by a file descriptor (e.g. replaced by a caller of Cleaner): write to it as is
+                stream.flush()
+                self.file = stream
+
+    def write(self, record):
+        self.write_lines([json.dumps(record, separators=(',', ':'), ensure_ascii=False)])
+
+    def write_lines(self, lines):
+        with self.lock:
+            if self.file is None:
+                self.lines.extend(lines)
+            else:
+                self.file.writelines(line + '\n' for line in lines)
+
+    def take_lines(self):
+        """Return and forget the collected lines."""
+        with self.lock:
+            lines, self.lines = self.lines, []
+        return lines
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                if self.owned:
+                    self.file.close()
+                else:
+                    self.file.flush()
+                self.file = None
+
+def report_action(action, path, reason='', size=0, pretend=False, **fields):
+    """
+    Write the NDJSON record of one action (nothing unless --output ndjson).
+    
+    Args:
+        action: 'delete_keyword', 'delete_sfv_failed', 'delete_duplicate', 'delete_empty',
+                'delete_image', 'unzip', 'rename', 'skip' (plan entries not applied) or 'error'
+        path: Target directory or file
+        reason: Why the action is taken (ANSI colors are stripped)
+        size: Bytes the action frees (or extracts)
+        pretend: The action was only planned
+        fields: Extra fields, e.g. 'sfv' results or 'error'
+    """
+    if record_writer is None:
+        return
+    record = {'action': action, 'path': path, 'pretend': pretend}
+    if reason:
+        record['reason'] = ANSI_ESCAPE_PATTERN.sub('', reason)
+    if size:
+        record['size'] = size
+    record.update(fields)
+    record_writer.write(record)
+
+def sfv_summary(details):
+    """Compact per-SFV-file results for an NDJSON record: pass/fail and the failed entries."""
+    summary = {}
+    for sfv_file, data in details.items():
+        failed = {filename: result['status'] for filename, result in data['results'].items()
+                  if result['status'] != 'PASS'}
+        summary[sfv_file] = {'passed': data['passed'], 'failed': failed}
+    return summary
+
+_saved_stdout = None
+
+def configure_output(mode='text', collect=False):
+    """
+    Select the output mode.
+    
+    text prints every decision as before. ndjson writes one record per action to stdout
+    through RecordWriter and a summary record at the end, with colors turned off; any other
+    message goes to stderr. quiet prints nothing but the final statistics.
+    
+    Args:
+        mode: One of OUTPUT_MODES
+        collect: Collect the records for the parent process instead of writing them (shards)
+    """
+    global output_mode, text_output, record_writer, _saved_stdout
+    output_mode = mode
+    text_output = mode == 'text'
+    if mode == 'ndjson':
+        for name in vars(Colors).copy():
+            if name.isupper():
+                setattr(Colors, name, '')
+        record_writer = RecordWriter(None if collect else sys.stdout)
+    if mode != 'text' and not collect:
+        _saved_stdout = sys.stdout
+        sys.stdout = sys.stderr if mode == 'ndjson' else open(os.devnull, 'w', encoding='utf-8')
+
+def flush_output():
+    """Push buffered NDJSON records out, e.g. after each watch mode batch."""
+    if record_writer is not None:
+        record_writer.flush()
+
+def finish_output():
+    """Write the summary record and restore stdout, ahead of print_statistics."""
+    global record_writer, _saved_stdout
+    if record_writer is not None:
+        summary = {'action': 'summary', 'seconds': round(time.time() - start_time, 3), 'stats': dict(stats)}
+        summary.update(timings.snapshot())
+        record_writer.write(summary)
+        record_writer.close()
+        record_writer = None
+    if _saved_stdout is not None:
+        if output_mode == 'quiet':
+            sys.stdout.close()
+            sys.stdout = _saved_stdout
+        _saved_stdout = None
+
+def _histogram_label(bounds, i):
+    def seconds(value):
+        return f"{value * 1000:g}ms" if value < 1 else f"{value:g}s"
+    if i == len(bounds):
+        return f">= {seconds(bounds[-1])}"
+    return f"< {seconds(bounds[i])}"
+
+def print_timings():
+    """Print the stage timers, the hashing and deletion histograms and the slowest directories."""
+    snapshot = timings.snapshot()
+    if not snapshot['stages']:
+        return
+    print(f"\n{Colors.BOLD}{Colors.UNDERLINE}⏱️  Stage Timings (summed over worker threads):{Colors.RESET}")
+    ordered = sorted(snapshot['stages'].items(), key=lambda item: item[1]['seconds'], reverse=True)
+    for stage, data in ordered:
+        line = (f"  {Colors.BLUE}▪️{Colors.RESET} {stage:<15} {data['calls']:>9,} calls {data['seconds']:>9.2f}s total "
+                f"{data['seconds'] / data['calls'] * 1000:>9.2f} ms avg {data['max_seconds'] * 1000:>10.1f} ms max")
+        if data['bytes']:
+            rate = data['bytes'] / data['seconds'] if data['seconds'] > 0 else 0
+            line += f"  {format_size(data['bytes'])} ({format_size(int(rate))}/s)"
+        print(line)
+    
+    for stage, data in snapshot['histograms'].items():
+        total = sum(data['counts'])
+        if not total:
+            continue
+        print(f"\n  {Colors.CYAN}📊 {stage} latency:{Colors.RESET}")
+        widest = max(data['counts'])
+        for i, value in enumerate(data['counts']):
+            bar = '█' * (round(30 * value / widest) if widest else 0)
+            print(f"    {_histogram_label(data['bounds'], i):>9} {value:>9,} {bar}")
+    
+    if snapshot['slowest_directories']:
+        print(f"\n  {Colors.YELLOW}🐢 Slowest directories to verify:{Colors.RESET}")
+        for item in snapshot['slowest_directories']:
+            print(f"    {item['seconds']:>8.2f}s  {item['path']}")
+
+def export_statistics(json_path):
+    """
+    Write the statistics counters and the stage timings to a JSON file.
+    
+    Returns:
+        True if the file was written
+    """
+    data = {'seconds': time.time() - start_time, 'stats': dict(stats)}
+    data.update(timings.snapshot())
+    try:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+    except OSError as e:
+        print(f"{Colors.RED}❌ Could not write statistics to {json_path}: {e}{Colors.RESET}")
+        return False
+    return True
+
+# Prometheus metric name prefix and the default interval between textfile updates
+METRICS_PREFIX = 'incoming_cleanup'
+DEFAULT_METRICS_INTERVAL = 60
+
+# Statistics counters exported under a shared metric name with a label, by key prefix and
+# the label values that belong to the family (None for any); other keys stay plain counters
+SFV_FILE_STATUSES = ('pass', 'fail', 'missing', 'size', 'error')
+LABELED_COUNTERS = (
+    ('files_', 'files_by_extension', 'extension', None),
+    ('sfv_files_', 'sfv_files', 'status', SFV_FILE_STATUSES),
+    ('io_files:', 'device_hashed_files', 'device', None),
+    ('io_bytes:', 'device_hashed_bytes', 'device', None),
+)
+
+def _metric_name(key):
+    return re.sub(r'[^a-zA-Z0-9_]', '_', key).strip('_').lower()
+
+def _metric_value(value):
+    # Integers stay exact and floats keep their full precision (timestamps, byte counts)
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def format_metrics(completed=False, labels=None):
+    """
+    Render the statistics counters and stage timings in the Prometheus text format.
+    
+    Counters are exported as <prefix>_<key>_total (families such as files_<ext> as one
+    metric with a label), stage timings per stage label, and the hashing and deletion
+    latencies as histograms.
+    
+    Args:
+        completed: The run has finished (watch mode never finishes)
+        labels: Optional run labels for the info metric
+    
+    Returns:
+        Text of the metrics file
+    """
+    lines = []
+    
+    def family(name, metric_type, help_text, samples):
+        full_name = f"{METRICS_PREFIX}_{name}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} {metric_type}")
+        for suffix, sample_labels, value in samples:
+            label_text = ','.join(f'{key}="{_label_value(val)}"' for key, val in sample_labels.items())
+            lines.append(f"{full_name}{suffix}{{{label_text}}} {_metric_value(value)}" if label_text
+                         else f"{full_name}{suffix} {_metric_value(value)}")
+    
+    now = time.time()
+    family('run_info', 'gauge', 'Settings of the current or last run.', [('', labels or {}, 1)])
+    family('run_start_time_seconds', 'gauge', 'Start of the current or last run.', [('', {}, start_time)])
+    family('run_duration_seconds', 'gauge', 'Duration of the run so far.', [('', {}, now - start_time)])
+    family('run_completed', 'gauge', '1 once the run has finished.', [('', {}, 1 if completed else 0)])
+    family('last_update_time_seconds', 'gauge', 'Time the metrics were written.', [('', {}, now)])
+    
+    with stats_lock:
+        counters = dict(stats)
+    grouped = {}
+    plain = {}
+    for key, value in counters.items():
+        for prefix, name, label, label_values in LABELED_COUNTERS:
+            if key.startswith(prefix) and (label_values is None or key[len(prefix):] in label_values):
+                grouped.setdefault((name, label), []).append((key[len(prefix):], value))
+                break
+        else:
+            plain[key] = value
+    for key in sorted(plain):
+        name = _metric_name(key)
+        family(f"{name}_total", 'counter', f"Statistics counter '{key}' of the run.", [('', {}, plain[key])])
+    for (name, label), values in sorted(grouped.items()):
+        family(f"{name}_total", 'counter', f"Statistics counters by {label}.",
+               [('', {label: value_label}, value) for value_label, value in sorted(values)])
+    
+    snapshot = timings.snapshot()
+    stages = sorted(snapshot['stages'].items())
+    if stages:
+        family('stage_calls_total', 'counter', 'Calls per stage.',
+               [('', {'stage': stage}, data['calls']) for stage, data in stages])
+        family('stage_seconds_total', 'counter', 'Time spent per stage, summed over threads.',
+               [('', {'stage': stage}, data['seconds']) for stage, data in stages])
+        family('stage_max_seconds', 'gauge', 'Longest single call per stage.',
+               [('', {'stage': stage}, data['max_seconds']) for stage, data in stages])
+        family('stage_bytes_total', 'counter', 'Bytes read or written per stage.',
+               [('', {'stage': stage}, data['bytes']) for stage, data in stages if data['bytes']])
+        family('stage_throughput_bytes_per_second', 'gauge', 'Bytes per second of stage time.',
+               [('', {'stage': stage}, data['bytes'] / data['seconds'])
+                for stage, data in stages if data['bytes'] and data['seconds'] > 0])
+    for stage, data in sorted(snapshot['histograms'].items()):
+        samples = []
+        cumulative = 0
+        for bound, value in zip(data['bounds'] + ['+Inf'], data['counts']):
+            cumulative += value
+            samples.append(('_bucket', {'stage': stage, 'le': bound if bound == '+Inf' else f"{bound:g}"}, cumulative))
+        samples.append(('_sum', {'stage': stage}, snapshot['stages'][stage]['seconds']))
+        samples.append(('_count', {'stage': stage}, cumulative))
+        family(f"{stage}_latency_seconds", 'histogram', f"Latency of {stage} calls.", samples)
+    return '\n'.join(lines) + '\n'
+
+class MetricsExporter:
+    """
+    Keeps a node-exporter textfile-collector file up to date: rewritten every interval
+    seconds while the run lasts (and in watch mode) and once more at the end. The file is
+    replaced atomically so the collector never reads half of it.
+    """
+
+    def __init__(self, metrics_path, interval=DEFAULT_METRICS_INTERVAL, labels=None):
+        self.metrics_path = metrics_path
+        self.interval = interval
+        self.labels = labels or {}
+        self.stopping = threading.Event()
+        self.failed = False
+        self.write()
+        self.thread = None
+        if interval > 0:
+            self.thread = threading.Thread(target=self._loop, name='metrics', daemon=True)
+            self.thread.start()
+
+    def write(self, completed=False):
+        tmp_path = self.metrics_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(format_metrics(completed, self.labels))
+            os.replace(tmp_path, self.metrics_path)
+        except OSError as e:
+            if not self.failed:
+                # Reported once; a collector directory that comes back is picked up again
+                with output_lock:
+                    print(f"{Colors.RED}❌ Could not write metrics to {self.metrics_path}: {e}{Colors.RESET}")
+            self.failed = True
+            return
+        self.failed = False
+
+    def _loop(self):
+        while not self.stopping.wait(self.interval):
+            self.write()
+
+    def close(self, completed=False):
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.write(completed)
+
+# Textfile metrics exporter (see MetricsExporter), None when not exporting
+metrics_exporter = None
+
+def configure_metrics(metrics_path, interval=DEFAULT_METRICS_INTERVAL, labels=None):
+    """Start exporting the statistics to metrics_path (a .prom file in the textfile-collector directory)."""
+    global metrics_exporter
+    ignore_files(metrics_path, metrics_path + '.tmp')
+    metrics_exporter = MetricsExporter(metrics_path, interval, labels)
+
+def close_metrics(completed=False):
+    """Write the final metrics and stop the periodic updates."""
+    global metrics_exporter
+    if metrics_exporter is not None:
+        metrics_exporter.close(completed)
+        metrics_exporter = None
+
+class Profiler:
+    """
+    cProfile over the whole run, including the pipeline's worker threads: every thread
+    started while profiling gets its own profiler, and the results are combined at the end.
+    From Python 3.12 only one profiler can be active in a process, so only the main thread
+    is profiled there. Shard processes (--processes) are not profiled.
+    """
+    
+    # cProfile is built on sys.monitoring from 3.12, which takes a single profiler per process
+    PER_THREAD = sys.version_info < (3, 12)
+
+    def __init__(self):
+        import cProfile
+        self.lock = threading.Lock()
+        self.new_profile = cProfile.Profile
+        self.profilers = [self.new_profile()]
+        self.per_thread = self.PER_THREAD
+
+    def _start_thread(self, frame, event, arg):
+        # Runs on the first event of each new thread; the thread's own profiler replaces it
+        sys.setprofile(None)
+        if not self.per_thread:
+            return
+        profiler = self.new_profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active; fall back to the main thread only
+            self.per_thread = False
+            threading.setprofile(None)
+            return
+        with self.lock:
+            self.profilers.append(profiler)
+
+    def start(self):
+        if self.per_thread:
+            threading.setprofile(self._start_thread)
+        else:
+            print(f"{Colors.YELLOW}⚠️  Profiling the main thread only; worker threads can't have their own "
+                  f"profiler on Python {sys.version_info.major}.{sys.version_info.minor}{Colors.RESET}")
+        self.profilers[0].enable()
+
+    def stop(self):
+        """Stop profiling this thread and new threads (worker threads have finished by now)."""
+        self.profilers[0].disable()
+        threading.setprofile(None)
+
+    def report(self, pstats_path, top=20):
+        """Dump the combined pstats to pstats_path and print the top functions by cumulative time."""
+        import pstats
+        with self.lock:
+            profilers = list(self.profilers)
+        combined = pstats.Stats(profilers[0], stream=sys.stdout)
+        for profiler in profilers[1:]:
+            try:
+                combined.add(profiler)
+            except TypeError:
+                # A thread that never made a call has nothing to add
+                continue
+        try:
+            combined.dump_stats(pstats_path)
+        except OSError as e:
+            print(f"{Colors.RED}❌ Could not write profile to {pstats_path}: {e}{Colors.RESET}")
+        else:
+            print(f"\n{Colors.BLUE}🔬 Profile written to {pstats_path}{Colors.RESET} (view with: python -m pstats {pstats_path})")
+        combined.sort_stats('cumulative').print_stats(top)
+
+def print_statistics():
+    """Print comprehensive statistics about the operation."""
+    end_time = time.time()
+    duration = end_time - start_time
+    
+    print(f"\n{Colors.BOLD}{Colors.BG_BLUE}                    OPERATION STATISTICS                    {Colors.RESET}")
+    print(f"{Colors.BOLD}{'='*60}{Colors.RESET}")
+    
+    # Time and performance stats
+    print(f"{Colors.CYAN}⏱️  Execution Time:{Colors.RESET} {duration:.2f} seconds")
+    
+    # Directory and file statistics
+    print(f"\n{Colors.BOLD}{Colors.UNDERLINE}📁 Directory & File Overview:{Colors.RESET}")
     print(f"  {Colors.GREEN}📂 Total directories scanned:{Colors.RESET} {Colors.BOLD}{stats['total_directories']:,}{Colors.RESET}")
     print(f"  {Colors.GREEN}📄 Total files found:{Colors.RESET} {Colors.BOLD}{stats['total_files']:,}{Colors.RESET}")
     print(f"  {Colors.GREEN}💾 Total data size:{Colors.RESET} {Colors.BOLD}{format_size(stats['total_size_bytes'])}{Colors.RESET}")
@@ -463,114 +3675,1092 @@ def print_statistics():
     print(f"  {Colors.RED}📋 SFV failed directories removed:{Colors.RESET} {Colors.BOLD}{stats.get('sfv_failed_directories_deleted', 0)}{Colors.RESET}")
     print(f"  {Colors.CYAN}🖼️  Images deleted:{Colors.RESET} {Colors.BOLD}{stats['images_deleted']}{Colors.RESET}")
     
-    total_deleted = stats['empty_directories_deleted'] + stats['keyword_directories_deleted'] + stats.get('sfv_failed_directories_deleted', 0)
+    if stats.get('dedupe_releases', 0) or stats.get('duplicate_directories_deleted', 0):
+        print(f"\n{Colors.BOLD}{Colors.UNDERLINE}🧬 Duplicate Releases:{Colors.RESET}")
+        if stats.get('dedupe_releases', 0):
+            print(f"  {Colors.BLUE}📚 Releases compared:{Colors.RESET} {Colors.BOLD}{stats['dedupe_releases']:,}{Colors.RESET}"
+                  f" ({stats['dedupe_size_matches']:,} sharing their file sizes with another)")
+            print(f"  {Colors.GREEN}✂️  Partial hashes:{Colors.RESET} {Colors.BOLD}{stats['dedupe_partial_files']:,}{Colors.RESET} files, "
+                  f"{format_size(stats['dedupe_partial_bytes'])} read")
+            print(f"  {Colors.YELLOW}🔄 Files hashed in full:{Colors.RESET} {Colors.BOLD}{stats['dedupe_full_files']:,}{Colors.RESET}"
+                  f" ({stats['dedupe_crcs_reused']:,} checksums reused from SFV files and the CRC cache)")
+            mismatches = stats.get('dedupe_confirm_mismatches', 0)
+            print(f"  {Colors.GREEN}🔬 Confirmed byte for byte:{Colors.RESET} {format_size(stats['dedupe_confirmed_bytes'])} compared"
+                  f"{f' ({mismatches:,} checksum matches kept as the bytes differ)' if mismatches else ''}")
+        print(f"  {Colors.RED}🗑️  Duplicates removed:{Colors.RESET} {Colors.BOLD}{stats['duplicate_directories_deleted']:,}{Colors.RESET}")
+    
+    if stats.get('sfv_size_mismatches', 0) or stats.get('sfv_files_not_hashed', 0):
+        print(f"\n{Colors.BOLD}{Colors.UNDERLINE}📋 SFV Verification:{Colors.RESET}")
+        print(f"  {Colors.RED}📏 Size mismatches (not hashed):{Colors.RESET} {Colors.BOLD}{stats['sfv_size_mismatches']:,}{Colors.RESET}")
+        print(f"  {Colors.GREEN}⏭️  Files not verified after a failure:{Colors.RESET} {Colors.BOLD}{stats['sfv_files_not_hashed']:,}{Colors.RESET}")
+    
+    if crc_cache is not None or stats.get('crc_cache_hits', 0) or stats.get('crc_cache_misses', 0):
+        print(f"\n{Colors.BOLD}{Colors.UNDERLINE}🧮 CRC Cache:{Colors.RESET}")
+        print(f"  {Colors.GREEN}✅ Cache hits:{Colors.RESET} {Colors.BOLD}{stats['crc_cache_hits']:,}{Colors.RESET}")
+        print(f"  {Colors.YELLOW}🔄 Cache misses (hashed):{Colors.RESET} {Colors.BOLD}{stats['crc_cache_misses']:,}{Colors.RESET}")
+        if stats.get('crc_cache_evicted', 0):
+            print(f"  {Colors.BLUE}🧹 Stale entries evicted:{Colors.RESET} {Colors.BOLD}{stats['crc_cache_evicted']:,}{Colors.RESET}")
+    
+    if io_throttle is not None:
+        print(f"\n{Colors.BOLD}{Colors.UNDERLINE}🚦 Throttling:{Colors.RESET}")
+        print(f"  {Colors.BLUE}⚙️  Limits at the end:{Colors.RESET} {io_throttle.describe()}")
+        print(f"  {Colors.GREEN}📖 Bytes read:{Colors.RESET} {Colors.BOLD}{format_size(stats['throttle_read_bytes'])}{Colors.RESET}"
+              f" (threads waited {stats['throttle_read_wait_seconds']:.1f}s in total)")
+        print(f"  {Colors.GREEN}📇 Metadata operations:{Colors.RESET} {Colors.BOLD}{stats['throttle_metadata_ops']:,}{Colors.RESET}"
+              f" (threads waited {stats['throttle_metadata_wait_seconds']:.1f}s in total)")
+        if stats.get('throttle_reloads', 0):
+            print(f"  {Colors.BLUE}🔁 Limit changes applied:{Colors.RESET} {Colors.BOLD}{stats['throttle_reloads']:,}{Colors.RESET}")
+    
+    io_devices = sorted(key.split(':', 1)[1] for key in stats if key.startswith('io_files:'))
+    if io_devices:
+        print(f"\n{Colors.BOLD}{Colors.UNDERLINE}💽 Hashing per Device:{Colors.RESET}")
+        for label in io_devices:
+            print(f"  {Colors.BLUE}▪️  Device {label}:{Colors.RESET} {Colors.BOLD}{stats['io_files:' + label]:,}{Colors.RESET} files, "
+                  f"{Colors.BOLD}{format_size(stats['io_bytes:' + label])}{Colors.RESET}")
+    
+    if stats.get('unchanged_dirs_skipped', 0):
+        print(f"\n{Colors.BOLD}{Colors.UNDERLINE}🧭 Skipped Subtrees (incremental index / checkpoint):{Colors.RESET}")
+        print(f"  {Colors.GREEN}⏭️  Unchanged directories skipped:{Colors.RESET} {Colors.BOLD}{stats['unchanged_dirs_skipped']:,}{Colors.RESET}")
+        print(f"  {Colors.GREEN}💾 Data in skipped directories:{Colors.RESET} {Colors.BOLD}{format_size(stats['unchanged_bytes_skipped'])}{Colors.RESET}")
+    
+    if (stats.get('plan_actions_written', 0) or stats.get('plan_actions_applied', 0)
+            or stats.get('plan_actions_would_apply', 0) or stats.get('plan_actions_skipped', 0)):
+        print(f"\n{Colors.BOLD}{Colors.UNDERLINE}📝 Plan:{Colors.RESET}")
+        if stats.get('plan_actions_written', 0):
+            print(f"  {Colors.BLUE}✍️  Actions written:{Colors.RESET} {Colors.BOLD}{stats['plan_actions_written']:,}{Colors.RESET}")
+        else:
+            if stats.get('plan_actions_would_apply', 0):
+                print(f"  {Colors.YELLOW}🔍 Actions that would be applied:{Colors.RESET} {Colors.BOLD}{stats['plan_actions_would_apply']:,}{Colors.RESET}")
+            else:
+                print(f"  {Colors.GREEN}✅ Actions applied:{Colors.RESET} {Colors.BOLD}{stats['plan_actions_applied']:,}{Colors.RESET}")
+            print(f"  {Colors.YELLOW}⏭️  Actions skipped (changed or gone):{Colors.RESET} {Colors.BOLD}{stats['plan_actions_skipped']:,}{Colors.RESET}")
+    
+    if stats.get('quarantined_dirs', 0) or stats.get('purged_entries', 0) or stats.get('quarantine_pending', 0):
+        print(f"\n{Colors.BOLD}{Colors.UNDERLINE}🗄️  Quarantine:{Colors.RESET}")
+        print(f"  {Colors.YELLOW}📥 Directories quarantined:{Colors.RESET} {Colors.BOLD}{stats['quarantined_dirs']:,}{Colors.RESET}")
+        print(f"  {Colors.RED}🔥 Entries purged:{Colors.RESET} {Colors.BOLD}{stats['purged_entries']:,}{Colors.RESET} "
+              f"({stats['purged_files']:,} files, {format_size(stats['purged_bytes'])})")
+        print(f"  {Colors.BLUE}⏳ Entries awaiting purge:{Colors.RESET} {Colors.BOLD}{stats['quarantine_pending']:,}{Colors.RESET}")
+        if stats.get('quarantine_cross_device', 0):
+            print(f"  {Colors.YELLOW}⚠️  Deleted in place (other filesystem):{Colors.RESET} {Colors.BOLD}{stats['quarantine_cross_device']:,}{Colors.RESET}")
+        if stats.get('purge_errors', 0):
+            print(f"  {Colors.RED}❌ Purge errors:{Colors.RESET} {Colors.BOLD}{stats['purge_errors']:,}{Colors.RESET}")
+    
+    print_timings()
+    
+    total_deleted = (stats['empty_directories_deleted'] + stats['keyword_directories_deleted']
+                     + stats.get('sfv_failed_directories_deleted', 0) + stats.get('duplicate_directories_deleted', 0))
     print(f"\n{Colors.BOLD}{Colors.BG_GREEN} TOTAL DIRECTORIES DELETED: {total_deleted} {Colors.RESET}")
     
     if stats.get('images_deleted', 0) > 0:
         print(f"{Colors.BOLD}{Colors.BG_BLUE} TOTAL IMAGES DELETED: {stats['images_deleted']} {Colors.RESET}")
     
-    if stats.get('total_size_deleted_bytes', 0) > 0:
-        print(f"{Colors.BOLD}{Colors.BG_RED} TOTAL DATA FREED: {format_size(stats['total_size_deleted_bytes'])} {Colors.RESET}")
+    if stats.get('total_size_deleted_bytes', 0) > 0:
+        print(f"{Colors.BOLD}{Colors.BG_RED} TOTAL DATA FREED: {format_size(stats['total_size_deleted_bytes'])} {Colors.RESET}")
+    
+    if stats.get('rmtree_seconds', 0) > 0:
+        rmtree_seconds = stats['rmtree_seconds']
+        print(f"{Colors.CYAN}🧹 Tree deletion:{Colors.RESET} {stats['rmtree_files']:,} files, {stats['rmtree_dirs']:,} directories, "
+              f"{format_size(stats['rmtree_bytes'])} in {rmtree_seconds:.2f}s "
+              f"({stats['rmtree_files'] / rmtree_seconds:,.0f} files/s, {format_size(int(stats['rmtree_bytes'] / rmtree_seconds))}/s)")
+    
+    # Efficiency metrics
+    if stats['total_directories'] > 0:
+        deletion_rate = (total_deleted / stats['total_directories']) * 100
+        print(f"\n{Colors.CYAN}📈 Deletion Rate:{Colors.RESET} {deletion_rate:.1f}% of directories processed")
+    
+    print(f"{Colors.BOLD}{'='*60}{Colors.RESET}")
+    
+    if total_deleted > 0:
+        print(f"{Colors.GREEN}✅ Cleanup completed successfully!{Colors.RESET}")
+    else:
+        print(f"{Colors.BLUE}ℹ️  No directories matched deletion criteria.{Colors.RESET}")
+
+# Signal handler for graceful shutdown
+def signal_handler(signum, frame):
+    """Handle interrupt signals gracefully."""
+    global shutdown_requested
+    print(f"\n{Colors.YELLOW}🛑 Interrupt received. Finishing current operation...{Colors.RESET}")
+    shutdown_requested = True
+    
+def setup_signal_handlers():
+    """Setup signal handlers for graceful shutdown."""
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+def _load_tqdm():
+    """Import tqdm on first use. Returns True if it is available."""
+    global tqdm, TQDM_AVAILABLE
+    if TQDM_AVAILABLE is None:
+        try:
+            from tqdm import tqdm
+            TQDM_AVAILABLE = True
+        except ImportError:
+            TQDM_AVAILABLE = False
+            print("Warning: tqdm not available. Install with 'pip install tqdm' for progress bars.")
+    return TQDM_AVAILABLE
+
+def _load_pil():
+    """Import Pillow on first use. Returns True if it is available."""
+    global Image, PIL_AVAILABLE
+    if PIL_AVAILABLE is None:
+        try:
+            from PIL import Image
+            PIL_AVAILABLE = True
+        except ImportError:
+            PIL_AVAILABLE = False
+            print("Warning: PIL (Pillow) not available. Install with 'pip install Pillow' for TIFF and other image formats.")
+    return PIL_AVAILABLE
+
+# JPEG start-of-frame markers (baseline, progressive, lossless, arithmetic); they carry the dimensions
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# JPEG markers without a length field
+JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+def _jpeg_dimensions(f):
+    """Walk JPEG segment headers until a start-of-frame marker, seeking over segment bodies."""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        # Skip fill bytes
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image or start of scan without a frame header
+            return None
+        length_bytes = f.read(2)
+        if len(length_bytes) != 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) != 5:
+                return None
+            height, width = struct.unpack('>xHH', frame)
+            return width, height
+        if length < 2:
+            return None
+        f.seek(length - 2, os.SEEK_CUR)
+
+def probe_image_dimensions(file_path):
+    """
+    Read image dimensions from the file header without decoding the image.
+    
+    Understands JPEG, PNG, GIF, BMP and WebP; only the first bytes of the file are read
+    (for JPEG, just the segment headers up to the frame header).
+    
+    Args:
+        file_path: Path to image file
+    
+    Returns:
+        Tuple of (width, height), or None if the format is not recognised or the header is damaged
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(32)
+            if head[:2] == b'\xff\xd8':
+                return _jpeg_dimensions(f)
+            if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', head[6:10])
+            if head[:2] == b'BM' and len(head) >= 26:
+                header_size = struct.unpack('<I', head[14:18])[0]
+                if header_size == 12:
+                    return struct.unpack('<HH', head[18:22])
+                width, height = struct.unpack('<ii', head[18:26])
+                return abs(width), abs(height)
+            if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+                chunk = head[12:16]
+                if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+                    width, height = struct.unpack('<HH', head[26:30])
+                    return width & 0x3FFF, height & 0x3FFF
+                if chunk == b'VP8L' and head[20:21] == b'\x2f':
+                    bits = struct.unpack('<I', head[21:25])[0]
+                    return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+                if chunk == b'VP8X':
+                    width = int.from_bytes(head[24:27], 'little') + 1
+                    height = int.from_bytes(head[27:30], 'little') + 1
+                    return width, height
+    except (OSError, struct.error):
+        pass
+    return None
+
+@timed_stage('image_probe')
+def get_image_dimensions(file_path):
+    """
+    Get image dimensions, probing the file header first and using PIL only as a fallback
+    (TIFF and anything the probe doesn't recognise).
+    
+    Args:
+        file_path: Path to image file
+    
+    Returns:
+        Tuple of (width, height) or None if unable to read
+    """
+    dimensions = probe_image_dimensions(file_path)
+    if dimensions is not None:
+        return dimensions
+    
+    if not _load_pil():
+        return None
+    
+    try:
+        with Image.open(file_path) as img:
+            return img.size
+    except (OSError, IOError, Image.UnidentifiedImageError):
+        return None
+
+def should_delete_image(file_path, filename):
+    """
+    Check if an image file should be deleted based on size or "proof" in name.
+    
+    Args:
+        file_path: Full path to the file
+        filename: Just the filename
+    
+    Returns:
+        Tuple of (should_delete: bool, reason: str)
+    """
+    # Check if filename contains "proof"
+    if PROOF_PATTERN.search(filename):
+        return True, "contains 'proof'"
+    
+    # Check image dimensions
+    dimensions = get_image_dimensions(file_path)
+    if dimensions:
+        width, height = dimensions
+        if width < 300 or height < 300:
+            return True, f"small resolution ({width}x{height})"
+    
+    return False, ""
+
+def classify_images(dir_path, filenames):
+    """
+    Run should_delete_image over several images, concurrently when an image worker pool is configured.
+    
+    Args:
+        dir_path: Directory containing the images
+        filenames: Image filenames in that directory
+    
+    Returns:
+        Dictionary mapping filename -> (should_delete: bool, reason: str)
+    """
+    def check(filename):
+        return should_delete_image(os.path.join(dir_path, filename), filename)
+    
+    if image_executor is None or len(filenames) < 2:
+        return {filename: check(filename) for filename in filenames}
+    return dict(zip(filenames, image_executor.map(check, filenames)))
+
+def configure_image_workers(workers=1):
+    """
+    Configure the thread pool used to probe image dimensions.
+    
+    Args:
+        workers: Number of images probed concurrently (1 probes on the main thread)
+    """
+    global image_executor
+    shutdown_image_workers()
+    if workers > 1:
+        image_executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image')
+
+def shutdown_image_workers():
+    """Stop the image probing pool."""
+    global image_executor
+    if image_executor is not None:
+        image_executor.shutdown(wait=True, cancel_futures=True)
+        image_executor = None
+
+def parse_size(value):
+    """
+    Parse a byte size such as '65536', '64K', '1M' or '2G'.
+    
+    Args:
+        value: Size string with an optional K/M/G/T suffix (powers of 1024)
+    
+    Returns:
+        Size in bytes
+    """
+    text = str(value).strip().upper().rstrip('B')
+    multiplier = 1
+    for suffix, factor in (('K', 1024), ('M', 1024 ** 2), ('G', 1024 ** 3), ('T', 1024 ** 4)):
+        if text.endswith(suffix):
+            text = text[:-1]
+            multiplier = factor
+            break
+    try:
+        size = int(float(text) * multiplier)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}")
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f"size must be positive: {value!r}")
+    return size
+
+class TokenBucket:
+    """
+    Token bucket allowing rate units per second with bursts of up to one second's worth.
+    
+    A request larger than the bucket is granted at once and paid back as debt, so callers
+    never have to split their reads to fit.
+    """
+
+    def __init__(self, rate=0):
+        self.lock = threading.Lock()
+        self.rate = 0
+        self.tokens = 0.0
+        self.last = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        """Change the rate; 0 or less removes the limit."""
+        with self.lock:
+            self.rate = max(0, rate)
+            self.tokens = min(self.tokens, self.rate) if self.rate else 0.0
+            self.last = time.monotonic()
+
+    def take(self, amount):
+        """
+        Take amount tokens.
+        
+        Returns:
+            Seconds the caller has to wait before using them
+        """
+        with self.lock:
+            if not self.rate:
+                return 0.0
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= amount
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+class IoThrottle:
+    """
+    Limits on the bytes read (hashing, ZIP extraction) and on metadata operations (stat,
+    directory listings, unlink, rmdir) per second, so a cleanup run can share a volume
+    with the streaming server.
+    
+    The limits can be changed while running through a control file of 'read-rate = 50M'
+    and 'metadata-rate = 2000' lines (0 for no limit, keys left out keep their command line
+    value). The file is read when its modification time changes and on SIGHUP. When the
+    work is shared between several processes, each one gets its share of the limits.
+    """
+    CONTROL_POLL_SECONDS = 1.0
+    CONTROL_KEYS = ('read-rate', 'metadata-rate')
+
+    def __init__(self, read_rate=0, metadata_rate=0, control_path=None, share=1, announce=True):
+        self.defaults = {'read-rate': read_rate, 'metadata-rate': metadata_rate}
+        self.control_path = control_path
+        self.share = max(1, share)
+        self.announce = False
+        self.read_bucket = TokenBucket()
+        self.metadata_bucket = TokenBucket()
+        self.lock = threading.Lock()
+        self.control_mtime = None
+        self.next_poll = 0.0
+        self.reload_requested = False
+        self.apply(dict(self.defaults))
+        self.poll_control_file()
+        self.announce = announce
+
+    def apply(self, rates):
+        self.rates = rates
+        self.read_bucket.set_rate(rates['read-rate'] / self.share)
+        self.metadata_bucket.set_rate(rates['metadata-rate'] / self.share)
+
+    def describe(self):
+        read_rate = self.rates['read-rate']
+        metadata_rate = self.rates['metadata-rate']
+        reads = f"{format_size(read_rate)}/s" if read_rate else 'unlimited'
+        metadata = f"{metadata_rate:,.0f} ops/s" if metadata_rate else 'unlimited'
+        return f"reads {reads}, metadata {metadata}"
+
+    def load_control_file(self):
+        """
+        Read the control file.
+        
+        Returns:
+            Dictionary of rates, or None if the file can't be used
+        """
+        rates = dict(self.defaults)
+        try:
+            with open(self.control_path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+        for line in lines:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            key, sep, value = line.partition('=')
+            key = key.strip().lower()
+            value = value.strip()
+            if not sep or key not in self.CONTROL_KEYS:
+                continue
+            try:
+                if value.lower() in ('unlimited', 'none'):
+                    rates[key] = 0
+                elif key == 'read-rate':
+                    rates[key] = parse_size_or_zero(value)
+                else:
+                    rates[key] = max(0.0, float(value))
+            except (ValueError, argparse.ArgumentTypeError):
+                with output_lock:
+                    print(f"{Colors.YELLOW}⚠️  Ignoring invalid {key} in {self.control_path}: {value}{Colors.RESET}")
+        return rates
+
+    def poll_control_file(self, force=False):
+        """Apply the control file if it changed since it was last read."""
+        if self.control_path is None:
+            return
+        try:
+            mtime = os.stat(self.control_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime is None or (mtime == self.control_mtime and not force):
+            return
+        self.control_mtime = mtime
+        rates = self.load_control_file()
+        if rates is None or rates == self.rates:
+            return
+        self.apply(rates)
+        if self.announce:
+            count('throttle_reloads')
+            with output_lock:
+                print(f"{Colors.BLUE}🚦 Throttle changed:{Colors.RESET} {self.describe()}")
+
+    def refresh(self):
+        """Poll the control file at most every CONTROL_POLL_SECONDS, or at once after SIGHUP."""
+        now = time.monotonic()
+        if now < self.next_poll and not self.reload_requested:
+            return
+        with self.lock:
+            if now < self.next_poll and not self.reload_requested:
+                return
+            force = self.reload_requested
+            self.reload_requested = False
+            self.next_poll = now + self.CONTROL_POLL_SECONDS
+            self.poll_control_file(force)
+
+    def _wait(self, bucket, amount, wait_key):
+        if self.control_path is not None:
+            self.refresh()
+        delay = bucket.take(amount)
+        if delay <= 0:
+            return
+        count(wait_key, delay)
+        deadline = time.monotonic() + delay
+        while not shutdown_requested:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(remaining, 0.1))
+
+    def read(self, nbytes):
+        count('throttle_read_bytes', nbytes)
+        self._wait(self.read_bucket, nbytes, 'throttle_read_wait_seconds')
+
+    def metadata(self, ops=1):
+        count('throttle_metadata_ops', ops)
+        self._wait(self.metadata_bucket, ops, 'throttle_metadata_wait_seconds')
+
+def throttle_read(nbytes):
+    """Account for nbytes read, waiting if the read bandwidth limit is exceeded."""
+    if io_throttle is not None:
+        io_throttle.read(nbytes)
+
+def throttle_metadata(ops=1):
+    """Account for metadata operations, waiting if the metadata rate limit is exceeded."""
+    if io_throttle is not None:
+        io_throttle.metadata(ops)
+
+def _reload_throttle(signum, frame):
+    """SIGHUP handler: re-read the throttle control file."""
+    if io_throttle is not None:
+        io_throttle.reload_requested = True
+
+def configure_throttle(read_rate=0, metadata_rate=0, control_path=None, share=1, announce=True):
+    """
+    Limit read bandwidth and metadata operations (see IoThrottle).
+    
+    Args:
+        read_rate: Bytes read per second, 0 for no limit
+        metadata_rate: Metadata operations per second, 0 for no limit
+        control_path: Optional control file for changing the limits while running
+        share: Number of processes sharing the limits
+        announce: Print limit changes (shard processes leave that to the parent)
+    """
+    global io_throttle
+    io_throttle = None
+    if read_rate > 0 or metadata_rate > 0 or control_path:
+        io_throttle = IoThrottle(read_rate, metadata_rate, control_path, share, announce)
+        if control_path and announce and hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, _reload_throttle)
+
+def parse_size_or_zero(value):
+    """Like parse_size, but '0' means no limit."""
+    if str(value).strip() == '0':
+        return 0
+    return parse_size(value)
+
+def configure_hashing(block_size=None, method=None, drop_cache=None):
+    """
+    Configure the backend used by calculate_crc32.
+    
+    Args:
+        block_size: Bytes hashed per zlib.crc32 call
+        method: 'readinto' (reused buffer), 'mmap' (memory-mapped file) or 'read' (plain reads)
+        drop_cache: Advise the kernel to drop hashed pages so verification doesn't evict other data
+    """
+    global hash_block_size, hash_method, hash_drop_cache
+    if block_size is not None:
+        hash_block_size = block_size
+    if method is not None:
+        hash_method = method
+    if drop_cache is not None:
+        hash_drop_cache = drop_cache
+
+def _fadvise(fd, offset, length, advice_name):
+    """Best-effort posix_fadvise; silently skipped where unsupported."""
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, offset, length, advice)
+    except OSError:
+        pass
+
+def _crc32_read(f, block_size, drop_cache):
+    """Hash with plain f.read() calls, allocating a new bytes object per block."""
+    crc = 0
+    while True:
+        if shutdown_requested:
+            return None
+        chunk = f.read(block_size)
+        if not chunk:
+            break
+        throttle_read(len(chunk))
+        crc = zlib.crc32(chunk, crc)
+    return crc
+
+def _crc32_readinto(f, block_size, drop_cache):
+    """Hash by reading into a preallocated per-thread buffer, without per-block allocations."""
+    buf = getattr(_hash_buffers, 'buf', None)
+    if buf is None or len(buf) != block_size:
+        buf = bytearray(block_size)
+        _hash_buffers.buf = buf
+    view = memoryview(buf)
+    fd = f.fileno()
+    crc = 0
+    offset = 0
+    dropped = 0
+    while True:
+        if shutdown_requested:
+            return None
+        n = f.readinto(buf)
+        if not n:
+            break
+        throttle_read(n)
+        crc = zlib.crc32(view[:n], crc)
+        offset += n
+        if drop_cache and offset - dropped >= DROP_CACHE_WINDOW:
+            _fadvise(fd, dropped, offset - dropped, 'POSIX_FADV_DONTNEED')
+            dropped = offset
+    return crc
+
+def _crc32_mmap(f, block_size, drop_cache):
+    """Hash a memory-mapped file in blocks of block_size."""
+    size = os.fstat(f.fileno()).st_size
+    if size == 0:
+        return 0
+    crc = 0
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        with memoryview(mm) as view:
+            for offset in range(0, size, block_size):
+                if shutdown_requested:
+                    return None
+                throttle_read(min(block_size, size - offset))
+                crc = zlib.crc32(view[offset:offset + block_size], crc)
+        if drop_cache and hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+            mm.madvise(mmap.MADV_DONTNEED)
+    return crc
+
+_CRC32_BACKENDS = {
+    'read': _crc32_read,
+    'readinto': _crc32_readinto,
+    'mmap': _crc32_mmap,
+}
+
+def calculate_crc32(file_path, block_size=None, method=None, drop_cache=None):
+    """
+    Calculate CRC32 checksum for a file.
+    
+    Args:
+        file_path: Path to the file
+        block_size: Bytes hashed per block (default: configured hash_block_size)
+        method: Hashing backend (default: configured hash_method)
+        drop_cache: Drop hashed pages from the page cache (default: configured hash_drop_cache)
     
-    # Efficiency metrics
-    if stats['total_directories'] > 0:
-        deletion_rate = (total_deleted / stats['total_directories']) * 100
-        print(f"\n{Colors.CYAN}📈 Deletion Rate:{Colors.RESET} {deletion_rate:.1f}% of directories processed")
+    Returns:
+        CRC32 checksum as an 8-character uppercase hex string, or None if error
+    """
+    block_size = block_size or hash_block_size
+    backend = _CRC32_BACKENDS[method or hash_method]
+    drop_cache = hash_drop_cache if drop_cache is None else drop_cache
+    try:
+        start = time.perf_counter()
+        with open(file_path, 'rb', buffering=0) as f:
+            fd = f.fileno()
+            _fadvise(fd, 0, 0, 'POSIX_FADV_SEQUENTIAL')
+            crc = backend(f, block_size, drop_cache)
+            if drop_cache:
+                _fadvise(fd, 0, 0, 'POSIX_FADV_DONTNEED')
+            timings.add('hash', time.perf_counter() - start, os.fstat(fd).st_size)
+        if crc is None:
+            return None
+        
+        # Convert to unsigned 32-bit value and format as 8-char hex
+        return f"{crc & 0xffffffff:08X}"
+    except (OSError, IOError, ValueError) as e:
+        return None
+
+def _submit_crc32(file_path):
+    """Submit a hash to the worker pool, passing the backend settings along for process pools."""
+    if io_throttle is not None and isinstance(sfv_executor, concurrent.futures.ProcessPoolExecutor):
+        # Pool processes don't share the throttle; pay for the whole file before handing it over
+        file_stat = _stat_or_none(file_path)
+        if file_stat is not None:
+            throttle_read(file_stat.st_size)
+    return sfv_executor.submit(calculate_crc32, file_path, hash_block_size, hash_method, hash_drop_cache)
+
+def benchmark_crc32(file_path, rounds=3, block_size=None):
+    """
+    Compare the hashing backends on one file and print the throughput of each.
     
-    print(f"{Colors.BOLD}{'='*60}{Colors.RESET}")
+    The file is read once before timing so every backend sees a warm page cache;
+    the numbers therefore measure per-block overhead rather than disk speed.
     
-    if total_deleted > 0:
-        print(f"{Colors.GREEN}✅ Cleanup completed successfully!{Colors.RESET}")
-    else:
-        print(f"{Colors.BLUE}ℹ️  No directories matched deletion criteria.{Colors.RESET}")
+    Args:
+        file_path: File to hash
+        rounds: Number of timed runs per backend (the best one is reported)
+        block_size: Block size for the readinto and mmap backends
+    """
+    block_size = block_size or hash_block_size
+    size = os.path.getsize(file_path)
+    candidates = [
+        ('read (64 KB, legacy)', 'read', 65536),
+        (f'readinto ({format_size(block_size)})', 'readinto', block_size),
+        (f'mmap ({format_size(block_size)})', 'mmap', block_size),
+    ]
+    print(f"{Colors.CYAN}⏱️  Hash benchmark:{Colors.RESET} {file_path} ({format_size(size)}, best of {rounds})")
+    reference = calculate_crc32(file_path, 65536, 'read', drop_cache=False)
+    for label, method, method_block_size in candidates:
+        best = None
+        crc = None
+        for _ in range(rounds):
+            started = time.perf_counter()
+            crc = calculate_crc32(file_path, method_block_size, method, drop_cache=False)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        rate = size / best if best else 0
+        check = f"{Colors.GREEN}{crc}{Colors.RESET}" if crc == reference else f"{Colors.RED}{crc} (mismatch){Colors.RESET}"
+        print(f"  {Colors.BLUE}▪️{Colors.RESET} {label:<24} {best * 1000:9.1f} ms  {format_size(int(rate))}/s  {check}")
 
-# Signal handler for graceful shutdown
-def signal_handler(signum, frame):
-    """Handle interrupt signals gracefully."""
-    global shutdown_requested
-    print(f"\n{Colors.YELLOW}🛑 Interrupt received. Finishing current operation...{Colors.RESET}")
-    shutdown_requested = True
+class CrcCache:
+    """
+    On-disk cache of CRC32 results, keyed by file identity and modification stamp.
     
-def setup_signal_handlers():
-    """Setup signal handlers for graceful shutdown."""
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    A cached checksum is only used when the file's (device, inode, size, mtime_ns)
+    still match the values recorded when it was hashed, so changed or replaced
+    files are always read again.
+    """
+    COMMIT_EVERY = 500
 
-def get_image_dimensions(file_path):
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        self.uncommitted = 0
+        import sqlite3
+        # Shard processes share the database; wait for each other's commits instead of failing
+        self.conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS crc_cache ('
+            ' dev INTEGER NOT NULL, ino INTEGER NOT NULL, size INTEGER NOT NULL,'
+            ' mtime_ns INTEGER NOT NULL, path TEXT NOT NULL, crc TEXT NOT NULL,'
+            ' PRIMARY KEY (dev, ino))')
+        self.conn.commit()
+
+    def lookup(self, file_stat):
+        """Return the cached checksum for a stat result, or None if unknown or stale."""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT crc FROM crc_cache WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?',
+                file_stamp(file_stat)).fetchone()
+        return row[0] if row else None
+
+    def store(self, file_path, file_stat, crc):
+        """Record the checksum of a file hashed while it had the given stat result."""
+        with self.lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO crc_cache (dev, ino, size, mtime_ns, path, crc) VALUES (?, ?, ?, ?, ?, ?)',
+                file_stamp(file_stat) + (os.path.abspath(file_path), crc))
+            self.uncommitted += 1
+            if self.uncommitted >= self.COMMIT_EVERY:
+                self.conn.commit()
+                self.uncommitted = 0
+
+    def flush(self):
+        """Commit pending entries, e.g. before another process reads the cache."""
+        with self.lock:
+            self.conn.commit()
+            self.uncommitted = 0
+
+    def prune(self):
+        """
+        Evict entries whose files are gone or no longer match the recorded stamp.
+        
+        Returns:
+            Number of evicted entries
+        """
+        with self.lock:
+            rows = self.conn.execute('SELECT dev, ino, size, mtime_ns, path FROM crc_cache').fetchall()
+        stale = []
+        for dev, ino, size, mtime_ns, path in rows:
+            if shutdown_requested:
+                break
+            try:
+                st = os.stat(path)
+            except OSError:
+                stale.append((dev, ino))
+                continue
+            if file_stamp(st) != (dev, ino, size, mtime_ns):
+                stale.append((dev, ino))
+        with self.lock:
+            self.conn.executemany('DELETE FROM crc_cache WHERE dev = ? AND ino = ?', stale)
+            self.conn.commit()
+        return len(stale)
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
+
+def open_crc_cache(db_path):
     """
-    Get image dimensions using PIL.
+    Open the persistent CRC32 cache used by calculate_crc32_many.
     
     Args:
-        file_path: Path to image file
+        db_path: Path to the SQLite database (created if missing)
     
     Returns:
-        Tuple of (width, height) or None if unable to read
+        True if the cache is available
     """
-    if not PIL_AVAILABLE:
-        return None
-    
+    import sqlite3
+    global crc_cache
+    close_crc_cache()
     try:
-        with Image.open(file_path) as img:
-            return img.size
-    except (OSError, IOError, Image.UnidentifiedImageError):
+        crc_cache = CrcCache(db_path)
+    except sqlite3.Error as e:
+        print(f"{Colors.RED}❌ Could not open CRC cache {db_path}: {e}{Colors.RESET}")
+        return False
+    ignore_files(*(db_path + suffix for suffix in ('', '-journal', '-wal', '-shm')))
+    return True
+
+def close_crc_cache():
+    """Flush and close the persistent CRC32 cache."""
+    global crc_cache
+    if crc_cache is not None:
+        crc_cache.close()
+        crc_cache = None
+
+def file_stamp(file_stat):
+    """Identity and modification stamp of a file: (device, inode, size, mtime_ns)."""
+    return (file_stat.st_dev, file_stat.st_ino, file_stat.st_size, file_stat.st_mtime_ns)
+
+def _stat_or_none(file_path):
+    throttle_metadata()
+    try:
+        return os.stat(file_path)
+    except OSError:
         return None
 
-def should_delete_image(file_path, filename):
+def _ignore_interrupts():
+    """Process pool initializer: leave interrupt handling to the parent process."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def configure_sfv_workers(workers=1, use_processes=False):
     """
-    Check if an image file should be deleted based on size or "proof" in name.
+    Configure the worker pool used for SFV verification.
+    
+    zlib.crc32 releases the GIL, so a thread pool is usually enough to keep several
+    disks busy; a process pool can be used when hashing is CPU bound.
     
     Args:
-        file_path: Full path to the file
-        filename: Just the filename
+        workers: Number of files hashed concurrently (1 hashes on the main thread)
+        use_processes: Use a process pool instead of a thread pool
+    """
+    global sfv_executor, sfv_workers
+    shutdown_sfv_workers()
+    sfv_workers = max(1, workers)
+    if workers > 1:
+        if use_processes:
+            sfv_executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_ignore_interrupts)
+        else:
+            sfv_executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sfv')
+
+def configure_sfv_verification(full_report=False):
+    """
+    Choose between fail-fast SFV verification (the default), which stops at the first
+    failure, and a full report checking every file of every SFV file.
+    """
+    global sfv_fail_fast
+    sfv_fail_fast = not full_report
+
+def shutdown_sfv_workers():
+    """Stop the SFV worker pool, cancelling any hashes that have not started yet."""
+    global sfv_executor
+    if sfv_executor is not None:
+        sfv_executor.shutdown(wait=True, cancel_futures=True)
+        sfv_executor = None
+
+def device_label(dev):
+    """Readable name of a device number, as major:minor."""
+    return f"{os.major(dev)}:{os.minor(dev)}"
+
+class IoScheduler:
+    """
+    Hashing queues per device, so every disk is kept busy without being thrashed.
     
-    Returns:
-        Tuple of (should_delete: bool, reason: str)
+    Files are grouped by st_dev and each device gets its own worker threads, up to its
+    concurrency limit (a couple for a spindle, more for an SSD or an array). Within a
+    device, queued files are read in inode order, which on most filesystems follows the
+    on-disk layout, so a device serving several directories at once still reads mostly
+    sequentially. Throughput then grows with the number of disks rather than being set
+    by the slowest one.
     """
-    # Check if filename contains "proof"
-    if PROOF_PATTERN.search(filename):
-        return True, "contains 'proof'"
+
+    def __init__(self, default_limit=1, limits=None):
+        self.default_limit = max(1, default_limit)
+        self.limits = dict(limits or {})
+        self.lock = threading.Lock()
+        self.wakeup = threading.Condition(self.lock)
+        self.queues = {}   # device -> heap of (inode, path, sequence, size, future)
+        self.workers = {}  # device -> number of worker threads
+        self.threads = []
+        self.sequence = itertools.count()
+        self.stopping = False
+
+    def submit(self, file_path, file_stat=None):
+        """
+        Queue a file for hashing on its device.
+        
+        Args:
+            file_path: Path to the file
+            file_stat: Optional stat result of the file, to save a stat call
+        
+        Returns:
+            concurrent.futures.Future resolving to the checksum (None if unreadable)
+        """
+        future = concurrent.futures.Future()
+        if file_stat is None:
+            file_stat = _stat_or_none(file_path)
+        if file_stat is None:
+            future.set_result(None)
+            return future
+        dev = file_stat.st_dev
+        with self.lock:
+            heapq.heappush(self.queues.setdefault(dev, []),
+                           (file_stat.st_ino, file_path, next(self.sequence), file_stat.st_size, future))
+            if self.workers.get(dev, 0) < self.limits.get(dev, self.default_limit):
+                self.workers[dev] = self.workers.get(dev, 0) + 1
+                thread = threading.Thread(target=self._work, args=(dev,),
+                                          name=f'io-{device_label(dev)}', daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            else:
+                self.wakeup.notify_all()
+        return future
+
+    def _work(self, dev):
+        label = device_label(dev)
+        queue_ = self.queues[dev]
+        while True:
+            with self.lock:
+                while not queue_ and not self.stopping:
+                    self.wakeup.wait()
+                if not queue_:
+                    return
+                _, file_path, _, size, future = heapq.heappop(queue_)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                if isinstance(sfv_executor, concurrent.futures.ProcessPoolExecutor):
+                    # Process pool: this thread only paces the device
+                    crc = _submit_crc32(file_path).result()
+                else:
+                    crc = calculate_crc32(file_path)
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            future.set_result(crc)
+            count(f'io_files:{label}')
+            count(f'io_bytes:{label}', size)
+
+    def shutdown(self):
+        """Cancel queued hashes and stop the worker threads."""
+        with self.lock:
+            self.stopping = True
+            for queue_ in self.queues.values():
+                for entry in queue_:
+                    entry[-1].cancel()
+                queue_.clear()
+            self.wakeup.notify_all()
+        for thread in self.threads:
+            thread.join()
+
+def parse_device_limit(value):
+    """
+    Parse a per-device concurrency limit such as '/mnt/disk2=4'.
     
-    # Check image dimensions if PIL is available
-    if PIL_AVAILABLE:
-        dimensions = get_image_dimensions(file_path)
-        if dimensions:
-            width, height = dimensions
-            if width < 300 or height < 300:
-                return True, f"small resolution ({width}x{height})"
+    Returns:
+        Tuple of (path, limit)
+    """
+    path, sep, limit = value.rpartition('=')
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+    if not sep or not path or limit < 1:
+        raise argparse.ArgumentTypeError(f"expected PATH=N with N >= 1: {value!r}")
+    return path, limit
+
+def configure_io_scheduler(default_limit=0, device_limits=None):
+    """
+    Put a per-device scheduler in front of SFV hashing.
     
-    return False, ""
+    Args:
+        default_limit: Files hashed concurrently per device; 0 disables the scheduler
+        device_limits: Optional mapping of st_dev to its own limit
+    """
+    global io_scheduler
+    shutdown_io_scheduler()
+    if default_limit > 0:
+        io_scheduler = IoScheduler(default_limit, device_limits)
 
-def calculate_crc32(file_path):
+def shutdown_io_scheduler():
+    """Stop the per-device hashing queues."""
+    global io_scheduler
+    if io_scheduler is not None:
+        io_scheduler.shutdown()
+        io_scheduler = None
+
+def calculate_crc32_many(file_paths, expected=None):
     """
-    Calculate CRC32 checksum for a file.
+    Calculate CRC32 checksums for several files, concurrently when a worker pool is configured.
     
     Args:
-        file_path: Path to the file
+        file_paths: Paths of the files to hash
+        expected: Optional dictionary of path -> expected checksum; hashing stops at the first
+                  file that doesn't match (or can't be read)
     
     Returns:
-        CRC32 checksum as an 8-character uppercase hex string, or None if error
+        Dictionary mapping each path to its checksum (None if it could not be read).
+        Paths that were not hashed because of a shutdown request, or after a mismatch with
+        expected, are left out.
     """
-    try:
-        crc = 0
-        with open(file_path, 'rb') as f:
-            while True:
-                chunk = f.read(65536)  # 64KB chunks
-                if not chunk:
+    def mismatch(file_path, crc):
+        return expected is not None and crc != expected.get(file_path)
+    
+    results = {}
+    
+    # Serve unchanged files from the persistent cache without reading any bytes
+    stamps = {}
+    if crc_cache is not None:
+        remaining = []
+        for file_path in file_paths:
+            file_stat = _stat_or_none(file_path)
+            cached = crc_cache.lookup(file_stat) if file_stat is not None else None
+            if cached is not None:
+                results[file_path] = cached
+                count('crc_cache_hits')
+                if mismatch(file_path, cached):
+                    return results
+            else:
+                stamps[file_path] = file_stat
+                remaining.append(file_path)
+        file_paths = remaining
+    
+    hashed = {}
+    if sfv_executor is None and io_scheduler is None:
+        for file_path in file_paths:
+            if shutdown_requested:
+                break
+            hashed[file_path] = calculate_crc32(file_path)
+            if mismatch(file_path, hashed[file_path]):
+                break
+    else:
+        futures = {}
+        for file_path in file_paths:
+            if io_scheduler is not None:
+                futures[file_path] = io_scheduler.submit(file_path, stamps.get(file_path))
+            else:
+                futures[file_path] = _submit_crc32(file_path)
+        paths = {future: file_path for file_path, future in futures.items()}
+        try:
+            # In completion order, so a mismatch stops the others as early as possible
+            for future in concurrent.futures.as_completed(paths):
+                if shutdown_requested:
                     break
-                crc = zlib.crc32(chunk, crc)
-        
-        # Convert to unsigned 32-bit value and format as 8-char hex
-        return f"{crc & 0xffffffff:08X}"
-    except (OSError, IOError) as e:
-        return None
+                file_path = paths[future]
+                if future.cancelled():
+                    continue
+                try:
+                    hashed[file_path] = future.result()
+                except Exception:
+                    hashed[file_path] = None
+                if mismatch(file_path, hashed[file_path]):
+                    break
+        finally:
+            for future in futures.values():
+                future.cancel()
+    
+    if crc_cache is not None:
+        for file_path, crc in hashed.items():
+            count('crc_cache_misses')
+            before = stamps.get(file_path)
+            if crc is None or before is None:
+                continue
+            # Only trust the checksum if the file did not change while it was being read
+            after = _stat_or_none(file_path)
+            if after is not None and file_stamp(after) == file_stamp(before):
+                crc_cache.store(file_path, before, crc)
+    results.update(hashed)
+    return results
 
-def parse_sfv_file(sfv_path):
+def _is_crc32(text):
+    return len(text) == 8 and all(c in '0123456789ABCDEF' for c in text)
+
+def parse_sfv_file(sfv_path, verbose=True, sizes=None):
     """
     Parse an SFV file and return a dictionary of filename -> expected_crc32.
     Handles various SFV formats and encodings robustly.
     
     Args:
         sfv_path: Path to the SFV file
+        verbose: Whether to print problems found while parsing
+        sizes: Optional dictionary receiving filename -> declared size for lines that
+               carry one (format 2)
     
     Returns:
         Dictionary mapping relative filenames to expected CRC32 checksums
@@ -588,7 +4778,9 @@ def parse_sfv_file(sfv_path):
         except (UnicodeDecodeError, OSError):
             continue
     else:
-        print(f"  {Colors.RED}❌ Could not read SFV file with any encoding: {sfv_path}{Colors.RESET}")
+        if verbose:
+            with output_lock:
+                print(f"  {Colors.RED}❌ Could not read SFV file with any encoding: {sfv_path}{Colors.RESET}")
         return file_checksums
     
     for line_num, line in enumerate(lines, 1):
@@ -617,9 +4809,13 @@ def parse_sfv_file(sfv_path):
             if len(parts) < 2:
                 continue  # Not enough parts
             
-            # Last part should be CRC32 (8 hex chars)
+            # Last part should be CRC32 (8 hex chars), or a size following it. An 8-digit
+            # size also looks like a CRC32, so a CRC32 followed by digits is read as format 2.
             potential_crc = parts[-1].upper()
-            if len(potential_crc) == 8 and all(c in '0123456789ABCDEF' for c in potential_crc):
+            if len(parts) >= 3 and parts[-1].isdigit() and _is_crc32(parts[-2].upper()):
+                filename = ' '.join(parts[:-2])
+                remainder = f"{parts[-2]} {parts[-1]}"
+            elif _is_crc32(potential_crc):
                 # CRC32 is last part, filename is everything before it
                 filename = ' '.join(parts[:-1])
                 remainder = potential_crc
@@ -632,36 +4828,173 @@ def parse_sfv_file(sfv_path):
             if crc_parts:
                 crc32 = crc_parts[0].upper()
                 # Validate CRC32 format
-                if len(crc32) == 8 and all(c in '0123456789ABCDEF' for c in crc32):
+                if _is_crc32(crc32):
                     file_checksums[filename] = crc32
-                else:
-                    print(f"  {Colors.YELLOW}⚠️  Invalid CRC32 format at line {line_num}: {crc32}{Colors.RESET}")
+                    if sizes is not None and len(crc_parts) > 1 and crc_parts[1].isdigit():
+                        sizes[filename] = int(crc_parts[1])
+                elif verbose:
+                    with output_lock:
+                        print(f"  {Colors.YELLOW}⚠️  Invalid CRC32 format at line {line_num}: {crc32}{Colors.RESET}")
     
     return file_checksums
 
-def verify_sfv_file(sfv_path, search_dirs=None):
+ENCODING_SUFFIX = '(invalid encoding)'
+ENCODING_SUFFIXES = [' (invalid encoding).mp3', '(invalid encoding).mp3', ' (invalid encoding)', '(invalid encoding)']
+
+def _strip_encoding_suffix(name):
+    """Remove the '(invalid encoding)' marker left by tools that could not decode a filename."""
+    lowered = name.lower()
+    for suffix in ENCODING_SUFFIXES:
+        if lowered.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+def _ascii_key(text):
+    """Lowercased NFKD-normalized ASCII form of a name, dropping corruption characters."""
+    cleaned = text.replace('\ufffd', '').replace('?', '')
+    return unicodedata.normalize('NFKD', cleaned).encode('ascii', 'ignore').decode('ascii').lower()
+
+class FilenameIndex:
+    """
+    Lookup tables over one directory listing, used to resolve SFV entries to files.
+    
+    Built once per directory so each SFV line is resolved with hash lookups: exact name,
+    casefolded name, and for names marked '(invalid encoding)' the stripped base name and
+    its NFKD-ASCII form. Only entries that still have no match fall back to fuzzy matching.
+    """
+
+    def __init__(self, directory, names):
+        self.directory = directory
+        self.names = set(names)
+        self.casefolded = {}
+        self.stripped = {}
+        self.ascii = {}
+        self.corrupted = []
+        for name in names:
+            self.casefolded.setdefault(name.casefold(), name)
+            if ENCODING_SUFFIX in name.lower():
+                actual_base = os.path.splitext(_strip_encoding_suffix(name))[0]
+                ascii_key = _ascii_key(actual_base)
+                self.stripped.setdefault(actual_base.casefold(), name)
+                if ascii_key:
+                    self.ascii.setdefault(ascii_key, name)
+                self.corrupted.append((name, actual_base, ascii_key))
+
+    @classmethod
+    def from_directory(cls, directory):
+        """Build an index from a fresh listing of a directory (an empty index if unreadable)."""
+        names = []
+        throttle_metadata()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if not entry.is_dir():
+                            names.append(entry.name)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        return cls(directory, names)
+
+    def _match(self, name):
+        return os.path.join(self.directory, name), name
+
+    def lookup(self, filename):
+        """
+        Resolve an SFV entry with hash lookups.
+        
+        Returns:
+            Tuple of (file_path, actual_filename), or None if there is no match
+        """
+        if filename in self.names:
+            return self._match(filename)
+        if os.sep in filename or (os.altsep and os.altsep in filename):
+            # Entries with a subdirectory are not part of this listing
+            potential_path = os.path.join(self.directory, filename)
+            return (potential_path, filename) if os.path.exists(potential_path) else None
+        name = self.casefolded.get(filename.casefold())
+        if name is None and self.corrupted:
+            target_base = os.path.splitext(filename)[0]
+            name = self.stripped.get(target_base.casefold())
+            if name is None:
+                ascii_key = _ascii_key(target_base)
+                name = self.ascii.get(ascii_key) if ascii_key else None
+        return self._match(name) if name is not None else None
+
+    def fuzzy_lookup(self, filename):
+        """
+        Resolve an SFV entry against encoding-corrupted names with similarity heuristics.
+        
+        Returns:
+            Tuple of (file_path, actual_filename), or None if there is no match
+        """
+        if not self.corrupted:
+            return None
+        target_base = os.path.splitext(filename)[0]
+        normalized_target = _ascii_key(target_base)
+        target_chars = target_base.lower()
+        for name, actual_base, normalized_actual in self.corrupted:
+            # Names whose normalized forms differ by at most two characters and contain each other
+            if normalized_actual and normalized_target and abs(len(normalized_target) - len(normalized_actual)) <= 2:
+                if len(normalized_actual) < len(normalized_target):
+                    shorter, longer = normalized_actual, normalized_target
+                else:
+                    shorter, longer = normalized_target, normalized_actual
+                if shorter in longer and len(shorter) > 5:  # Reasonable minimum length
+                    return self._match(name)
+            
+            # Character-by-character comparison, ignoring replacement characters:
+            # if 75% of characters match in order, consider it a match
+            actual_chars = ''.join(c for c in actual_base.lower() if c != '\ufffd')
+            min_len = min(len(target_chars), len(actual_chars))
+            if min_len > 0:
+                matches = sum(1 for i in range(min_len) if target_chars[i] == actual_chars[i])
+                if matches / min_len >= 0.75:
+                    return self._match(name)
+        return None
+
+def count_sfv_results(results):
+    """Count the checked files of an SFV by status (sfv_files_pass, sfv_files_missing, ...)."""
+    for result in results.values():
+        if result is not None:
+            count(f"sfv_files_{result['status'].lower()}")
+
+def verify_sfv_file(sfv_path, search_dirs=None, indexes=None, fail_fast=None):
     """
     Verify all files listed in an SFV file.
     Handles cases where SFV is in 'extr' subdirectory but files are in parent directory.
     
+    Every entry is first looked up and, where the SFV declares a size, its size compared;
+    only then are the files hashed. In fail-fast mode a missing or wrongly sized file ends
+    the verification before anything is read, and hashing stops at the first mismatch, so
+    the results only list the entries checked until then.
+    
     Args:
         sfv_path: Path to the SFV file
         search_dirs: Optional list of directories to search for files
+        indexes: Optional FilenameIndex per search directory, built once by the caller;
+                 the search directories are listed when not given
+        fail_fast: Stop at the first failure (default: configured sfv_fail_fast)
     
     Returns:
         Tuple of (all_passed: bool, results: dict)
-        results dict contains: {'filename': {'expected': 'CRC32', 'actual': 'CRC32', 'status': 'PASS/FAIL/MISSING'}}
+        results dict contains: {'filename': {'expected': 'CRC32', 'actual': 'CRC32', 'status': 'PASS/FAIL/MISSING/SIZE/ERROR'}}
     """
     global shutdown_requested
     
+    if fail_fast is None:
+        fail_fast = sfv_fail_fast
     sfv_dir = os.path.dirname(sfv_path)
-    file_checksums = parse_sfv_file(sfv_path)
+    declared_sizes = {}
+    file_checksums = parse_sfv_file(sfv_path, sizes=declared_sizes)
     
     if not file_checksums:
         return False, {}
     
     results = {}
     all_passed = True
+    to_hash = []
     
     # Use provided search_dirs or determine them automatically
     if search_dirs is None:
@@ -672,116 +5005,48 @@ def verify_sfv_file(sfv_path, search_dirs=None):
         if sfv_dir_name == 'extr':
             parent_dir = os.path.dirname(sfv_dir)
             search_dirs.append(parent_dir)
-            print(f"    {Colors.BLUE}📁 SFV in 'extr' directory - will also search parent directory{Colors.RESET}")
+            with output_lock:
+                print(f"    {Colors.BLUE}📁 SFV in 'extr' directory - will also search parent directory{Colors.RESET}")
     
+    if indexes is None:
+        indexes = [FilenameIndex.from_directory(search_dir) for search_dir in search_dirs]
+    
+    # Resolve every entry with hash lookups first
+    resolved = {}
+    unresolved = []
     for filename, expected_crc in file_checksums.items():
         if shutdown_requested:
             break
         
         # Skip files with "proof" in the filename - these are optional
         if PROOF_PATTERN.search(filename):
-            print(f"    {Colors.BLUE}📸 Skipping proof file:{Colors.RESET} {filename}")
+            if text_output:
+                with output_lock:
+                    print(f"    {Colors.BLUE}📸 Skipping proof file:{Colors.RESET} {filename}")
             continue
         
-        # Try to find the file in search directories (case-insensitive)
-        file_found = False
-        file_path = None
-        actual_filename = None
-        
-        for search_dir in search_dirs:
-            # First try exact match
-            potential_path = os.path.join(search_dir, filename)
-            if os.path.exists(potential_path):
-                file_path = potential_path
-                actual_filename = filename
-                file_found = True
+        results[filename] = None
+        for index in indexes:
+            match = index.lookup(filename)
+            if match:
+                resolved[filename] = match
                 break
-            
-            # If exact match fails, try case-insensitive search and encoding variants
-            try:
-                dir_files = os.listdir(search_dir)
-                for dir_file in dir_files:
-                    # Case-insensitive exact match
-                    if dir_file.lower() == filename.lower():
-                        file_path = os.path.join(search_dir, dir_file)
-                        actual_filename = dir_file
-                        file_found = True
-                        break
-                    # Check for files with encoding corruption suffix
-                    elif '(invalid encoding)' in dir_file.lower():
-                        # Extract the base filename without the encoding suffix
-                        base_name = dir_file
-                        
-                        # Remove various encoding suffixes
-                        for suffix in [' (invalid encoding).mp3', '(invalid encoding).mp3', ' (invalid encoding)', '(invalid encoding)']:
-                            if base_name.lower().endswith(suffix.lower()):
-                                base_name = base_name[:-len(suffix)]
-                                break
-                        
-                        # For encoding-corrupted files, we need to be more flexible in matching
-                        # Remove file extension from both for comparison
-                        target_base = os.path.splitext(filename)[0]
-                        actual_base = os.path.splitext(base_name)[0]
-                        
-                        # Try different approaches to match corrupted encoding
-                        # 1. Direct comparison (ignoring case)
-                        if actual_base.lower() == target_base.lower():
-                            file_path = os.path.join(search_dir, dir_file)
-                            actual_filename = dir_file
-                            file_found = True
-                            break
-                        
-                        # 2. Try to match by normalizing both strings and removing special characters
-                        import unicodedata
-                        try:
-                            # Normalize and remove special characters from target
-                            normalized_target = unicodedata.normalize('NFKD', target_base).encode('ascii', 'ignore').decode('ascii')
-                            
-                            # For actual filename, replace common corruption characters and normalize
-                            cleaned_actual = actual_base.replace('�', '').replace('?', '')
-                            normalized_actual = unicodedata.normalize('NFKD', cleaned_actual).encode('ascii', 'ignore').decode('ascii')
-                            
-                            # Also try removing the corrupted character entirely and seeing if strings match
-                            if len(normalized_actual) > 0 and len(normalized_target) > 0:
-                                # Compare similarity - if they're very close, consider it a match
-                                if abs(len(normalized_target) - len(normalized_actual)) <= 2:
-                                    # Simple substring match approach
-                                    shorter = normalized_actual if len(normalized_actual) < len(normalized_target) else normalized_target
-                                    longer = normalized_target if len(normalized_actual) < len(normalized_target) else normalized_actual
-                                    
-                                    if shorter.lower() in longer.lower() and len(shorter) > 5:  # Reasonable minimum length
-                                        file_path = os.path.join(search_dir, dir_file)
-                                        actual_filename = dir_file
-                                        file_found = True
-                                        break
-                        except:
-                            pass
-                        
-                        # 3. Try character-by-character comparison, ignoring corruption characters
-                        try:
-                            target_chars = [c for c in target_base.lower()]
-                            actual_chars = [c for c in actual_base.lower() if ord(c) != 65533]  # Skip replacement character
-                            
-                            # More lenient heuristic: if 75% of characters match in order, consider it a match
-                            matches = 0
-                            min_len = min(len(target_chars), len(actual_chars))
-                            for i in range(min_len):
-                                if target_chars[i] == actual_chars[i]:
-                                    matches += 1
-                            
-                            if min_len > 0 and matches / min_len >= 0.75:
-                                file_path = os.path.join(search_dir, dir_file)
-                                actual_filename = dir_file
-                                file_found = True
-                                break
-                        except:
-                            pass
-                if file_found:
-                    break
-            except OSError:
-                continue
-        
-        if not file_found:
+        else:
+            unresolved.append(filename)
+    
+    # Fuzzy matching of encoding-corrupted names only runs for the leftovers
+    for filename in unresolved:
+        if shutdown_requested:
+            break
+        for index in indexes:
+            match = index.fuzzy_lookup(filename)
+            if match:
+                resolved[filename] = match
+                break
+    
+    for filename in list(results):
+        expected_crc = file_checksums[filename]
+        if filename not in resolved:
             results[filename] = {
                 'expected': expected_crc,
                 'actual': None,
@@ -792,7 +5057,45 @@ def verify_sfv_file(sfv_path, search_dirs=None):
             all_passed = False
             continue
         
-        actual_crc = calculate_crc32(file_path)
+        # Hashing happens below once every entry is resolved, so the files can be read concurrently
+        file_path, actual_filename = resolved[filename]
+        if filename in declared_sizes:
+            file_stat = _stat_or_none(file_path)
+            if file_stat is not None and file_stat.st_size != declared_sizes[filename]:
+                # Can't match whatever its checksum, so it isn't read
+                results[filename] = {
+                    'expected': expected_crc,
+                    'actual': None,
+                    'status': 'SIZE',
+                    'actual_filename': actual_filename,
+                    'rename_needed': False,
+                    'expected_size': declared_sizes[filename],
+                    'actual_size': file_stat.st_size
+                }
+                count('sfv_size_mismatches')
+                all_passed = False
+                continue
+        to_hash.append((filename, expected_crc, file_path, actual_filename))
+    
+    if fail_fast and not all_passed:
+        # Already condemned: nothing needs to be read
+        for filename, _, file_path, _ in to_hash:
+            del results[filename]
+        count('sfv_files_not_hashed', len(to_hash))
+        count_sfv_results(results)
+        return False, results
+    
+    checksums = calculate_crc32_many([file_path for _, _, file_path, _ in to_hash],
+                                     expected={file_path: crc for _, crc, file_path, _ in to_hash} if fail_fast else None)
+    
+    for filename, expected_crc, file_path, actual_filename in to_hash:
+        if file_path not in checksums:
+            # Interrupted, or stopped by an earlier mismatch, before this file was hashed
+            del results[filename]
+            if not shutdown_requested:
+                count('sfv_files_not_hashed')
+            continue
+        actual_crc = checksums[file_path]
         
         if actual_crc is None:
             results[filename] = {
@@ -825,6 +5128,7 @@ def verify_sfv_file(sfv_path, search_dirs=None):
         if status != 'PASS':
             all_passed = False
     
+    count_sfv_results(results)
     return all_passed, results
 
 def rename_encoding_files(sfv_results, search_dirs, pretend=True):
@@ -841,44 +5145,54 @@ def rename_encoding_files(sfv_results, search_dirs, pretend=True):
     """
     renamed_count = 0
     
-    for filename, result in sfv_results.items():
-        if result.get('rename_needed', False) and result.get('file_path'):
-            old_path = result['file_path']
-            actual_filename = result['actual_filename']
-            
-            # Calculate new path in the same directory
-            file_dir = os.path.dirname(old_path)
-            new_path = os.path.join(file_dir, filename)
-            
-            # Make sure the target filename doesn't already exist
-            if os.path.exists(new_path):
-                if pretend:
-                    print(f"        {Colors.YELLOW}⚠️  Would skip rename:{Colors.RESET} target exists")
-                    print(f"          {actual_filename} → {filename}")
-                continue
-            
-            try:
-                if pretend:
-                    print(f"        {Colors.GREEN}📝 Would rename:{Colors.RESET} {actual_filename}")
-                    print(f"          → {filename}")
-                else:
-                    print(f"        {Colors.GREEN}📝 Renaming:{Colors.RESET} {actual_filename}")
-                    print(f"          → {filename}")
-                    os.rename(old_path, new_path)
+    # Hold the output lock so the two-line messages of concurrent verifications don't interleave
+    with output_lock:
+        for filename, result in sfv_results.items():
+            if result.get('rename_needed', False) and result.get('file_path'):
+                old_path = result['file_path']
+                actual_filename = result['actual_filename']
                 
-                renamed_count += 1
+                # Calculate new path in the same directory
+                file_dir = os.path.dirname(old_path)
+                new_path = os.path.join(file_dir, filename)
                 
-            except OSError as e:
-                print(f"        {Colors.RED}❌ Rename failed:{Colors.RESET} {e}")
+                # Make sure the target filename doesn't already exist
+                if os.path.exists(new_path):
+                    if pretend:
+                        print(f"        {Colors.YELLOW}⚠️  Would skip rename:{Colors.RESET} target exists")
+                        print(f"          {actual_filename} → {filename}")
+                    continue
+                
+                try:
+                    if text_output:
+                        if pretend:
+                            print(f"        {Colors.GREEN}📝 Would rename:{Colors.RESET} {actual_filename}")
+                        else:
+                            print(f"        {Colors.GREEN}📝 Renaming:{Colors.RESET} {actual_filename}")
+                        print(f"          → {filename}")
+                    if not pretend:
+                        os.rename(old_path, new_path)
+                    report_action('rename', old_path, pretend=pretend, target=new_path)
+                    
+                    renamed_count += 1
+                    
+                except OSError as e:
+                    print(f"        {Colors.RED}❌ Rename failed:{Colors.RESET} {e}")
+                    report_action('error', old_path, 'rename', error=str(e))
     
     return renamed_count
-def check_sfv_integrity(directory_path):
+
+@timed_stage('sfv_check')
+def check_sfv_integrity(directory_path, files=None, parent_files=None):
     """
     Check if a directory contains SFV files and verify their integrity.
     Handles 'extr' subdirectories where SFV might reference files in parent directory.
     
     Args:
         directory_path: Path to directory to check
+        files: Optional list of filenames already known from the walk; the directory
+               is listed when not given
+        parent_files: Optional list of filenames in the parent directory, used for 'extr'
     
     Returns:
         Tuple of (should_delete: bool, reason: str, details: dict, target_path: str)
@@ -889,10 +5203,11 @@ def check_sfv_integrity(directory_path):
     if shutdown_requested:
         return False, "", {}, directory_path
     
-    try:
-        files = os.listdir(directory_path)
-    except OSError:
-        return False, "", {}, directory_path
+    if files is None:
+        try:
+            files = os.listdir(directory_path)
+        except OSError:
+            return False, "", {}, directory_path
     
     sfv_files = [f for f in files if f.lower().endswith('.sfv')]
     
@@ -906,22 +5221,27 @@ def check_sfv_integrity(directory_path):
     dir_name = os.path.basename(directory_path).lower()
     is_extr_dir = dir_name == 'extr'
     
+    # Search in SFV file directory first, then in parent directory (for "extr" case)
+    search_dirs = [directory_path]
+    indexes = [FilenameIndex(directory_path, files)]
+    
+    # If this is an extr directory, also search parent directory
+    if is_extr_dir:
+        parent_dir = os.path.dirname(directory_path)
+        if parent_files is not None:
+            search_dirs.append(parent_dir)
+            indexes.append(FilenameIndex(parent_dir, parent_files))
+        elif os.path.exists(parent_dir):
+            search_dirs.append(parent_dir)
+            indexes.append(FilenameIndex.from_directory(parent_dir))
+    
     for sfv_file in sfv_files:
         if shutdown_requested:
             break
             
         sfv_path = os.path.join(directory_path, sfv_file)
         
-        # Search in SFV file directory first, then in parent directory (for "extr" case)
-        search_dirs = [directory_path]
-        
-        # If this is an extr directory, also search parent directory
-        if is_extr_dir:
-            parent_dir = os.path.dirname(directory_path)
-            if os.path.exists(parent_dir):
-                search_dirs.append(parent_dir)
-        
-        all_passed, results = verify_sfv_file(sfv_path, search_dirs)
+        all_passed, results = verify_sfv_file(sfv_path, search_dirs, indexes=indexes)
         
         # Handle file renaming for encoding issues if SFV passed
         if all_passed:
@@ -934,6 +5254,13 @@ def check_sfv_integrity(directory_path):
         
         if not all_passed:
             failed_sfv_files.append(sfv_file)
+            if sfv_fail_fast:
+                # One failure condemns the directory; the other SFV files needn't be read
+                break
+    
+    if shutdown_requested:
+        # Verification was cut short, so a failure here proves nothing
+        return False, "", {}, directory_path
     
     if failed_sfv_files:
         # If SFV is in 'extr' directory and failed, suggest deleting parent directory
@@ -978,6 +5305,12 @@ def print_sfv_details(sfv_results, directory_name):
                     
                     if status == 'MISSING':
                         print(f"        {Colors.YELLOW}🔍 MISSING:{Colors.RESET} {filename}")
+                    elif status == 'SIZE':
+                        print(f"        {Colors.RED}📏 SIZE MISMATCH:{Colors.RESET} {filename}")
+                        if actual_filename and actual_filename != filename:
+                            print(f"          Found as: {actual_filename} (case mismatch)")
+                        print(f"          Expected: {file_result['expected_size']:,} bytes")
+                        print(f"          Actual:   {file_result['actual_size']:,} bytes")
                     elif status == 'FAIL':
                         print(f"        {Colors.RED}💥 CRC MISMATCH:{Colors.RESET} {filename}")
                         if actual_filename and actual_filename != filename:
@@ -990,7 +5323,108 @@ def print_sfv_details(sfv_results, directory_name):
                         if actual_filename and actual_filename != filename:
                             print(f"          Found as: {actual_filename} (case mismatch)")
 
-if __name__ == "__main__":
+class Cleaner:
+    """
+    Importable entry point: holds the settings of a cleanup and runs it on one folder at a
+    time, so a batch driver can clean many folders in one warm process.
+    
+    The worker pools are started by the first run and kept until close(). Runs use the
+    module's process-wide state (counters, pools, shutdown flag), so only one Cleaner runs
+    at a time in a process. Signal handlers are left to the caller (see setup_signal_handlers).
+    
+    Example:
+        with Cleaner(pretend=False, output='quiet') as cleaner:
+            for folder in folders:
+                cleaner.run(folder)
+                print(folder, cleaner.stats['total_size_deleted_bytes'])
+    """
+
+    def __init__(self, pretend=True, check_sfv=True, delete_dash_one=None, keywords=None,
+                 verify_workers=1, delete_workers=1, queue_size=DEFAULT_PIPELINE_QUEUE_SIZE,
+                 sfv_workers=1, full_report=False, output='text', dedupe=False):
+        if output not in OUTPUT_MODES:
+            raise ValueError(f"output must be one of {', '.join(OUTPUT_MODES)}")
+        # Content-based duplicate detection replaces the '-1' name rule, as on the command line
+        if dedupe and delete_dash_one:
+            raise ValueError("delete_dash_one can't be combined with dedupe, which replaces the '-1' name rule")
+        self.pretend = pretend
+        self.check_sfv = check_sfv
+        self.delete_dash_one = not dedupe if delete_dash_one is None else delete_dash_one
+        self.keywords = list(KEYWORDS) if keywords is None else list(keywords)
+        self.verify_workers = verify_workers
+        self.delete_workers = delete_workers
+        self.queue_size = max(1, queue_size)
+        self.sfv_workers = sfv_workers if check_sfv else 1
+        self.full_report = full_report
+        self.output = output
+        self.dedupe = dedupe
+        self.started = False
+        # Statistics counters and stage timings of the last run
+        self.stats = {}
+        self.timings = {}
+
+    def run(self, root_dir):
+        """
+        Clean one folder with the settings of this Cleaner.
+        
+        Args:
+            root_dir: Folder to clean
+        
+        Returns:
+            Number of directories deleted (or that would be deleted in pretend mode)
+        """
+        if not self.started:
+            configure_sfv_workers(self.sfv_workers)
+            configure_sfv_verification(self.full_report)
+            self.started = True
+        configure_keywords(self.keywords)
+        reset_statistics()
+        # A quarantine left under the folder by command line runs is not incoming data
+        ignore_files(os.path.join(root_dir, DEFAULT_QUARANTINE_NAME))
+        # The ndjson and quiet modes redirect stdout and blank the colors for the whole process;
+        # both are put back after the run so the caller's own output is unaffected
+        saved_stdout = sys.stdout
+        saved_colors = {name: value for name, value in vars(Colors).items() if name.isupper()}
+        try:
+            configure_output(self.output)
+            deleted = delete_matching_dirs(root_dir, self.pretend, self.check_sfv, delete_dash_one=self.delete_dash_one,
+                                           verify_workers=self.verify_workers, delete_workers=self.delete_workers,
+                                           queue_size=self.queue_size, show_progress=self.output == 'text',
+                                           dedupe=self.dedupe)
+        finally:
+            try:
+                finish_output()
+            finally:
+                sys.stdout = saved_stdout
+                for name, value in saved_colors.items():
+                    setattr(Colors, name, value)
+                configure_output('text')
+            self.stats = dict(stats)
+            self.timings = timings.snapshot()
+        return deleted
+
+    def close(self):
+        """Stop the worker pools started by run()."""
+        if self.started:
+            shutdown_sfv_workers()
+            self.started = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def main(argv=None):
+    """
+    Command line entry point.
+    
+    Importing the module and calling main() instead of running the file lets Python use
+    the cached bytecode of the module rather than compiling it on every start.
+    
+    Args:
+        argv: Arguments to parse instead of sys.argv[1:]
+    """
     # Setup signal handlers for graceful shutdown
     setup_signal_handlers()
     parser = argparse.ArgumentParser(description='Clean up directories based on keywords, dates, SFV integrity, and duplicate "-1" suffix')
@@ -1000,12 +5434,147 @@ if __name__ == "__main__":
                         help='Root directory to search from (default: current directory)')
     parser.add_argument('--check-sfv', type=str, choices=['true', 'false'], default='true',
                         help='Enable SFV integrity checking: true (default) or false (skip SFV verification)')
-    parser.add_argument('--delete-dash-one', type=str, choices=['true', 'false'], default='true',
-                        help='Delete directories ending with "-1" (likely duplicates): true (default) or false')
-    args = parser.parse_args()
+    parser.add_argument('--delete-dash-one', type=str, choices=['true', 'false'], default=None,
+                        help='Delete directories ending with "-1" (likely duplicates): true (default) or false; '
+                             'off with --dedupe true, which it can\'t be combined with')
+    parser.add_argument('--dedupe', type=str, choices=['true', 'false'], default='false',
+                        help='Delete releases (top-level directories under --root-dir, compared with all their '
+                             'subdirectories, holding audio or SFV-verified files of 1 MiB or more) whose content duplicates '
+                             'another kept release, found by file sizes, then partial and full CRC32s, and confirmed byte '
+                             'for byte; replaces the "-1" name rule. Releases skipped as unchanged (--incremental, --resume) are not compared '
+                             '(default: false)')
+    parser.add_argument('--output', type=str, choices=OUTPUT_MODES, default='text',
+                        help='text (default): describe every decision; ndjson: one JSON record per action on stdout '
+                             '(other messages on stderr); quiet: only the final statistics')
+    parser.add_argument('--slowest', type=int, default=10,
+                        help='Number of slowest directories to verify listed in the statistics (default: 10)')
+    parser.add_argument('--stats-json', metavar='FILE', default=None,
+                        help='Also write the statistics and stage timings to FILE as JSON')
+    parser.add_argument('--profile', metavar='FILE', default=None,
+                        help='Run under cProfile (all threads of this process; the main thread only on Python 3.12+) and write the pstats to FILE')
+    parser.add_argument('--metrics-file', metavar='FILE', default=None,
+                        help='Export the statistics and stage timings in the Prometheus text format to FILE, e.g. '
+                             'incoming_clean_up.prom in the node-exporter textfile-collector directory')
+    parser.add_argument('--metrics-interval', type=float, default=DEFAULT_METRICS_INTERVAL,
+                        help=f'Seconds between updates of --metrics-file while running, 0 for only at the end '
+                             f'(default: {DEFAULT_METRICS_INTERVAL})')
+    parser.add_argument('--keywords-file', default=None,
+                        help='File of additional deletion keywords, one per line (blank lines and # comments ignored)')
+    parser.add_argument('--default-keywords', type=str, choices=['true', 'false'], default='true',
+                        help='Match the built-in keyword list: true (default) or false (only use --keywords-file)')
+    parser.add_argument('--full-report', action='store_true',
+                        help='Verify every file of every SFV file instead of stopping at the first failure')
+    parser.add_argument('--sfv-workers', type=int, default=1,
+                        help='Number of files hashed concurrently during SFV verification (default: 1, hash on the main thread)')
+    parser.add_argument('--sfv-pool', type=str, choices=['thread', 'process'], default='thread',
+                        help='Worker pool used when --sfv-workers is greater than 1: thread (default) or process')
+    parser.add_argument('--io-per-device', type=int, default=0,
+                        help='Queue SFV hashing per device, reading this many files at a time from each disk in inode order; '
+                             '0 (default) hashes through the --sfv-workers pool alone')
+    parser.add_argument('--io-device-limit', type=parse_device_limit, action='append', default=[], metavar='PATH=N',
+                        help='Own --io-per-device limit for the device holding PATH, e.g. /mnt/ssd=8 (repeatable)')
+    parser.add_argument('--read-rate', type=parse_size_or_zero, default=0,
+                        help='Limit bytes read for hashing and ZIP extraction per second, e.g. 50M (default: no limit)')
+    parser.add_argument('--metadata-rate', type=float, default=0,
+                        help='Limit metadata operations (stat, listing, unlink, rmdir) per second (default: no limit)')
+    parser.add_argument('--throttle-control', metavar='FILE', default=None,
+                        help='File of "read-rate = 50M" / "metadata-rate = 2000" lines overriding the limits; '
+                             're-read when it changes and on SIGHUP')
+    parser.add_argument('--crc-cache', type=str, choices=['true', 'false'], default='false',
+                        help='Cache SFV checksums on disk so unchanged files are not hashed again: true or false (default)')
+    parser.add_argument('--crc-cache-path', default=None,
+                        help=f'Path of the CRC cache database (default: {DEFAULT_CRC_CACHE_NAME} under --root-dir)')
+    parser.add_argument('--crc-cache-prune', type=str, choices=['true', 'false'], default='false',
+                        help='Evict cache entries whose files are gone or changed before scanning: true or false (default)')
+    parser.add_argument('--hash-block-size', type=parse_size, default=hash_block_size,
+                        help='Block size used when hashing files, e.g. 64K or 4M (default: 1M)')
+    parser.add_argument('--hash-method', type=str, choices=HASH_METHODS, default=hash_method,
+                        help='Hashing backend: readinto (default, reused buffer), mmap, or read (plain reads)')
+    parser.add_argument('--drop-cache', type=str, choices=['true', 'false'], default='true',
+                        help='Advise the kernel to drop hashed files from the page cache: true (default) or false')
+    parser.add_argument('--benchmark-hash', metavar='FILE', default=None,
+                        help='Benchmark the hashing backends on FILE and exit')
+    parser.add_argument('--incremental', type=str, choices=['true', 'false'], default='false',
+                        help='Skip subtrees unchanged since the last live run, using an on-disk directory index: true or false (default)')
+    parser.add_argument('--index-path', default=None,
+                        help=f'Path of the incremental directory index (default: {DEFAULT_DIR_INDEX_NAME} under --root-dir)')
+    parser.add_argument('--watch', type=str, choices=['true', 'false'], default='false',
+                        help='Stay resident and process changes under --root-dir as they settle (Linux inotify): true or false (default)')
+    parser.add_argument('--settle-seconds', type=float, default=DEFAULT_SETTLE_SECONDS,
+                        help=f'In watch mode, seconds without changes before a release is processed (default: {DEFAULT_SETTLE_SECONDS})')
+    parser.add_argument('--quarantine', type=str, choices=['true', 'false'], default='false',
+                        help='Move condemned directories into a trash directory and purge them in the background: true or false (default)')
+    parser.add_argument('--quarantine-dir', default=None,
+                        help=f'Trash directory, on the same filesystem as --root-dir (default: {DEFAULT_QUARANTINE_NAME} under --root-dir)')
+    parser.add_argument('--quarantine-retention', type=float, default=24,
+                        help='Hours a quarantined directory is kept (and can be restored) before it is purged (default: 24)')
+    parser.add_argument('--restore', metavar='PATH', action='append', default=[],
+                        help='Move the quarantined directory that was at PATH (or every one that was under it) back '
+                             'from --quarantine-dir and exit; can be given more than once')
+    parser.add_argument('--purge-rate', type=float, default=0,
+                        help='Maximum number of files the purge worker removes per second, 0 for no limit (default: 0)')
+    parser.add_argument('--rmtree-workers', type=int, default=4,
+                        help='Number of threads removing the subdirectories of one deleted tree concurrently (default: 4)')
+    parser.add_argument('--plan-file', default=None,
+                        help='In pretend mode, also write the planned actions to this file for --apply-plan')
+    parser.add_argument('--apply-plan', metavar='PLAN_FILE', default=None,
+                        help='Carry out a plan written by --plan-file instead of scanning, with its paths resolved against '
+                             '--root-dir; targets changed since are skipped')
+    parser.add_argument('--checkpoint', type=str, choices=['true', 'false'], default='false',
+                        help='Journal completed directories so an interrupted run can be resumed: true or false (default); '
+                             'never written in pretend mode')
+    parser.add_argument('--checkpoint-path', default=None,
+                        help=f'Path of the checkpoint journal (default: {DEFAULT_CHECKPOINT_NAME} under --root-dir)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run from its checkpoint, journaling as with --checkpoint true '
+                             '(combine with --crc-cache to also keep partial SFV work)')
+    parser.add_argument('--image-workers', type=int, default=1,
+                        help='Number of images probed concurrently when checking dimensions (default: 1)')
+    parser.add_argument('--zip-workers', type=int, default=1,
+                        help='Number of ZIP archives extracted concurrently in the background (default: 1)')
+    parser.add_argument('--zip-max-ratio', type=float, default=DEFAULT_ZIP_MAX_RATIO,
+                        help=f'Refuse archives expanding to more than this many times their size, 0 for no limit (default: {DEFAULT_ZIP_MAX_RATIO})')
+    parser.add_argument('--zip-max-size', type=parse_size, default=None,
+                        help='Refuse archives expanding to more than this many bytes, e.g. 20G (default: no limit)')
+    parser.add_argument('--verify-workers', type=int, default=1,
+                        help='Number of directories verified concurrently (images, SFV, empty checks); with more '
+                             'than one, the output of different directories may interleave (default: 1)')
+    parser.add_argument('--delete-workers', type=int, default=1,
+                        help='Number of deletions carried out concurrently (default: 1)')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_PIPELINE_QUEUE_SIZE,
+                        help=f'Maximum number of directories in flight between pipeline stages (default: {DEFAULT_PIPELINE_QUEUE_SIZE})')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='Number of processes the top-level entries of --root-dir are shared between, each running the '
+                             'pipeline with the worker settings above; SFV workers are then threads (default: 1)')
+    args = parser.parse_args(argv)
+    reset_statistics()
+    configure_hashing(args.hash_block_size, args.hash_method, args.drop_cache.lower() == 'true')
+    if args.benchmark_hash:
+        benchmark_crc32(args.benchmark_hash)
+        sys.exit(0)
+    if args.restore:
+        sys.exit(0 if restore_quarantined(args.quarantine_dir or os.path.join(args.root_dir, DEFAULT_QUARANTINE_NAME),
+                                          args.restore) else 1)
+    keywords = list(KEYWORDS) if args.default_keywords.lower() == 'true' else []
+    if args.keywords_file:
+        extra_keywords = load_keywords(args.keywords_file)
+        if extra_keywords is None:
+            sys.exit(1)
+        keywords.extend(extra_keywords)
+    configure_keywords(keywords)
+    configure_output(args.output)
+    timings.slowest_limit = max(0, args.slowest)
+    profiler = None
+    if args.profile:
+        profiler = Profiler()
+        profiler.start()
     pretend_mode = args.pretend.lower() == 'true'
     check_sfv_enabled = args.check_sfv.lower() == 'true'
-    delete_dash_one_enabled = args.delete_dash_one.lower() == 'true'
+    dedupe_enabled = args.dedupe.lower() == 'true'
+    if dedupe_enabled and args.delete_dash_one == 'true':
+        print(f"{Colors.RED}❌ --delete-dash-one true can't be combined with --dedupe true, which replaces the '-1' name rule{Colors.RESET}")
+        sys.exit(1)
+    delete_dash_one_enabled = (args.delete_dash_one or 'true') == 'true' and not dedupe_enabled
     print(f"{Colors.BOLD}{Colors.BG_BLUE}                  NEWS GROUP CLEANUP TOOL                  {Colors.RESET}")
     print(f"{Colors.BOLD}{'='*60}{Colors.RESET}")
     if pretend_mode:
@@ -1014,13 +5583,163 @@ if __name__ == "__main__":
         print(f"{Colors.RED}⚠️  LIVE MODE:{Colors.RESET} {Colors.BOLD}Actually deleting directories{Colors.RESET}")
         print(f"{Colors.RED}⚠️  WARNING:{Colors.RESET} This will permanently delete directories!")
     print(f"{Colors.CYAN}📁 Target Directory:{Colors.RESET} {Colors.BOLD}{os.path.abspath(args.root_dir)}{Colors.RESET}")
-    print(f"{Colors.MAGENTA}🎯 Keywords:{Colors.RESET} {', '.join(KEYWORDS)}")
+    print(f"{Colors.MAGENTA}🎯 Keywords:{Colors.RESET} {', '.join(name_classifier.keywords) or 'None'}")
     if check_sfv_enabled:
         print(f"{Colors.BLUE}📋 SFV Checking:{Colors.RESET} {Colors.GREEN}Enabled{Colors.RESET} (use {Colors.BOLD}--check-sfv false{Colors.RESET} to disable)")
     else:
         print(f"{Colors.BLUE}📋 SFV Checking:{Colors.RESET} {Colors.YELLOW}Disabled{Colors.RESET}")
-    print(f"{Colors.YELLOW}🗂️  Delete '-1' Duplicates:{Colors.RESET} {'Enabled' if delete_dash_one_enabled else 'Disabled'} (use --delete-dash-one false to disable)")
+    crc_cache_enabled = check_sfv_enabled and args.crc_cache.lower() == 'true'
+    crc_cache_path = args.crc_cache_path or os.path.join(args.root_dir, DEFAULT_CRC_CACHE_NAME)
+    if crc_cache_enabled:
+        print(f"{Colors.BLUE}🧮 CRC Cache:{Colors.RESET} {crc_cache_path}")
+    quarantine_enabled = not pretend_mode and args.quarantine.lower() == 'true'
+    quarantine_dir = args.quarantine_dir or os.path.join(args.root_dir, DEFAULT_QUARANTINE_NAME)
+    # Entries of an earlier quarantine run wait there to be restored or purged, whatever this run does
+    ignore_files(quarantine_dir)
+    if quarantine_enabled:
+        print(f"{Colors.BLUE}🗄️  Quarantine:{Colors.RESET} {quarantine_dir} (purged after {args.quarantine_retention:g} hours)")
+    incremental_enabled = args.incremental.lower() == 'true'
+    index_path = args.index_path or os.path.join(args.root_dir, DEFAULT_DIR_INDEX_NAME)
+    if incremental_enabled:
+        print(f"{Colors.BLUE}🧭 Incremental Index:{Colors.RESET} {index_path}{' (read only in pretend mode)' if pretend_mode else ''}")
+    if check_sfv_enabled and args.sfv_workers > 1:
+        print(f"{Colors.BLUE}⚙️  SFV Workers:{Colors.RESET} {args.sfv_workers} ({args.sfv_pool} pool)")
+    device_limits = {}
+    for limit_path, limit in args.io_device_limit:
+        try:
+            device_limits[os.stat(limit_path).st_dev] = limit
+        except OSError as e:
+            print(f"{Colors.RED}❌ Cannot use --io-device-limit {limit_path}: {e}{Colors.RESET}")
+            sys.exit(1)
+    io_per_device = args.io_per_device if check_sfv_enabled else 0
+    if io_per_device > 0:
+        overrides = ', '.join(f"{device_label(dev)}={limit}" for dev, limit in sorted(device_limits.items()))
+        print(f"{Colors.BLUE}💽 Per-device Hashing:{Colors.RESET} {io_per_device} per device{f' ({overrides})' if overrides else ''}")
+    if dedupe_enabled:
+        print(f"{Colors.YELLOW}🗂️  Delete '-1' Duplicates:{Colors.RESET} Disabled (replaced by --dedupe)")
+        print(f"{Colors.YELLOW}🧬 Duplicate Releases:{Colors.RESET} Detected by content, confirmed byte for byte before deleting")
+    elif delete_dash_one_enabled:
+        print(f"{Colors.YELLOW}🗂️  Delete '-1' Duplicates:{Colors.RESET} Enabled (use --delete-dash-one false to disable)")
+    else:
+        print(f"{Colors.YELLOW}🗂️  Delete '-1' Duplicates:{Colors.RESET} Disabled")
+    # Watch mode and plans are driven from this process
+    sharded = args.processes > 1 and not args.apply_plan and args.watch.lower() != 'true'
+    if sharded:
+        print(f"{Colors.BLUE}⚙️  Processes:{Colors.RESET} {args.processes}")
     print(f"{Colors.BOLD}{'-' * 60}{Colors.RESET}")
     ROOT_DIR = args.root_dir
-    deleted_count = delete_matching_dirs(ROOT_DIR, pretend_mode, check_sfv_enabled, delete_dash_one=delete_dash_one_enabled)
-    print_statistics()
\ No newline at end of file
+    configure_sfv_workers(args.sfv_workers if check_sfv_enabled else 1, use_processes=args.sfv_pool == 'process')
+    configure_io_scheduler(io_per_device, device_limits)
+    configure_sfv_verification(args.full_report)
+    configure_throttle(args.read_rate, args.metadata_rate, args.throttle_control)
+    if io_throttle is not None:
+        print(f"{Colors.BLUE}🚦 Throttle:{Colors.RESET} {io_throttle.describe()}"
+              f"{f' (control file {args.throttle_control})' if args.throttle_control else ''}")
+    if crc_cache_enabled and open_crc_cache(crc_cache_path) and args.crc_cache_prune.lower() == 'true':
+        print(f"{Colors.BLUE}🧹 Pruning CRC cache...{Colors.RESET}")
+        count('crc_cache_evicted', crc_cache.prune())
+    index_settings = None
+    if incremental_enabled:
+        index_settings = repr((1, name_classifier.keywords, check_sfv_enabled, delete_dash_one_enabled))
+        open_dir_index(index_path, ROOT_DIR, index_settings, read_only=pretend_mode)
+        if dir_index is not None and dir_index.reset:
+            print(f"{Colors.YELLOW}⚠️  Settings changed since the index was built; processing the whole tree{Colors.RESET}")
+    # Only plain live scans are checkpointed: watch mode never completes, plans don't scan, and
+    # a pretend run leaves nothing behind
+    checkpoint_requested = args.checkpoint.lower() == 'true' or args.resume
+    checkpoint_enabled = (checkpoint_requested and not pretend_mode and not args.apply_plan
+                          and args.watch.lower() != 'true')
+    if checkpoint_requested and pretend_mode:
+        print(f"{Colors.YELLOW}⚠️  Checkpoints are only kept in live mode; ignoring --checkpoint/--resume{Colors.RESET}")
+    checkpoint_settings = None
+    if checkpoint_enabled:
+        checkpoint_path = args.checkpoint_path or os.path.join(ROOT_DIR, DEFAULT_CHECKPOINT_NAME)
+        checkpoint_settings = repr((1, name_classifier.keywords, check_sfv_enabled, delete_dash_one_enabled, pretend_mode))
+        if args.resume:
+            print(f"{Colors.BLUE}💾 Resuming from checkpoint:{Colors.RESET} {checkpoint_path}")
+        open_checkpoint(checkpoint_path, ROOT_DIR, checkpoint_settings, resume=args.resume)
+    if quarantine_enabled and not configure_quarantine(quarantine_dir, max(0.0, args.quarantine_retention) * 3600, args.purge_rate):
+        sys.exit(1)
+    configure_tree_deleter(args.rmtree_workers)
+    configure_image_workers(args.image_workers)
+    configure_archive_stage(args.zip_workers, args.zip_max_ratio or None, args.zip_max_size)
+    if args.plan_file:
+        if not pretend_mode:
+            print(f"{Colors.YELLOW}⚠️  --plan-file is only written in pretend mode; ignoring it{Colors.RESET}")
+        elif not open_plan(args.plan_file, ROOT_DIR):
+            sys.exit(1)
+        else:
+            print(f"{Colors.BLUE}📝 Plan File:{Colors.RESET} {args.plan_file}")
+    if args.metrics_file:
+        print(f"{Colors.BLUE}📈 Metrics File:{Colors.RESET} {args.metrics_file}")
+        configure_metrics(args.metrics_file, max(0.0, args.metrics_interval),
+                          {'root': os.path.abspath(ROOT_DIR), 'mode': 'pretend' if pretend_mode else 'live'})
+    run_completed = False
+    try:
+        if args.apply_plan:
+            deleted_count = apply_plan(args.apply_plan, ROOT_DIR, pretend_mode)
+        elif args.watch.lower() == 'true':
+            deleted_count = watch_tree(ROOT_DIR, max(0.0, args.settle_seconds), pretend_mode, check_sfv_enabled,
+                                       delete_dash_one=delete_dash_one_enabled, verify_workers=args.verify_workers,
+                                       delete_workers=args.delete_workers, queue_size=max(1, args.queue_size),
+                                       dedupe=dedupe_enabled)
+        elif sharded:
+            shard_settings = {
+                'root_dir': ROOT_DIR,
+                'pretend': pretend_mode,
+                'check_sfv': check_sfv_enabled,
+                'delete_dash_one': delete_dash_one_enabled,
+                'dedupe': dedupe_enabled,
+                'verify_workers': args.verify_workers,
+                'delete_workers': args.delete_workers,
+                'queue_size': max(1, args.queue_size),
+                'ignored_paths': {directory: set(names) for directory, names in ignored_paths.items()},
+                'keywords': name_classifier.keywords,
+                'hashing': (hash_block_size, hash_method, hash_drop_cache),
+                'sfv_workers': args.sfv_workers if check_sfv_enabled else 1,
+                'full_report': args.full_report,
+                'io_scheduler': (io_per_device, device_limits),
+                'throttle': (args.read_rate, args.metadata_rate, args.throttle_control, args.processes),
+                'crc_cache': crc_cache.db_path if crc_cache is not None else None,
+                'dir_index': (dir_index.db_path, index_settings, dir_index.read_only) if dir_index is not None else None,
+                'checkpoint': (checkpoint.db_path, checkpoint_settings) if checkpoint is not None else None,
+                'quarantine': ((quarantine.trash_dir, quarantine.retention, quarantine.purge_rate)
+                               if quarantine is not None else None),
+                'rmtree_workers': args.rmtree_workers,
+                'image_workers': args.image_workers,
+                'archives': (args.zip_workers, args.zip_max_ratio or None, args.zip_max_size),
+                'plan': plan_writer is not None,
+                'output': output_mode,
+                'slowest': timings.slowest_limit,
+            }
+            deleted_count = run_sharded(ROOT_DIR, args.processes, shard_settings)
+        else:
+            deleted_count = delete_matching_dirs(ROOT_DIR, pretend_mode, check_sfv_enabled, delete_dash_one=delete_dash_one_enabled,
+                                                 verify_workers=args.verify_workers, delete_workers=args.delete_workers,
+                                                 queue_size=max(1, args.queue_size), dedupe=dedupe_enabled)
+        run_completed = not shutdown_requested
+    finally:
+        shutdown_archive_stage()
+        shutdown_image_workers()
+        shutdown_io_scheduler()
+        shutdown_sfv_workers()
+        close_crc_cache()
+        close_dir_index()
+        if checkpoint is not None and not run_completed:
+            print(f"{Colors.BLUE}💾 Progress saved to {checkpoint.db_path}; run again with --resume to continue{Colors.RESET}")
+        close_checkpoint(completed=run_completed)
+        shutdown_quarantine()
+        shutdown_tree_deleter()
+        close_plan()
+        close_metrics(completed=run_completed)
+        if profiler is not None:
+            profiler.stop()
+        finish_output()
+    print_statistics()
+    if args.stats_json and export_statistics(args.stats_json):
+        print(f"{Colors.BLUE}💾 Statistics written to {args.stats_json}{Colors.RESET}")
+    if profiler is not None:
+        profiler.report(args.profile)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import incoming_clean_up  # noqa: E402
+
+
+@pytest.fixture
+def icu():
+    """The script module with its process-wide state reset around each test."""
+    module = incoming_clean_up
+    module.shutdown_requested = False
+    module.ignored_paths.clear()
+    module.configure_keywords(list(module.KEYWORDS))
+    module.configure_output('text')
+    module.reset_statistics()
+    yield module
+    module.shutdown_requested = False
+    module.ignored_paths.clear()
+
+
+@pytest.fixture
+def make_tree(tmp_path):
+    """Build files under tmp_path from {relative path: bytes or str}; returns the root path."""
+    def build(files, root=None):
+        root = str(root or tmp_path)
+        for rel_path, content in files.items():
+            path = os.path.join(root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            mode = 'wb' if isinstance(content, bytes) else 'w'
+            with open(path, mode) as f:
+                f.write(content)
+        return root
+    return build
+
+
+@pytest.fixture
+def run_main(icu, capsys):
+    """Run the command line entry point; returns its captured (stdout, stderr)."""
+    import signal
+    handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+    def run(*argv):
+        try:
+            icu.main([str(arg) for arg in argv])
+        finally:
+            for sig, handler in handlers.items():
+                signal.signal(sig, handler)
+        return capsys.readouterr()
+    return run
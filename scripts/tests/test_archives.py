@@ -0,0 +1,30 @@
+import io
+import os
+import zipfile
+
+
+def make_zip(members):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return archive.getvalue()
+
+
+def test_extraction(icu, make_tree, tmp_path):
+    root = make_tree({'release.zip': make_zip({'CD1/01.flac': b'one', 'CD2/01.flac': b'two'})})
+    result = icu.extract_zip_archive(os.path.join(root, 'release.zip'), root)
+    assert result['error'] is None and result['members'] == 2
+    with open(os.path.join(root, 'CD2', '01.flac'), 'rb') as f:
+        assert f.read() == b'two'
+
+
+def test_failed_extraction_removes_created_directories(icu, make_tree, tmp_path):
+    data = bytearray(make_zip({'Disc/Sub/01.flac': b'one', 'Disc/Other/02.flac': b'two' * 1000}))
+    # Corrupt the second member's data so its CRC check fails after the first was written
+    offset = data.index(b'twotwo')
+    data[offset:offset + 3] = b'TWO'
+    root = make_tree({'Existing/keep.txt': 'x', 'release.zip': bytes(data)})
+    result = icu.extract_zip_archive(os.path.join(root, 'release.zip'), root, max_ratio=None)
+    assert result['error'] is not None
+    assert sorted(os.listdir(root)) == ['Existing', 'release.zip']
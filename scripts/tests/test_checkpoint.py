@@ -0,0 +1,35 @@
+import os
+
+
+def test_plain_runs_write_no_checkpoint(icu, make_tree, run_main):
+    root = make_tree({'Artist - Album/a.flac': b'x', 'Artist - Live/a.flac': b'y'})
+    run_main('--root-dir', root)
+    run_main('--root-dir', root, '--pretend', 'false')
+    assert sorted(os.listdir(root)) == ['Artist - Album']
+
+
+def test_pretend_run_ignores_checkpoint_request(icu, make_tree, run_main):
+    root = make_tree({'Artist - Album/a.flac': b'x'})
+    out, _ = run_main('--root-dir', root, '--checkpoint', 'true', '--resume')
+    assert 'only kept in live mode' in out
+    assert os.listdir(root) == ['Artist - Album']
+
+
+def test_resume_skips_journaled_directories(icu, make_tree, tmp_path):
+    root = make_tree({'Artist - Album/a.flac': b'x', 'Other - Album/b.flac': b'y'})
+    journal = str(tmp_path / 'journal.sqlite3')
+    assert icu.open_checkpoint(journal, root, 'settings')
+    try:
+        icu.delete_matching_dirs(root, pretend=False, check_sfv=False, show_progress=False)
+    finally:
+        icu.close_checkpoint(completed=False)
+    assert os.path.exists(journal)
+
+    icu.reset_statistics()
+    assert icu.open_checkpoint(journal, root, 'settings', resume=True)
+    try:
+        icu.delete_matching_dirs(root, pretend=False, check_sfv=False, show_progress=False)
+    finally:
+        icu.close_checkpoint(completed=True)
+    assert icu.stats['unchanged_dirs_skipped'] >= 2
+    assert not os.path.exists(journal)
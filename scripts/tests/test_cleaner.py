@@ -0,0 +1,39 @@
+import json
+import os
+import sys
+
+
+def test_module_import_has_no_output(tmp_path):
+    import subprocess
+    script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, '-c', 'import incoming_clean_up'], cwd=script_dir,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout == '' and result.stderr == ''
+
+
+def test_ndjson_runs_twice_and_restores_stdout(icu, make_tree, capsys):
+    root = make_tree({'Artist - Live/a.flac': b'x', 'Artist - Album/a.flac': b'y'})
+    red = icu.Colors.RED
+    with icu.Cleaner(output='ndjson', check_sfv=False) as cleaner:
+        for _ in range(2):
+            assert cleaner.run(root) == 1
+            out, err = capsys.readouterr()
+            records = [json.loads(line) for line in out.splitlines()]
+            assert [record['action'] for record in records] == ['delete_keyword', 'summary']
+            assert '{' not in err
+    print('caller output')
+    out, err = capsys.readouterr()
+    assert out == 'caller output\n' and err == ''
+    assert icu.Colors.RED == red
+    assert icu.output_mode == 'text'
+
+
+def test_quiet_run_keeps_stats_and_restores_stdout(icu, make_tree, capsys):
+    root = make_tree({'Artist - Live/a.flac': b'xx', 'Artist - Album/a.flac': b'y'})
+    with icu.Cleaner(output='quiet', check_sfv=False, pretend=False) as cleaner:
+        assert cleaner.run(root) == 1
+    assert cleaner.stats['keyword_directories_deleted'] == 1
+    assert cleaner.stats['total_size_deleted_bytes'] == 2
+    assert capsys.readouterr().out == ''
+    print('after')
+    assert capsys.readouterr().out == 'after\n'
@@ -0,0 +1,96 @@
+import os
+import random
+import zlib
+
+import pytest
+
+rng = random.Random(1)
+TRACK_1 = rng.randbytes(700 * 1024)
+TRACK_2 = rng.randbytes(500 * 1024)
+
+
+def release(tracks, sfv=False):
+    files = dict(tracks)
+    if sfv:
+        files['album.sfv'] = ''.join(f"{name} {zlib.crc32(data):08X}\n" for name, data in tracks.items())
+    return files
+
+
+def tree(prefix, files):
+    return {os.path.join(prefix, name): data for name, data in files.items()}
+
+
+def test_duplicates_are_removed_and_the_verified_copy_kept(icu, make_tree, run_main):
+    changed = bytearray(TRACK_1)
+    changed[len(changed) // 2] ^= 1
+    files = {}
+    files.update(tree('Artist - Album', release({'01.flac': TRACK_1, '02.flac': TRACK_2}, sfv=True)))
+    files.update(tree('Artist - Album (Repost)', release({'track1.flac': TRACK_1, 'track2.flac': TRACK_2})))
+    files.update(tree('Artist - Album-1', release({'01.flac': TRACK_1, '02.flac': TRACK_2})))
+    files.update(tree('Other - Album', release({'01.flac': bytes(changed), '02.flac': TRACK_2})))
+    root = make_tree(files)
+    run_main('--root-dir', root, '--dedupe', 'true', '--pretend', 'false')
+    assert sorted(os.listdir(root)) == ['Artist - Album', 'Other - Album']
+    assert icu.stats['duplicate_directories_deleted'] == 2
+    assert icu.stats['dedupe_confirmed_bytes'] == 2 * (len(TRACK_1) + len(TRACK_2))
+
+
+def test_archives_and_small_directories_are_not_releases(icu, make_tree, run_main):
+    archive = rng.randbytes(2 * 1024 * 1024)
+    root = make_tree({
+        'Artist - Zipped/release.zip': archive,
+        'Artist - Zipped Again/release.zip': archive,
+        'Artist - Tiny/01.flac': b'tiny',
+        'Artist - Tiny Again/01.flac': b'tiny',
+    })
+    run_main('--root-dir', root, '--dedupe', 'true')
+    assert len(os.listdir(root)) == 4
+    assert icu.stats['dedupe_releases'] == 0
+
+
+def test_checksum_match_with_different_bytes_is_kept(icu, make_tree, monkeypatch):
+    changed = bytearray(TRACK_1)
+    changed[-1] ^= 1
+    root = make_tree({'Artist - Album/01.flac': TRACK_1, 'Artist - Album (Repost)/01.flac': bytes(changed)})
+    releases = [icu.Release(os.path.join(root, name), {'01.flac': os.stat(os.path.join(root, name, '01.flac'))})
+                for name in ('Artist - Album', 'Artist - Album (Repost)')]
+    # As if the two files collided on every checksum
+    monkeypatch.setattr(icu, 'find_duplicate_releases', lambda releases: [releases])
+    assert icu.remove_duplicate_releases(releases, pretend=False) == 0
+    assert len(os.listdir(root)) == 2
+    assert icu.stats['dedupe_confirm_mismatches'] == 1
+
+
+def test_dash_one_rule_cannot_be_combined_with_dedupe(icu, make_tree, run_main):
+    root = make_tree({'Artist - Album-1/01.flac': b'x'})
+    with pytest.raises(SystemExit):
+        run_main('--root-dir', root, '--dedupe', 'true', '--delete-dash-one', 'true')
+    with pytest.raises(ValueError):
+        icu.Cleaner(dedupe=True, delete_dash_one=True)
+    assert not icu.Cleaner(dedupe=True).delete_dash_one
+    assert icu.Cleaner().delete_dash_one
+
+
+def test_multi_disc_copy_is_removed_as_one_release(icu, make_tree, run_main):
+    discs = {'CD1/01.flac': TRACK_1, 'CD2/01.flac': TRACK_2}
+    files = {}
+    files.update(tree('Artist - Album', discs))
+    files.update(tree('Artist - Album (Repost)', discs))
+    root = make_tree(files)
+    run_main('--root-dir', root, '--dedupe', 'true', '--pretend', 'false')
+    assert os.listdir(root) == ['Artist - Album']
+    assert sorted(os.listdir(os.path.join(root, 'Artist - Album'))) == ['CD1', 'CD2']
+    assert icu.stats['duplicate_directories_deleted'] == 1
+
+
+def test_shared_disc_of_a_different_release_is_kept(icu, make_tree, run_main):
+    # A disc large enough to be compared on its own
+    disc = TRACK_1 + TRACK_2
+    files = {}
+    files.update(tree('Artist - Album', {'CD1/01.flac': disc}))
+    files.update(tree('Artist - Album Deluxe', {'CD1/01.flac': disc, 'CD2/01.flac': TRACK_2}))
+    root = make_tree(files)
+    run_main('--root-dir', root, '--dedupe', 'true', '--pretend', 'false')
+    assert sorted(os.listdir(os.path.join(root, 'Artist - Album Deluxe'))) == ['CD1', 'CD2']
+    assert os.listdir(os.path.join(root, 'Artist - Album')) == ['CD1']
+    assert icu.stats['duplicate_directories_deleted'] == 0
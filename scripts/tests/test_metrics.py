@@ -0,0 +1,56 @@
+import re
+import zlib
+
+SAMPLE = re.compile(r'^([a-z_][a-z0-9_]*)(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? (\S+)$')
+
+
+def parse_metrics(text):
+    """Check the Prometheus text format line by line; returns {family: [(sample name, labels, value)]}."""
+    families = {}
+    types = {}
+    current = None
+    for line in text.splitlines():
+        if line.startswith('# HELP '):
+            current = line.split()[2]
+            assert current not in families, f"{current} declared twice"
+            families[current] = []
+        elif line.startswith('# TYPE '):
+            _, _, name, metric_type = line.split()
+            assert name == current
+            types[name] = metric_type
+        else:
+            match = SAMPLE.match(line)
+            assert match, line
+            name, labels, value = match.group(1), match.group(2) or '', match.group(4)
+            assert name == current or (types[current] == 'histogram' and name[len(current):] in ('_bucket', '_sum', '_count'))
+            float(value)
+            families[current].append((name, labels, value))
+    return families
+
+
+def test_metrics_file_format(icu, make_tree, run_main, tmp_path):
+    data = b'track'
+    root = make_tree({
+        'Artist - Album/01.flac': data,
+        'Artist - Album/album.sfv': f"01.flac {zlib.crc32(data):08X}\nmissing.flac 00000000\n",
+    }, root=tmp_path / 'music')
+    metrics = tmp_path / 'run.prom'
+    run_main('--root-dir', root, '--metrics-file', metrics)
+    families = parse_metrics(metrics.read_text())
+    assert families['incoming_cleanup_run_completed'] == [('incoming_cleanup_run_completed', '', '1')]
+    assert ('incoming_cleanup_files_by_extension_total', '{extension="flac"}', '1') in families['incoming_cleanup_files_by_extension_total']
+    statuses = {labels for _, labels, _ in families['incoming_cleanup_sfv_files_total']}
+    assert '{status="missing"}' in statuses
+    assert statuses <= {f'{{status="{status}"}}' for status in icu.SFV_FILE_STATUSES}
+
+
+def test_sfv_statuses_are_labelled_explicitly(icu):
+    icu.count('sfv_files_pass', 3)
+    icu.count('sfv_files_fail')
+    icu.count('sfv_files_not_hashed', 2)
+    families = parse_metrics(icu.format_metrics())
+    assert families['incoming_cleanup_sfv_files_total'] == [
+        ('incoming_cleanup_sfv_files_total', '{status="fail"}', '1'),
+        ('incoming_cleanup_sfv_files_total', '{status="pass"}', '3'),
+    ]
+    assert families['incoming_cleanup_sfv_files_not_hashed_total'] == [('incoming_cleanup_sfv_files_not_hashed_total', '', '2')]
@@ -0,0 +1,94 @@
+import io
+import shutil
+import json
+import os
+import zipfile
+import zlib
+
+
+def read_plan(path):
+    with open(path, encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    return lines[0], lines[1:]
+
+
+def test_plan_round_trip_from_another_directory(icu, make_tree, run_main, tmp_path, monkeypatch):
+    make_tree({'music/Artist - Album/a.flac': b'x', 'music/Artist - Live/b.flac': b'y',
+               'music/Various/Artist - Single/c.flac': b'z'})
+    monkeypatch.chdir(tmp_path)
+    run_main('--root-dir', 'music', '--plan-file', 'plan.jsonl')
+
+    header, entries = read_plan(tmp_path / 'plan.jsonl')
+    assert header['root'] == str(tmp_path / 'music')
+    assert sorted(entry['path'] for entry in entries) == ['Artist - Live', os.path.join('Various', 'Artist - Single')]
+
+    elsewhere = tmp_path / 'elsewhere'
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    icu.reset_statistics()
+    run_main('--root-dir', os.path.join('..', 'music'), '--apply-plan', tmp_path / 'plan.jsonl', '--pretend', 'false')
+    assert sorted(os.listdir(tmp_path / 'music')) == ['Artist - Album', 'Various']
+    assert os.listdir(tmp_path / 'music' / 'Various') == []
+    assert icu.stats['plan_actions_applied'] == 2
+
+
+def test_sfv_failure_in_an_unzipped_directory_is_not_applied(icu, make_tree, run_main, tmp_path):
+    content = b'track one'
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zf:
+        zf.writestr('01.flac', content)
+    root = make_tree({
+        'Artist - Album/release.zip': archive.getvalue(),
+        'Artist - Album/release.sfv': f'01.flac {zlib.crc32(content):08X}\n',
+    }, root=tmp_path / 'music')
+    plan = tmp_path / 'plan.jsonl'
+    run_main('--root-dir', root, '--plan-file', plan)
+    _, entries = read_plan(plan)
+    assert {entry['action'] for entry in entries} >= {'unzip', 'delete_sfv_failed'}
+
+    icu.reset_statistics()
+    out, _ = run_main('--root-dir', root, '--apply-plan', plan, '--pretend', 'false')
+    assert 'needs verifying again after unzipping' in out
+    assert sorted(os.listdir(os.path.join(root, 'Artist - Album'))) == ['01.flac', 'release.sfv']
+
+
+def test_apply_plan_writes_ndjson_records(icu, make_tree, run_main, tmp_path):
+    root = make_tree({'Artist - Live/a.flac': b'x'}, root=tmp_path / 'music')
+    plan = tmp_path / 'plan.jsonl'
+    run_main('--root-dir', root, '--plan-file', plan)
+
+    icu.reset_statistics()
+    out, _ = run_main('--root-dir', root, '--apply-plan', plan, '--pretend', 'false', '--output', 'ndjson')
+    records = [json.loads(line) for line in out.splitlines()]
+    assert [record['action'] for record in records] == ['delete_keyword', 'summary']
+    assert records[0]['path'] == os.path.join(root, 'Artist - Live')
+    assert not os.path.exists(records[0]['path'])
+
+
+def test_plan_is_applied_to_the_given_root(icu, make_tree, run_main, tmp_path):
+    original = make_tree({'Artist - Album/a.flac': b'x', 'Artist - Live/b.flac': b'y'}, root=tmp_path / 'original')
+    plan = tmp_path / 'plan.jsonl'
+    run_main('--root-dir', original, '--plan-file', plan)
+    # A copy somewhere else: its paths resolve, but the stamps (which include the inode) don't match
+    moved = str(tmp_path / 'moved')
+    shutil.copytree(original, moved)
+
+    icu.reset_statistics()
+    out, _ = run_main('--root-dir', moved, '--apply-plan', plan, '--pretend', 'false')
+    assert 'The plan was written for' in out
+    assert os.path.join(moved, 'Artist - Live') in out
+    assert icu.stats['plan_actions_skipped'] == 1
+    assert sorted(os.listdir(original)) == ['Artist - Album', 'Artist - Live']
+    assert sorted(os.listdir(moved)) == ['Artist - Album', 'Artist - Live']
+
+def test_pretend_apply_only_reports(icu, make_tree, run_main, tmp_path):
+    root = make_tree({'Artist - Live/a.flac': b'x'}, root=tmp_path / 'music')
+    plan = tmp_path / 'plan.jsonl'
+    run_main('--root-dir', root, '--plan-file', plan)
+
+    icu.reset_statistics()
+    out, _ = run_main('--root-dir', root, '--apply-plan', plan)
+    assert 'Actions that would be applied' in out
+    assert 'Actions applied' not in out
+    assert icu.stats['plan_actions_applied'] == 0
+    assert os.listdir(root) == ['Artist - Live']
@@ -0,0 +1,41 @@
+import sys
+import threading
+
+import pytest
+
+
+class ActiveProfilerError:
+    """A profiler that can't start because another one is active, as on Python 3.12+."""
+
+    def enable(self):
+        raise ValueError('Another profiling tool is already active')
+
+
+@pytest.mark.skipif(sys.version_info >= (3, 12), reason='one profiler per process from Python 3.12')
+def test_worker_threads_are_profiled(icu, tmp_path, capsys):
+    profiler = icu.Profiler()
+    profiler.start()
+    try:
+        worker = threading.Thread(target=sum, args=([1, 2],))
+        worker.start()
+        worker.join()
+    finally:
+        profiler.stop()
+    assert len(profiler.profilers) == 2
+    profiler.report(str(tmp_path / 'run.pstats'))
+    assert (tmp_path / 'run.pstats').exists()
+
+
+def test_falls_back_to_the_main_thread_when_a_profiler_is_active(icu, tmp_path):
+    profiler = icu.Profiler()
+    main_profiler = profiler.profilers[0]
+    profiler.new_profile = ActiveProfilerError
+    profiler.per_thread = True
+    main_profiler.enable()
+    try:
+        profiler._start_thread(None, 'call', None)
+    finally:
+        main_profiler.disable()
+    assert not profiler.per_thread
+    assert profiler.profilers == [main_profiler]
+    profiler.report(str(tmp_path / 'run.pstats'))
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+
+def test_quarantined_directory_can_be_restored(icu, make_tree, run_main, tmp_path, capsys):
+    root = make_tree({'Artist - Album/a.flac': b'x', 'Artist - Live/b.flac': b'y', 'Various/Artist - Single/c.flac': b'z'},
+                     root=tmp_path / 'music')
+    trash = str(tmp_path / 'trash')
+    run_main('--root-dir', root, '--pretend', 'false', '--quarantine', 'true', '--quarantine-dir', trash)
+    assert sorted(os.listdir(root)) == ['Artist - Album', 'Various']
+    assert os.listdir(os.path.join(root, 'Various')) == []
+    assert icu.stats['quarantined_dirs'] == 2
+    assert icu.stats['quarantine_pending'] == 2
+
+    with pytest.raises(SystemExit) as exit_info:
+        run_main('--root-dir', root, '--quarantine-dir', trash, '--restore', os.path.join(root, 'Artist - Live'))
+    assert exit_info.value.code == 0
+    assert 'Restored' in capsys.readouterr().out
+    with open(os.path.join(root, 'Artist - Live', 'b.flac'), 'rb') as f:
+        assert f.read() == b'y'
+    assert len(os.listdir(trash)) == 1
+
+    with pytest.raises(SystemExit):
+        run_main('--root-dir', root, '--quarantine-dir', trash, '--restore', os.path.join(root, 'Various'))
+    assert os.path.exists(os.path.join(root, 'Various', 'Artist - Single', 'c.flac'))
+    assert os.listdir(trash) == []
+
+
+def test_restore_reports_paths_that_exist_again(icu, make_tree, tmp_path, capsys):
+    root = make_tree({'Artist - Live/a.flac': b'x'}, root=tmp_path / 'music')
+    trash = icu.Quarantine(str(tmp_path / 'trash'), start_purge=False)
+    trash.add(os.path.join(root, 'Artist - Live'))
+    make_tree({'Artist - Live/b.flac': b'new'}, root=root)
+    assert not icu.restore_quarantined(trash.trash_dir, [os.path.join(root, 'Artist - Live')])
+    assert 'exists again' in capsys.readouterr().out
+    assert os.listdir(os.path.join(root, 'Artist - Live')) == ['b.flac']
+
+
+def test_later_runs_leave_the_default_quarantine_alone(icu, make_tree, run_main, capsys):
+    root = make_tree({'Artist - Album/a.flac': b'x', 'Artist - Live at X/b.flac': b'y'})
+    run_main('--root-dir', root, '--pretend', 'false', '--quarantine', 'true')
+    trash = os.path.join(root, icu.DEFAULT_QUARANTINE_NAME)
+    assert len(os.listdir(trash)) == 1
+
+    # Each run starts as a new process would, without the paths registered by the last one
+    icu.ignored_paths.clear()
+    out, _ = run_main('--root-dir', root)
+    assert icu.DEFAULT_QUARANTINE_NAME not in out
+    icu.ignored_paths.clear()
+    run_main('--root-dir', root, '--pretend', 'false')
+    assert len(os.listdir(trash)) == 1
+
+    icu.ignored_paths.clear()
+    with pytest.raises(SystemExit) as exit_info:
+        run_main('--root-dir', root, '--restore', os.path.join(root, 'Artist - Live at X'))
+    assert exit_info.value.code == 0
+    assert os.path.exists(os.path.join(root, 'Artist - Live at X', 'b.flac'))
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+
+@pytest.mark.parametrize('name, expected', [
+    ('Artist - Live at Wembley', True),
+    ('VA - Hits', True),
+    ('Best Of Artist', True),
+    ('Show 01-02-2023', True),
+    ('Album-1', True),
+    ('Valiant - Album', False),
+    ('Artist - Deliver', False),
+    ('Blink-182', False),
+])
+def test_should_delete(icu, name, expected):
+    assert icu.should_delete(name) is expected
+
+
+def test_dash_one_rule_can_be_disabled(icu):
+    assert icu.should_delete('Album-1', delete_dash_one=False) is False
+    assert icu.should_delete('Live Album-1', delete_dash_one=False) is True
+
+
+def test_highlight_lists_reasons(icu):
+    text = icu.ANSI_ESCAPE_PATTERN.sub('', icu.highlight_deletion_reason('VA - Hits 2020-01-02'))
+    assert 'VA' in text and 'HITS' in text and 'embedded date pattern' in text
+
+
+def test_walk_is_bottom_up_with_subtree_totals(icu, make_tree):
+    root = make_tree({
+        'A/a.flac': b'x' * 10,
+        'A/CD1/b.flac': b'x' * 20,
+        'B/c.mp3': b'x' * 5,
+    })
+    records = list(icu.walk_tree(root))
+    paths = [record.path for record in records]
+    assert paths.index(os.path.join(root, 'A', 'CD1')) < paths.index(os.path.join(root, 'A'))
+    assert paths[-1] == root
+    totals = {record.path: (record.total_size, record.total_files) for record in records}
+    assert totals[os.path.join(root, 'A')] == (30, 2)
+    assert totals[root] == (35, 3)
+
+
+def test_pretend_run_deletes_nothing(icu, make_tree):
+    root = make_tree({'Artist - Live/a.flac': b'x', 'Artist - Album/a.flac': b'y'})
+    deleted = icu.delete_matching_dirs(root, pretend=True, check_sfv=False, show_progress=False)
+    assert deleted == 1
+    assert os.path.isdir(os.path.join(root, 'Artist - Live'))
+
+
+def test_live_run_deletes_keyword_and_empty_dirs(icu, make_tree):
+    root = make_tree({'Artist - Live/a.flac': b'x', 'Artist - Album/a.flac': b'y'})
+    os.mkdir(os.path.join(root, 'Empty'))
+    deleted = icu.delete_matching_dirs(root, pretend=False, check_sfv=False, show_progress=False)
+    assert deleted == 2
+    assert sorted(os.listdir(root)) == ['Artist - Album']
+    assert icu.stats['keyword_directories_deleted'] == 1
+    assert icu.stats['empty_directories_deleted'] == 1
+
+
+def test_ignored_files_only_match_their_own_path(icu, make_tree):
+    root = make_tree({'crc.sqlite3': b'', 'Artist - Album/crc.sqlite3': b'', 'Artist - Album/a.flac': b'x'})
+    icu.ignore_files(os.path.join(root, 'crc.sqlite3'))
+    assert 'crc.sqlite3' not in icu.scan_directory(root).files
+    assert sorted(icu.scan_directory(os.path.join(root, 'Artist - Album')).files) == ['a.flac', 'crc.sqlite3']
@@ -0,0 +1,94 @@
+import os
+import shutil
+import time
+
+
+class FakeWatcher:
+    """Stands in for InotifyWatcher: replays batches of events and records each wait."""
+
+    def __init__(self, icu, batches):
+        self.icu = icu
+        self.batches = list(batches)
+        self.timeouts = []
+
+    def __call__(self, root_dir):
+        self.root_dir = root_dir
+        return self
+
+    def read(self, timeout):
+        self.timeouts.append(timeout)
+        if not self.batches:
+            self.icu.shutdown_requested = True
+            return []
+        batch = self.batches.pop(0)
+        if not batch:
+            # Nothing happened for the whole wait
+            time.sleep(timeout)
+        return [os.path.join(self.root_dir, name) for name in batch]
+
+    def close(self):
+        pass
+
+
+def test_zero_settle_time_does_not_spin(icu, make_tree, monkeypatch):
+    root = make_tree({'Artist - Album/a.flac': b'x'})
+    runs = []
+    monkeypatch.setattr(icu, 'delete_matching_dirs', lambda *args, only=None, **kwargs: runs.append(only) or 0)
+    watcher = FakeWatcher(icu, [[], ['Artist - Album'], []])
+    monkeypatch.setattr(icu, 'InotifyWatcher', watcher)
+    icu.watch_tree(root, settle_seconds=0)
+    assert runs == [None, {'Artist - Album'}]
+    # Only the reads that drain the events caused by a pass don't wait
+    waits = [timeout for timeout in watcher.timeouts if timeout != 0]
+    assert waits and all(timeout == 1.0 for timeout in waits)
+    assert len(waits) == len(watcher.timeouts) - len(runs)
+
+
+def test_pending_entries_are_processed_once_settled(icu, make_tree, monkeypatch):
+    root = make_tree({'Artist - Album/a.flac': b'x'})
+    runs = []
+    monkeypatch.setattr(icu, 'delete_matching_dirs', lambda *args, only=None, **kwargs: runs.append(only) or 0)
+    watcher = FakeWatcher(icu, [[], ['Artist - Album'], []])
+    monkeypatch.setattr(icu, 'InotifyWatcher', watcher)
+    icu.watch_tree(root, settle_seconds=0.05)
+    # The wait after the event is cut short to when the entry settles
+    assert watcher.timeouts[1] == 1.0
+    assert 0 <= watcher.timeouts[2] <= 0.05
+    assert runs == [None, {'Artist - Album'}]
+
+
+def test_entry_changed_during_its_batch_is_processed_again(icu, make_tree, monkeypatch):
+    root = make_tree({'Artist - Album/a.flac': b'x'})
+    runs = []
+    monkeypatch.setattr(icu, 'delete_matching_dirs', lambda *args, only=None, **kwargs: runs.append(only) or 0)
+    # The upload writes the .sfv while the entry is being processed
+    watcher = FakeWatcher(icu, [[], ['Artist - Album'], ['Artist - Album'], []])
+    monkeypatch.setattr(icu, 'InotifyWatcher', watcher)
+    icu.watch_tree(root, settle_seconds=0)
+    assert runs == [None, {'Artist - Album'}, {'Artist - Album'}]
+
+
+def test_entry_removed_by_its_batch_is_not_processed_again(icu, make_tree, monkeypatch):
+    root = make_tree({'Artist - Live/a.flac': b'x'})
+    runs = []
+
+    def clean(*args, only=None, **kwargs):
+        runs.append(only)
+        if only:
+            shutil.rmtree(os.path.join(root, 'Artist - Live'))
+        return 0
+    monkeypatch.setattr(icu, 'delete_matching_dirs', clean)
+    watcher = FakeWatcher(icu, [[], ['Artist - Live'], ['Artist - Live'], []])
+    monkeypatch.setattr(icu, 'InotifyWatcher', watcher)
+    icu.watch_tree(root, settle_seconds=0)
+    assert runs == [None, {'Artist - Live'}]
+
+
+def test_changes_during_the_first_pass_are_queued(icu, make_tree, monkeypatch):
+    root = make_tree({'Artist - Album/a.flac': b'x'})
+    runs = []
+    monkeypatch.setattr(icu, 'delete_matching_dirs', lambda *args, only=None, **kwargs: runs.append(only) or 0)
+    watcher = FakeWatcher(icu, [['Artist - Album'], []])
+    monkeypatch.setattr(icu, 'InotifyWatcher', watcher)
+    icu.watch_tree(root, settle_seconds=0)
+    assert runs == [None, {'Artist - Album'}]